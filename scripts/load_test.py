@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Load test the LLM-backed functions against the mock LLM server.
+
+Drives analyze_insights, analyze_insights_batch and the tool-calling
+chat loop, the LLM calls behind the agent workflows, at a fixed
+concurrency and reports throughput and latency percentiles. By default
+it starts scripts/mock_llm_server.py in-process, so no API key or
+network access is needed.
+"""
+import asyncio
+import math
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+import sys
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.mock_llm_server import MockLlmConfig, start_mock_server
+
+console = Console()
+
+CATEGORIES = ["sales", "pricing", "traffic", "sentiment"]
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+def sample_project_data(request_index: int) -> Dict:
+    """Distinct but realistic project data for each request"""
+    base = 1000 + request_index
+    return {
+        "metrics": {"revenue": base * 12.5, "transactions": base, "average_ticket": 12.5},
+        "historical_data": {
+            "daily_revenue": [base + (day * 37 % 200) for day in range(90)]
+        }
+    }
+
+def build_scenario(name: str, use_cache: bool) -> Callable[[int], Awaitable[object]]:
+    # Imported here so LLM_BASE_URL is set before any client is created
+    from src.functions.analyze_insights import (
+        AnalyzeInsightsBatchInput, AnalyzeInsightsInput, InsightSection,
+        analyze_insights, analyze_insights_batch
+    )
+    from src.functions.llm_chat import LlmChatInput, Message
+    from src.functions.llm_tool_loop import LlmToolLoopInput, llm_chat_with_tools
+
+    async def insights(i: int):
+        return await analyze_insights(AnalyzeInsightsInput(
+            project_data=sample_project_data(i),
+            category=CATEGORIES[i % len(CATEGORIES)],
+            use_cache=use_cache
+        ))
+
+    async def batch(i: int):
+        return await analyze_insights_batch(AnalyzeInsightsBatchInput(
+            sections=[
+                InsightSection(category=category, project_data=sample_project_data(i))
+                for category in CATEGORIES
+            ],
+            use_cache=use_cache
+        ))
+
+    async def tools(i: int):
+        return await llm_chat_with_tools(LlmToolLoopInput(chat=LlmChatInput(
+            messages=[Message(role="user", content=f"Summarize project p-{i}")],
+            use_cache=use_cache
+        )))
+
+    return {"insights": insights, "batch": batch, "tools": tools}[name]
+
+async def run_load(
+    scenario: Callable[[int], Awaitable[object]],
+    total_requests: int,
+    concurrency: int
+) -> Dict:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_index = iter(range(total_requests))
+
+    async def worker():
+        for i in next_index:
+            started = time.perf_counter()
+            try:
+                await scenario(i)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "completed": len(latencies),
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else 0.0,
+    }
+
+def print_report(scenario: str, report: Dict) -> None:
+    table = Table(title=f"Load test: {scenario}")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Completed", str(report["completed"]))
+    table.add_row("Errors", ", ".join(f"{k}={v}" for k, v in report["errors"].items()) or "0")
+    table.add_row("Elapsed (s)", f"{report['elapsed']:.2f}")
+    table.add_row("Throughput (req/s)", f"{report['throughput']:.1f}")
+    for key in ("p50", "p90", "p95", "p99", "max"):
+        table.add_row(f"{key} latency (ms)", f"{report[key] * 1000:.1f}")
+    console.print(table)
+
+@click.command()
+@click.option('--scenario', type=click.Choice(['insights', 'batch', 'tools']), default='insights')
+@click.option('--requests', 'total_requests', default=200, help='Total requests to send')
+@click.option('--concurrency', default=20, help='Requests in flight at once')
+@click.option('--use-cache', is_flag=True, help='Allow the LLM response cache to serve repeats')
+@click.option('--base-url', default=None, help='Use an already running server instead of starting the mock')
+@click.option('--port', default=8808, help='Port for the in-process mock server')
+@click.option('--latency', default='lognormal:300:0.5', help='Mock latency distribution')
+@click.option('--error-rate', default=0.0, help='Mock error rate')
+def main(
+    scenario: str,
+    total_requests: int,
+    concurrency: int,
+    use_cache: bool,
+    base_url: str,
+    port: int,
+    latency: str,
+    error_rate: float
+):
+    """Drive LLM-backed functions at a fixed concurrency and report tail latency"""
+    async def run():
+        runner = None
+        if base_url is None:
+            runner = await start_mock_server(
+                MockLlmConfig(latency=latency, error_rate=error_rate), port=port
+            )
+        os.environ["LLM_BASE_URL"] = base_url or f"http://127.0.0.1:{port}/v1"
+        os.environ.setdefault("LLM_API_KEY", "local")
+        try:
+            report = await run_load(
+                build_scenario(scenario, use_cache), total_requests, concurrency
+            )
+        finally:
+            if runner is not None:
+                await runner.cleanup()
+        print_report(scenario, report)
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stand-in for the LLM, for offline and load testing.
+
+Point the agents at it with LLM_BASE_URL=http://localhost:8808/v1 and
+LLM_API_KEY=local. Responses are deterministic for a given request body:
+insight requests get schema-valid insight JSON, requests offering tools
+get tool calls, and everything else gets a short text answer. Latency
+and error rates are configurable so retry and tail behaviour can be
+exercised without calling the paid API.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import sys
+
+import click
+from aiohttp import web
+from pydantic import BaseModel
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.functions.prompt_builder import count_tokens
+
+IMPACTS = ["HIGH", "MEDIUM", "LOW"]
+INSIGHT_TEMPLATES = [
+    ("Peak Hour Understaffing", "Wait times rise sharply during the evening peak."),
+    ("Price Outlier Detected", "One menu item is priced well above comparable items."),
+    ("Rating Drop", "Average review rating fell over the last two weeks."),
+    ("Weekend Revenue Opportunity", "Weekend lunch traffic is below weekday levels."),
+]
+
+class MockLlmConfig(BaseModel):
+    latency: str = "fixed:50"  # fixed:MS | uniform:LO_MS:HI_MS | lognormal:MEDIAN_MS:SIGMA
+    error_rate: float = 0.0
+    rate_limit_share: float = 0.5  # Share of injected errors returned as 429
+    insights_per_category: int = 3
+    stream_chunks: int = 8
+    seed: int = 0
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    """Draw a response latency in seconds from a distribution spec"""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return values[0] / 1000
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        return rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+def _content_rng(body: Dict[str, Any], seed: int) -> random.Random:
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16) ^ seed)
+
+def mock_insights(category: str, count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    insights = []
+    for i in range(count):
+        title, description = INSIGHT_TEMPLATES[rng.randrange(len(INSIGHT_TEMPLATES))]
+        insights.append({
+            "id": f"ins-{category}-{i + 1:03d}",
+            "title": title,
+            "description": description,
+            "category": category,
+            "confidence": round(rng.uniform(0.6, 0.95), 2),
+            "impact": IMPACTS[rng.randrange(len(IMPACTS))],
+            "supporting_data": {"sample_size": rng.randint(50, 500)},
+            "recommendations": [f"Review {category} data for {title.lower()}"]
+        })
+    return insights
+
+def _mock_arguments(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    defaults = {"string": "mock", "integer": 1, "number": 1.0, "boolean": True, "array": [], "object": {}}
+    properties = parameters.get("properties", {})
+    return {
+        name: defaults.get(properties.get(name, {}).get("type"), "mock")
+        for name in parameters.get("required", [])
+    }
+
+def build_message(body: Dict[str, Any], config: MockLlmConfig) -> Dict[str, Any]:
+    """Decide the assistant message for a request"""
+    rng = _content_rng(body, config.seed)
+    messages = body.get("messages") or []
+    prompt = " ".join(str(m.get("content") or "") for m in messages)
+    last_role = messages[-1].get("role") if messages else "user"
+
+    if body.get("tools") and last_role == "user":
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{i}_{rng.randrange(1 << 30):x}",
+                    "type": "function",
+                    "function": {
+                        "name": tool["function"]["name"],
+                        "arguments": json.dumps(_mock_arguments(tool["function"].get("parameters", {})))
+                    }
+                }
+                for i, tool in enumerate(body["tools"][:2])
+            ]
+        }
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        batch = re.search(r"separately for each category: ([\w, ]+)\.", prompt)
+        if batch:
+            content = {
+                category.strip(): mock_insights(category.strip(), config.insights_per_category, rng)
+                for category in batch.group(1).split(",")
+            }
+        else:
+            focus = re.search(r"Focus on the (\w+) category", prompt)
+            category = focus.group(1) if focus else "general"
+            content = {"insights": mock_insights(category, config.insights_per_category, rng)}
+        return {"role": "assistant", "content": json.dumps(content)}
+
+    tool_results = sum(1 for m in messages if m.get("role") == "tool")
+    text = (
+        f"Based on {tool_results} tool results, performance is stable this week."
+        if tool_results else "Sales are steady compared with last week."
+    )
+    return {"role": "assistant", "content": text}
+
+def _usage(body: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, int]:
+    prompt_tokens = count_tokens(json.dumps(body.get("messages") or []))
+    completion_tokens = count_tokens(json.dumps(message))
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+def create_app(config: Optional[MockLlmConfig] = None) -> web.Application:
+    """Build the aiohttp application serving /v1/chat/completions"""
+    config = config or MockLlmConfig()
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "errors": 0}
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        stats["requests"] += 1
+        latency = sample_latency(config.latency, rng)
+
+        if rng.random() < config.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(latency / 4)
+            if rng.random() < config.rate_limit_share:
+                return web.json_response(
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                    status=429, headers={"retry-after-ms": "100"}
+                )
+            return web.json_response(
+                {"error": {"message": "Mock server error", "type": "server_error"}}, status=500
+            )
+
+        message = build_message(body, config)
+        completion_id = f"chatcmpl-mock-{stats['requests']}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+
+        if body.get("stream"):
+            return await _stream(request, body, message, latency, completion_id, created, model)
+
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                "logprobs": None
+            }],
+            "usage": _usage(body, message)
+        })
+
+    async def _stream(request, body, message, latency, completion_id, created, model):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        async def send(delta, finish_reason=None, usage=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                "usage": usage
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        # Spend part of the latency before the first token, the rest while generating
+        await asyncio.sleep(latency * 0.3)
+        await send({"role": "assistant", "content": ""})
+        pieces = max(1, config.stream_chunks)
+        if message.get("tool_calls"):
+            for index, call in enumerate(message["tool_calls"]):
+                await send({"tool_calls": [{
+                    "index": index, "id": call["id"], "type": "function",
+                    "function": {"name": call["function"]["name"], "arguments": ""}
+                }]})
+                arguments = call["function"]["arguments"]
+                step = max(1, math.ceil(len(arguments) / pieces))
+                for start in range(0, len(arguments), step):
+                    await asyncio.sleep(latency * 0.7 / pieces)
+                    await send({"tool_calls": [{"index": index, "function": {"arguments": arguments[start:start + step]}}]})
+            await send({}, finish_reason="tool_calls")
+        else:
+            content = message["content"]
+            step = max(1, math.ceil(len(content) / pieces))
+            for start in range(0, len(content), step):
+                await asyncio.sleep(latency * 0.7 / pieces)
+                await send({"content": content[start:start + step]})
+            await send({}, finish_reason="stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            await send({}, usage=_usage(body, message))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application(client_max_size=32 * 1024 * 1024)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/chat/completions", chat_completions)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+async def start_mock_server(
+    config: Optional[MockLlmConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 8808
+) -> web.AppRunner:
+    """Start the mock server on the running loop; call runner.cleanup() to stop it"""
+    runner = web.AppRunner(create_app(config))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+@click.command()
+@click.option('--host', default='127.0.0.1', help='Interface to bind')
+@click.option('--port', default=8808, help='Port to listen on')
+@click.option('--latency', default='fixed:50', help='fixed:MS, uniform:LO:HI or lognormal:MEDIAN:SIGMA')
+@click.option('--error-rate', default=0.0, help='Fraction of requests that fail')
+@click.option('--rate-limit-share', default=0.5, help='Fraction of failures returned as 429')
+@click.option('--seed', default=0, help='Seed for latency, errors and content')
+def main(host: str, port: int, latency: str, error_rate: float, rate_limit_share: float, seed: int):
+    """Run the mock OpenAI-compatible LLM server"""
+    config = MockLlmConfig(
+        latency=latency, error_rate=error_rate, rate_limit_share=rate_limit_share, seed=seed
+    )
+    click.echo(f"Mock LLM server on http://{host}:{port}/v1 ({latency}, error rate {error_rate})")
+    web.run_app(create_app(config), host=host, port=port, print=None)
+
+if __name__ == "__main__":
+    main()
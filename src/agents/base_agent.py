@@ -1,10 +1,13 @@
-from restack_ai.agent import agent, log
+from restack_ai.agent import agent, agent_info, log
 from restack_ai.workflow import workflow
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import timedelta
 import json
 
+from src.functions.analyze_insights import analyze_insights, AnalyzeInsightsInput
+from src.monitoring.audit import AuditConfig, AuditLevel, AuditLog
+
 class InsightMetadata(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0)
     priority: int = Field(..., ge=1, le=5)
@@ -12,6 +15,33 @@ class InsightMetadata(BaseModel):
     tags: List[str] = Field(default_factory=list)
     data_sources: List[str] = Field(default_factory=list)
 
+class InsightCandidate(BaseModel):
+    """Shape an LLM-generated insight must have before it is used"""
+    confidence: float
+    description: Any
+    impact: Any
+    recommendations: Any
+    metadata: Optional[InsightMetadata] = None
+
+# Built once so batch validation reuses the compiled core schema
+_insight_batch_adapter = TypeAdapter(List[InsightCandidate])
+
+def _describe_validation_error(error: Dict[str, Any]) -> str:
+    """Turn a pydantic error for one insight into the agent's error wording"""
+    loc = error["loc"][1:]
+    if not loc:
+        return f"Invalid insight: {error['msg']}"
+
+    field = loc[0]
+    if field == "metadata":
+        path = ".".join(str(part) for part in loc[1:])
+        return f"Invalid metadata: {path + ': ' if path else ''}{error['msg']}"
+    if error["type"] == "missing":
+        if field == "confidence":
+            return "Missing confidence score"
+        return f"Missing required field: {field}"
+    return f"Invalid {field}: {error['msg']}"
+
 class BaseAgentConfig(BaseModel):
     confidence_threshold: float = 0.7
     max_processing_time: int = 120  # seconds
@@ -19,6 +49,9 @@ class BaseAgentConfig(BaseModel):
     cache_results: bool = True
     retry_attempts: int = 3
     context_window: int = 1000  # Number of tokens for context
+    insight_latency_budget_ms: Optional[int] = None  # Fall back to local insights past this
+    evidence_concurrency: int = 8  # Evidence queries in flight at once
+    audit: AuditConfig = AuditConfig()
 
 @agent.defn()
 class BaseAgent:
@@ -26,46 +59,89 @@ class BaseAgent:
     
     def __init__(self) -> None:
         self.config = BaseAgentConfig()
-        self.audit_log: List[Dict[str, Any]] = []
+        self.audit_log = AuditLog(self.__class__.__name__, self.config.audit)
         self.context: Dict[str, Any] = {}
         self._cached_results: Dict[str, Any] = {}
     
-    def log_action(self, action: str, details: Dict[str, Any]) -> None:
+    def log_action(
+        self,
+        action: str,
+        details: Dict[str, Any],
+        level: Optional[AuditLevel] = None
+    ) -> None:
         """Record agent actions for audit and debugging"""
-        if self.config.enable_audit_logging:
-            log_entry = {
-                "timestamp": agent.current_time_millis(),
-                "action": action,
-                "agent_type": self.__class__.__name__,
-                "details": details
-            }
-            self.audit_log.append(log_entry)
-            log.info(f"Agent action: {action}", details=details)
+        if not self.config.enable_audit_logging:
+            return
+
+        entry = self.audit_log.record(agent.current_time_millis(), action, details, level)
+        if entry is None:
+            return
+        if entry.level >= AuditLevel.WARNING:
+            log.warning(f"Agent action: {action}", details=details)
+        else:
+            log.debug(f"Agent action: {action}")
     
+    def llm_call_context(self) -> Dict[str, Optional[str]]:
+        """Agent and workflow identifiers attached to LLM calls for metrics"""
+        try:
+            workflow_id = agent_info().workflow_id
+        except Exception:  # Not running inside a workflow
+            workflow_id = None
+        return {"agent": self.__class__.__name__, "workflow_id": workflow_id}
+    
+    async def generate_insights(
+        self,
+        function_input: AnalyzeInsightsInput,
+        precomputed: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Insights for the agent's analysis, reusing any the orchestrator already generated.
+
+        When a workflow batches insight generation for all its agents, each
+        agent receives its share as ``precomputed_insights`` and skips its
+        own analyze_insights step.
+        """
+        if precomputed is not None:
+            self.log_action("precomputed_insights_used", {"count": len(precomputed)}, level=AuditLevel.DEBUG)
+            return {"insights": list(precomputed), "source": "batched"}
+        return await agent.step(
+            function=analyze_insights,
+            function_input=function_input,
+            start_to_close_timeout=timedelta(seconds=self.config.max_processing_time),
+        )
+
+    def validate_insights(
+        self,
+        insights: List[Dict[str, Any]]
+    ) -> Tuple[List[bool], List[List[str]]]:
+        """
+        Validate a batch of insights in a single pass.
+
+        Returns a mask of which insights meet the quality criteria and,
+        for each insight, the list of reasons it was rejected.
+        """
+        errors: List[List[str]] = [[] for _ in insights]
+        unscored = set()
+        try:
+            _insight_batch_adapter.validate_python(insights)
+        except ValidationError as e:
+            for error in e.errors():
+                index = error["loc"][0]
+                errors[index].append(_describe_validation_error(error))
+                if error["loc"][1:2] in ((), ("confidence",)):
+                    unscored.add(index)
+
+        threshold = self.config.confidence_threshold
+        for index, insight in enumerate(insights):
+            if index not in unscored and float(insight["confidence"]) < threshold:
+                errors[index].append(f"Confidence below threshold: {insight['confidence']}")
+
+        return [not insight_errors for insight_errors in errors], errors
+
     async def validate_insight(self, insight: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """Validate if an insight meets quality criteria"""
-        validation_errors = []
-        
-        # Check confidence threshold
-        if "confidence" not in insight:
-            validation_errors.append("Missing confidence score")
-        elif insight["confidence"] < self.config.confidence_threshold:
-            validation_errors.append(f"Confidence below threshold: {insight['confidence']}")
-        
-        # Validate required fields
-        required_fields = ["description", "impact", "recommendations"]
-        for field in required_fields:
-            if field not in insight:
-                validation_errors.append(f"Missing required field: {field}")
-        
-        # Validate metadata if present
-        if "metadata" in insight:
-            try:
-                InsightMetadata(**insight["metadata"])
-            except Exception as e:
-                validation_errors.append(f"Invalid metadata: {str(e)}")
-        
-        return len(validation_errors) == 0, validation_errors
+        valid_mask, errors = self.validate_insights([insight])
+        return valid_mask[0], errors[0]
     
     async def get_context(self, query_params: Dict[str, Any]) -> Dict[str, Any]:
         """Get relevant context for agent reasoning"""
@@ -1,10 +1,16 @@
 from typing import Dict, Any, List, Optional
-from datetime import timedelta
 from pydantic import BaseModel, Field
+import numpy as np
 
 from restack_ai.agent import agent, log
 from src.agents.base_agent import BaseAgent
-from src.functions.analyze_insights import analyze_insights, AnalyzeInsightsInput
+from src.analytics.elasticity import (
+    DEFAULT_ELASTICITY, estimate_elasticities, expected_impact, item_cost, item_key, item_price
+)
+from src.analytics.name_matching import match_menu_items
+from src.analytics.price_optimizer import optimize_menu_prices, recommendation_confidence
+from src.monitoring.audit import AuditLevel
+from src.functions.analyze_insights import AnalyzeInsightsInput
 
 class PricePoint(BaseModel):
     item_id: str
@@ -34,10 +40,14 @@ class PriceOptimizationRequest(BaseModel):
     min_price_adjustment: float = 0.0
     max_price_adjustment: float = 5.0
 
+# Competitor prices this far from ours mark an opportunity or a risk
+COMPETITOR_GAP_THRESHOLD = 0.15
+
 class PricingAgentInput(BaseModel):
     request: PriceOptimizationRequest
     market_data: Optional[MarketData] = None
     historical_performance: Optional[Dict[str, Any]] = None
+    precomputed_insights: Optional[List[Dict[str, Any]]] = None  # From the orchestrator's batched call
 
 @agent.defn()
 class PricingAgent(BaseAgent):
@@ -88,17 +98,19 @@ class PricingAgent(BaseAgent):
             )
 
             # Generate insights about price changes
-            insights_result = await agent.step(
-                function=analyze_insights,
-                function_input=AnalyzeInsightsInput(
+            insights_result = await self.generate_insights(
+                AnalyzeInsightsInput(
                     project_data={
                         "pricing_analysis": pricing_analysis,
                         "recommendations": validated_recommendations,
                         "market_context": input_data.market_data.dict() if input_data.market_data else None
                     },
-                    category="pricing"
+                    category="pricing",
+                    token_budget=self.config.context_window,
+                    latency_budget_ms=self.config.insight_latency_budget_ms,
+                    **self.llm_call_context()
                 ),
-                start_to_close_timeout=timedelta(seconds=self.config.max_processing_time),
+                input_data.precomputed_insights
             )
 
             # Prepare final response
@@ -118,7 +130,7 @@ class PricingAgent(BaseAgent):
 
         except Exception as e:
             error_details = {"error": str(e), "context": "price_optimization"}
-            self.log_action("price_optimization_failed", error_details)
+            self.log_action("price_optimization_failed", error_details, level=AuditLevel.ERROR)
             raise
 
     async def analyze_current_pricing(
@@ -127,11 +139,36 @@ class PricingAgent(BaseAgent):
         historical_data: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Analyze current pricing structure and historical performance"""
-        # TODO: Implement comprehensive pricing analysis
+        # Demand curves for the whole menu in one batched fit
+        estimates = estimate_elasticities(menu_items, historical_data)
+        categories = np.array(estimates.categories)
+        prices = estimates.baseline_price
+
+        price_distribution = {}
+        category_analysis = {}
+        for category in sorted(set(estimates.categories)):
+            in_category = categories == category
+            category_prices = prices[in_category & np.isfinite(prices)]
+            if len(category_prices):
+                price_distribution[category] = {
+                    "count": int(len(category_prices)),
+                    "min": float(category_prices.min()),
+                    "median": float(np.median(category_prices)),
+                    "max": float(category_prices.max())
+                }
+            category_analysis[category] = {
+                "average_elasticity": round(float(estimates.elasticity[in_category].mean()), 3),
+                "items_with_history": int((estimates.observations[in_category] > 0).sum())
+            }
+
         return {
-            "price_distribution": {},
-            "category_analysis": {},
-            "historical_trends": {}
+            "price_distribution": price_distribution,
+            "category_analysis": category_analysis,
+            "historical_trends": {
+                "items_with_history": int((estimates.observations > 0).sum()),
+                "median_observations": float(np.median(estimates.observations)) if len(menu_items) else 0.0
+            },
+            "elasticity": estimates.to_dict()
         }
 
     async def analyze_competitor_pricing(
@@ -140,11 +177,45 @@ class PricingAgent(BaseAgent):
         competitor_prices: List[CompetitorPrice]
     ) -> Dict[str, Any]:
         """Analyze competitor pricing and market positioning"""
-        # TODO: Implement competitor analysis logic
+        # Names are matched through a cached n-gram index over the competitor set
+        priced = [item for item in menu_items if item_price(item) > 0]
+        matches = match_menu_items(
+            [str(item.get("name") or item_key(item)) for item in priced],
+            [competitor.item_name for competitor in competitor_prices]
+        )
+
+        relative_position = {}
+        price_gaps = {}
+        opportunity_areas = []
+        for item, item_matches in zip(priced, matches):
+            if not item_matches:
+                continue
+            competitor_price = float(np.median([competitor_prices[m["index"]].price for m in item_matches]))
+            if competitor_price <= 0:
+                continue
+            item_id, price = item_key(item), item_price(item)
+            relative_position[item_id] = round(price / competitor_price, 3)
+            price_gaps[item_id] = {
+                "our_price": price,
+                "competitor_median": competitor_price,
+                "gap": round(price - competitor_price, 2),
+                "matches": [
+                    {**m, "price": competitor_prices[m["index"]].price,
+                     "competitor_id": competitor_prices[m["index"]].competitor_id}
+                    for m in item_matches
+                ]
+            }
+            if abs(relative_position[item_id] - 1) >= COMPETITOR_GAP_THRESHOLD:
+                opportunity_areas.append({
+                    "item_id": item_id,
+                    "type": "underpriced" if price < competitor_price else "overpriced",
+                    "relative_position": relative_position[item_id]
+                })
+
         return {
-            "relative_position": {},
-            "price_gaps": {},
-            "opportunity_areas": []
+            "relative_position": relative_position,
+            "price_gaps": price_gaps,
+            "opportunity_areas": opportunity_areas
         }
 
     async def generate_price_recommendations(
@@ -154,8 +225,60 @@ class PricingAgent(BaseAgent):
         market_data: Optional[MarketData]
     ) -> List[PricePoint]:
         """Generate optimal price points based on analysis"""
-        # TODO: Implement price recommendation logic
-        return []
+        # One vectorized search over the whole menu, with the adjustment limits
+        # and margin target applied as constraints rather than filters
+        elasticity_by_item = pricing_analysis.get("elasticity", {})
+        items = [
+            item for item in request.menu_items
+            if item_price(item) > 0 and elasticity_by_item.get(item_key(item), {}).get("baseline_volume", 0) > 0
+        ]
+        if not items:
+            return []
+
+        ids = [item_key(item) for item in items]
+        fits = [elasticity_by_item[item_id] for item_id in ids]
+        current = np.array([item_price(item) for item in items])
+        cost = np.array([item_cost(item) for item in items])
+        elasticity = np.array([fit["elasticity"] for fit in fits])
+        volume = np.array([fit["baseline_volume"] for fit in fits])
+        std_error = np.array([np.nan if fit["std_error"] is None else fit["std_error"] for fit in fits])
+
+        solution = optimize_menu_prices(
+            current, cost, elasticity, volume,
+            min_adjustment=request.min_price_adjustment,
+            max_adjustment=request.max_price_adjustment,
+            target_margin=request.target_margin
+        )
+        if not solution.feasible:
+            self.log_action("margin_target_unreachable", {
+                "target_margin": request.target_margin,
+                "best_margin": solution.margin
+            }, level=AuditLevel.WARNING)
+
+        confidence = recommendation_confidence(std_error, np.array([fit["shrinkage"] for fit in fits]))
+        impact = expected_impact(current, solution.prices, elasticity, volume, np.nan_to_num(cost))
+        recommendations = []
+        for i in np.flatnonzero(np.abs(solution.prices - current) > 1e-9):
+            direction = "Raising" if solution.prices[i] > current[i] else "Lowering"
+            metrics = {
+                "elasticity": float(elasticity[i]),
+                "baseline_volume": float(volume[i]),
+                "expected_volume": round(float(solution.volume[i]), 2),
+                "revenue_change": round(float(impact["revenue_impact"][i]), 2),
+                "margin_change": round(float(impact["margin_impact"][i]), 2)
+            }
+            if np.isfinite(cost[i]):
+                metrics["unit_cost"] = float(cost[i])
+            recommendations.append(PricePoint(
+                item_id=ids[i],
+                current_price=float(current[i]),
+                suggested_price=round(float(solution.prices[i]), 2),
+                confidence_score=float(confidence[i]),
+                reasoning=f"{direction} the price moves expected profit by "
+                          f"{metrics['margin_change']:+.2f} given a demand elasticity of {elasticity[i]:.2f}",
+                impact_metrics=metrics
+            ))
+        return recommendations
 
     async def validate_recommendations(
         self,
@@ -187,12 +310,18 @@ class PricingAgent(BaseAgent):
         recommendations: List[PricePoint]
     ) -> Dict[str, float]:
         """Calculate expected business impact of price changes"""
-        # TODO: Implement impact calculation logic
-        return {
-            "revenue_impact": 0.0,
-            "margin_impact": 0.0,
-            "volume_impact": 0.0
-        }
+        # Every recommendation at once; demand inputs travel in impact_metrics
+        def column(key: str, default: float) -> np.ndarray:
+            return np.array([rec.impact_metrics.get(key, default) for rec in recommendations], dtype=np.float64)
+
+        impact = expected_impact(
+            current_price=np.array([rec.current_price for rec in recommendations], dtype=np.float64),
+            new_price=np.array([rec.suggested_price for rec in recommendations], dtype=np.float64),
+            elasticity=column("elasticity", DEFAULT_ELASTICITY),
+            volume=column("baseline_volume", 0.0),
+            unit_cost=column("unit_cost", 0.0)
+        )
+        return {name: round(float(values.sum()), 2) for name, values in impact.items()}
 
     async def create_implementation_plan(
         self,
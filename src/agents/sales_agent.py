@@ -4,7 +4,18 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 
 from src.agents.base_agent import BaseAgent
-from src.functions.analyze_insights import analyze_insights, AnalyzeInsightsInput
+from src.analytics.anomaly import AnomalyConfig, SalesSeries, collect_sales_series, find_sales_anomalies
+from src.analytics.basket import build_indexes, bundle_opportunities
+from src.analytics.evidence import SalesEvidenceSource, enhance_with_evidence
+from src.analytics.forecast import ForecastConfig, forecast_sales
+from src.monitoring.audit import AuditLevel
+from src.functions.analyze_insights import AnalyzeInsightsInput
+from src.functions.fetch_sales_data import fetch_sales_aggregates, FetchSalesDataInput
+
+# Most severe anomalies kept for insight generation
+MAX_REPORTED_ANOMALIES = 50
+# Strongest bundle suggestions kept per restaurant
+MAX_BUNDLES_PER_RESTAURANT = 5
 
 class SalesMetrics(BaseModel):
     revenue: float
@@ -29,6 +40,7 @@ class SalesAgentInput(BaseModel):
     query: SalesQuery
     historical_data: Optional[Dict[str, Any]] = None
     external_factors: Optional[ExternalFactors] = None
+    precomputed_insights: Optional[List[Dict[str, Any]]] = None  # From the orchestrator's batched call
 
 @agent.defn()
 class SalesAgent(BaseAgent):
@@ -45,10 +57,12 @@ class SalesAgent(BaseAgent):
         try:
             # Fetch sales data from database
             sales_data = await self.fetch_sales_data(input_data)
+            # Stacked once and shared by anomalies, forecasts and evidence
+            series = collect_sales_series(sales_data)
             
             # Analyze patterns and detect anomalies
             if input_data.query.detect_anomalies:
-                anomalies = await self.detect_anomalies(sales_data)
+                anomalies = await self.detect_anomalies(sales_data, series)
                 self.log_action("anomalies_detected", {"count": len(anomalies)})
                 sales_data["anomalies"] = anomalies
             
@@ -62,30 +76,36 @@ class SalesAgent(BaseAgent):
                 
             # Generate forecasts if requested
             if input_data.query.forecast_trends:
-                forecasts = await self.generate_forecasts(sales_data)
+                forecasts = await self.generate_forecasts(sales_data, series)
                 sales_data["forecasts"] = forecasts
             
             # Generate comprehensive insights
-            insights_result = await agent.step(
-                function=analyze_insights,
-                function_input=AnalyzeInsightsInput(
+            insights_result = await self.generate_insights(
+                AnalyzeInsightsInput(
                     project_data=sales_data,
                     category="sales",
+                    token_budget=self.config.context_window,
+                    latency_budget_ms=self.config.insight_latency_budget_ms,
+                    **self.llm_call_context(),
                     external_context=input_data.external_factors.dict() if input_data.external_factors else None
                 ),
-                start_to_close_timeout=timedelta(seconds=self.config.max_processing_time),
+                input_data.precomputed_insights
             )
             
             # Filter and validate insights
-            if "insights" in insights_result:
-                validated_insights = [
-                    insight for insight in insights_result["insights"]
-                    if await self.validate_insight(insight)
-                ]
-                insights_result["insights"] = validated_insights
+            insights = insights_result.get("insights", [])
+            valid_mask, validation_errors = self.validate_insights(insights)
+            validated_insights = [
+                insight for insight, is_valid in zip(insights, valid_mask) if is_valid
+            ]
+            if len(validated_insights) < len(insights):
+                self.log_action("insights_rejected", {
+                    "count": len(insights) - len(validated_insights),
+                    "errors": [errs for errs in validation_errors if errs]
+                }, level=AuditLevel.DEBUG)
             
             # Add confidence scores and supporting evidence
-            enhanced_insights = await self.enhance_insights(validated_insights)
+            enhanced_insights = await self.enhance_insights(validated_insights, sales_data, series)
             insights_result["insights"] = enhanced_insights
                 
             self.log_action("analysis_completed", {
@@ -100,32 +120,43 @@ class SalesAgent(BaseAgent):
             
         except Exception as e:
             error_details = {"error": str(e), "context": "sales_analysis"}
-            self.log_action("analysis_failed", error_details)
+            self.log_action("analysis_failed", error_details, level=AuditLevel.ERROR)
             raise
 
     async def fetch_sales_data(self, input_data: SalesAgentInput) -> Dict[str, Any]:
         """Fetch and preprocess sales data with enhanced error handling"""
         try:
-            # TODO: Implement actual database connection
-            # For now return structured mock data
+            # Sums, buckets and item counts are computed by the database
+            filters = input_data.query.filters
+            restaurant_ids = filters.get("restaurant_ids") or (
+                [filters["restaurant_id"]] if filters.get("restaurant_id") is not None else None
+            )
+            aggregates = await agent.step(
+                function=fetch_sales_aggregates,
+                function_input=FetchSalesDataInput(
+                    timeframe=input_data.query.timeframe,
+                    restaurant_ids=restaurant_ids
+                ),
+                start_to_close_timeout=timedelta(seconds=self.config.max_processing_time),
+            )
             return {
-                "metrics": SalesMetrics(
-                    revenue=0.0,
-                    transactions=0,
-                    average_ticket=0.0,
-                    items_sold={}
-                ).dict(),
+                "metrics": SalesMetrics(**aggregates["totals"]).dict(),
                 "timeframe": input_data.query.timeframe,
+                "series": aggregates["series"],
                 "historical_data": input_data.historical_data or {}
             }
         except Exception as e:
-            self.log_action("data_fetch_failed", {"error": str(e)})
+            self.log_action("data_fetch_failed", {"error": str(e)}, level=AuditLevel.ERROR)
             raise
 
-    async def detect_anomalies(self, sales_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def detect_anomalies(
+        self,
+        sales_data: Dict[str, Any],
+        series: Optional[SalesSeries] = None
+    ) -> List[Dict[str, Any]]:
         """Detect anomalies in sales patterns"""
-        # TODO: Implement anomaly detection logic
-        return []
+        # One batched pass over revenue, transactions and average ticket of every restaurant
+        return find_sales_anomalies(sales_data, AnomalyConfig(), limit=MAX_REPORTED_ANOMALIES, series=series)
 
     async def identify_opportunities(
         self, 
@@ -133,32 +164,38 @@ class SalesAgent(BaseAgent):
         external_factors: Optional[ExternalFactors]
     ) -> List[Dict[str, Any]]:
         """Identify business opportunities based on sales data and external factors"""
-        # TODO: Implement opportunity identification logic
-        return []
+        # Bundles and cross-sells from one sparse co-occurrence index per restaurant
+        opportunities = []
+        for restaurant_id, index in build_indexes(sales_data).items():
+            opportunities.extend(bundle_opportunities(
+                index,
+                limit=MAX_BUNDLES_PER_RESTAURANT,
+                restaurant_id=None if restaurant_id == "default" else restaurant_id
+            ))
+        return opportunities
 
-    async def generate_forecasts(self, sales_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_forecasts(
+        self,
+        sales_data: Dict[str, Any],
+        series: Optional[SalesSeries] = None
+    ) -> Dict[str, Any]:
         """Generate sales forecasts using historical data"""
-        # TODO: Implement forecasting logic
-        return {}
+        # Batched over all restaurants; fitted state is cached and updated with new points
+        return forecast_sales(sales_data, ForecastConfig(), series=series)
 
     async def enhance_insights(
         self, 
-        insights: List[Dict[str, Any]]
+        insights: List[Dict[str, Any]],
+        sales_data: Dict[str, Any],
+        series: Optional[SalesSeries] = None
     ) -> List[Dict[str, Any]]:
         """Add confidence scores and supporting evidence to insights"""
-        enhanced = []
-        for insight in insights:
-            insight["confidence_score"] = await self.calculate_confidence(insight)
-            insight["supporting_evidence"] = await self.gather_evidence(insight)
-            enhanced.append(insight)
-        return enhanced
-
-    async def calculate_confidence(self, insight: Dict[str, Any]) -> float:
-        """Calculate confidence score for an insight"""
-        # TODO: Implement confidence calculation logic
-        return 0.0
-
-    async def gather_evidence(self, insight: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Gather supporting evidence for an insight"""
-        # TODO: Implement evidence gathering logic
-        return []
+        # Evidence for all insights is deduplicated and fetched concurrently, then scored in one pass
+        source = SalesEvidenceSource(sales_data, series)
+        return await enhance_with_evidence(
+            insights,
+            source.resolve,
+            metrics=source.metrics,
+            restaurants=source.restaurants,
+            concurrency=self.config.evidence_concurrency
+        )
@@ -5,6 +5,7 @@ import asyncio
 
 from restack_ai.agent import agent, log
 from src.agents.base_agent import BaseAgent
+from src.monitoring.audit import AuditLevel
 from src.functions.scraping import ScrapingTools
 import time
 
@@ -85,7 +86,7 @@ class ScrapingAgent(BaseAgent):
 
         except Exception as e:
             error_details = {"error": str(e), "context": "web_scraping"}
-            self.log_action("scraping_failed", error_details)
+            self.log_action("scraping_failed", error_details, level=AuditLevel.ERROR)
             raise
 
     async def _scrape_target(
@@ -213,7 +214,7 @@ class ScrapingAgent(BaseAgent):
             self.log_action("scraping_error", {
                 "url": target.url,
                 "error": str(e)
-            })
+            }, level=AuditLevel.WARNING)
             raise
         finally:
             await page.close()
@@ -233,7 +234,7 @@ class ScrapingAgent(BaseAgent):
             if new_proxy:
                 self.current_proxy = new_proxy
                 self.last_rotation = current_time
-                self.log_action("proxy_rotated", {"new_proxy": new_proxy})
+                self.log_action("proxy_rotated", {"new_proxy": new_proxy}, level=AuditLevel.DEBUG)
 
     async def _setup_browser(self, bypass_methods: List[str]) -> Any:
         """Set up browser with stealth and bypass configurations"""
@@ -325,7 +326,7 @@ class ScrapingAgent(BaseAgent):
             "error_type": error_type,
             "retry_count": retry_count,
             "new_strategy": strategy
-        })
+        }, level=AuditLevel.DEBUG)
 
         return strategy
 
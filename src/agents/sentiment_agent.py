@@ -1,10 +1,10 @@
 from typing import Dict, Any, List, Optional
-from datetime import timedelta
 from pydantic import BaseModel
 
 from restack_ai.agent import agent, log
 from src.agents.base_agent import BaseAgent
-from src.functions.analyze_insights import analyze_insights, AnalyzeInsightsInput
+from src.monitoring.audit import AuditLevel
+from src.functions.analyze_insights import AnalyzeInsightsInput
 
 class ReviewSource(BaseModel):
     platform: str
@@ -25,6 +25,7 @@ class SentimentRequest(BaseModel):
     sources: List[ReviewSource]
     filters: Dict[str, Any] = {}
     categories: List[str] = []
+    precomputed_insights: Optional[List[Dict[str, Any]]] = None  # From the orchestrator's batched call
 
 @agent.defn()
 class SentimentAgent(BaseAgent):
@@ -55,16 +56,18 @@ class SentimentAgent(BaseAgent):
             )
 
             # Generate comprehensive insights
-            insights_result = await agent.step(
-                function=analyze_insights,
-                function_input=AnalyzeInsightsInput(
+            insights_result = await self.generate_insights(
+                AnalyzeInsightsInput(
                     project_data={
                         "sentiment_data": sentiment_data,
                         "category_insights": category_insights
                     },
-                    category="sentiment"
+                    category="sentiment",
+                    token_budget=self.config.context_window,
+                    latency_budget_ms=self.config.insight_latency_budget_ms,
+                    **self.llm_call_context()
                 ),
-                start_to_close_timeout=timedelta(seconds=self.config.max_processing_time),
+                input_data.precomputed_insights
             )
 
             # Prepare detailed response
@@ -112,7 +115,7 @@ class SentimentAgent(BaseAgent):
 
         except Exception as e:
             error_details = {"error": str(e), "context": "sentiment_analysis"}
-            self.log_action("sentiment_analysis_failed", error_details)
+            self.log_action("sentiment_analysis_failed", error_details, level=AuditLevel.ERROR)
             raise
 
     async def _analyze_reviews(
@@ -1,10 +1,18 @@
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+import asyncio
 from pydantic import BaseModel, Field
+import numpy as np
 
 from restack_ai.agent import agent, log
 from src.agents.base_agent import BaseAgent
-from src.functions.analyze_insights import analyze_insights, AnalyzeInsightsInput
+from src.analytics.staffing import (
+    StaffingConfig, optimize_staffing_plan, staffing_matrix, staffing_recommendations
+)
+from src.analytics.traffic_cube import peak_periods
+from src.analytics.traffic_stats import traffic_patterns, update_traffic_statistics, window_patterns
+from src.monitoring.audit import AuditLevel
+from src.functions.analyze_insights import AnalyzeInsightsInput
 
 class HourlyTraffic(BaseModel):
     hour: int
@@ -40,6 +48,7 @@ class TrafficAgentInput(BaseModel):
     historical_traffic: Optional[List[DayTraffic]] = None
     current_staffing: Optional[Dict[str, List[StaffingLevel]]] = None
     venue_capacity: Optional[int] = None
+    precomputed_insights: Optional[List[Dict[str, Any]]] = None  # From the orchestrator's batched call
 
 @agent.defn()
 class TrafficAgent(BaseAgent):
@@ -91,9 +100,8 @@ class TrafficAgent(BaseAgent):
                 traffic_analysis["event_impact"] = event_impact
 
             # Generate comprehensive insights
-            insights_result = await agent.step(
-                function=analyze_insights,
-                function_input=AnalyzeInsightsInput(
+            insights_result = await self.generate_insights(
+                AnalyzeInsightsInput(
                     project_data={
                         "traffic_analysis": traffic_analysis,
                         "venue_capacity": input_data.venue_capacity,
@@ -102,9 +110,12 @@ class TrafficAgent(BaseAgent):
                             "end": input_data.request.end_date
                         }
                     },
-                    category="traffic"
+                    category="traffic",
+                    token_budget=self.config.context_window,
+                    latency_budget_ms=self.config.insight_latency_budget_ms,
+                    **self.llm_call_context()
                 ),
-                start_to_close_timeout=timedelta(seconds=self.config.max_processing_time),
+                input_data.precomputed_insights
             )
 
             # Prepare final response
@@ -125,7 +136,7 @@ class TrafficAgent(BaseAgent):
 
         except Exception as e:
             error_details = {"error": str(e), "context": "traffic_analysis"}
-            self.log_action("traffic_analysis_failed", error_details)
+            self.log_action("traffic_analysis_failed", error_details, level=AuditLevel.ERROR)
             raise
 
     async def analyze_historical_patterns(
@@ -134,12 +145,12 @@ class TrafficAgent(BaseAgent):
         request: TrafficAnalysisRequest
     ) -> Dict[str, Any]:
         """Analyze historical traffic data to identify patterns"""
-        # TODO: Implement historical pattern analysis
-        return {
-            "patterns": [],
-            "trends": {},
-            "seasonality": {}
-        }
+        days = historical_data or []
+        # Patterns describe the requested window; the cached statistics add the long-run trend
+        history = await asyncio.to_thread(update_traffic_statistics, request.location_id, days)
+        analysis = window_patterns(history, request.location_id, days, request.start_date, request.end_date)
+        analysis["long_run"] = traffic_patterns(history, request.location_id)["trends"]
+        return analysis
 
     async def analyze_peak_periods(
         self,
@@ -147,12 +158,7 @@ class TrafficAgent(BaseAgent):
         venue_capacity: Optional[int]
     ) -> Dict[str, Any]:
         """Identify and analyze peak traffic periods"""
-        # TODO: Implement peak period analysis
-        return {
-            "peak_hours": [],
-            "bottlenecks": [],
-            "capacity_utilization": {}
-        }
+        return peak_periods(traffic_analysis.get("hourly_profile") or {}, venue_capacity)
 
     async def optimize_staffing(
         self,
@@ -160,12 +166,19 @@ class TrafficAgent(BaseAgent):
         current_staffing: Dict[str, List[StaffingLevel]]
     ) -> Dict[str, Any]:
         """Generate optimized staffing recommendations"""
-        # TODO: Implement staffing optimization logic
-        return {
-            "recommendations": [],
-            "efficiency_gains": {},
-            "cost_impact": {}
-        }
+        weekday_hours = (traffic_analysis.get("seasonality") or {}).get("weekday_hour_customers")
+        if not weekday_hours:
+            return {
+                "recommendations": [],
+                "efficiency_gains": {},
+                "cost_impact": {}
+            }
+
+        # Weekday-hour averages are the demand forecast; hours never observed count as closed
+        demand = np.array([[np.nan if v is None else v for v in day] for day in weekday_hours], dtype=np.float64)
+        config = StaffingConfig()
+        plan = optimize_staffing_plan(demand[None], config)
+        return staffing_recommendations(plan, staffing_matrix(current_staffing), config)
 
     async def analyze_event_impact(
         self,
@@ -0,0 +1,12 @@
+from .anomaly import AnomalyConfig, AnomalyScores, detect_anomaly_scores, find_sales_anomalies
+from .forecast import ForecastConfig, ForecastResult, ForecastState, forecast_sales
+from .evidence import EvidenceQuery, SalesEvidenceSource, enhance_with_evidence, score_confidence
+from .basket import CooccurrenceIndex, build_indexes, bundle_opportunities
+from .elasticity import ElasticityConfig, ElasticityEstimates, estimate_elasticities, expected_impact
+from .price_optimizer import MenuPriceSolution, optimize_menu_prices
+from .name_matching import NameMatchIndex, get_name_index, match_menu_items, normalize_name
+from .traffic_cube import TrafficCube, peak_periods
+from .staffing import StaffingConfig, StaffingPlan, optimize_staffing_plan, staffing_recommendations
+from .traffic_stats import (
+    TrafficStatistics, TrafficStatsConfig, traffic_patterns, update_traffic_statistics, window_patterns
+)
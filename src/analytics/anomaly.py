@@ -0,0 +1,243 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pydantic import BaseModel
+
+SALES_METRICS = ["revenue", "transactions", "average_ticket"]
+MAD_SCALE = 0.6745  # Makes MAD comparable to a standard deviation for normal data
+
+# (restaurant ids, metric names, values shaped restaurants x metrics x time)
+SalesSeries = Tuple[List[str], List[str], np.ndarray]
+
+class AnomalyConfig(BaseModel):
+    window_cycles: int = 4  # Seasonal cycles in the trailing robust baseline, e.g. 4 weeks
+    step: Optional[int] = None  # Points between baseline updates; defaults to one cycle
+    threshold: float = 3.5  # Robust z-score beyond which a point is anomalous
+    min_seasonal_cycles: int = 3  # Full cycles needed before seasonality is removed
+    min_scale_fraction: float = 0.01  # MAD floor, relative to the series level
+    min_baseline_fraction: float = 0.75  # Share of a window that must be observed to score against it
+
+def _sorted_nanmedian(ordered: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    # Sorting short float32 rows is faster than np.nanmedian; NaNs sort last,
+    # so the median of the ``valid`` observed points sits at valid // 2
+    index = np.minimum(valid // 2, np.maximum(valid - 1, 0))
+    median = np.take_along_axis(ordered, index[..., None], axis=-1)[..., 0]
+    return np.where(valid > 0, median, np.nan)
+
+class AnomalyScores:
+    """Per-point results of one batched detection pass, all shaped like the input"""
+
+    def __init__(self, scores: np.ndarray, expected: np.ndarray, mask: np.ndarray):
+        self.scores = scores
+        self.expected = expected
+        self.mask = mask
+
+def seasonal_period(frequency: str, length: int, min_cycles: int) -> int:
+    """Weekday seasonality for daily data; weekday-by-hour, else hour of day, for hourly data"""
+    if frequency == "hourly":
+        return 168 if length >= 168 * min_cycles else 24
+    return 7
+
+def seasonal_profile(
+    values: np.ndarray, period: int, phase: int = 0, min_cycles: int = 1
+) -> np.ndarray:
+    """
+    Median of each seasonal position, centred on zero, for every series.
+
+    ``phase`` is the seasonal position of the first point, e.g. the
+    weekday of the first day. Missing points (NaN) are left out; positions
+    observed in fewer than ``min_cycles`` cycles get no adjustment.
+    Returns an array shaped (series, period).
+    """
+    cycles = values.shape[1] // period
+    if cycles == 0:
+        return np.zeros((values.shape[0], period), dtype=values.dtype)
+    # Use the most recent whole cycles, rolled so column j is seasonal position j
+    offset = values.shape[1] - cycles * period
+    recent = values[:, offset:].reshape(values.shape[0], cycles, period).transpose(0, 2, 1)
+    valid = (~np.isnan(recent)).sum(axis=-1)
+    profile = _sorted_nanmedian(np.sort(recent, axis=-1), valid)
+    profile = np.where(valid >= min_cycles, profile, np.nan)
+    profile = np.roll(profile, (phase + offset) % period, axis=1)
+    centre = _sorted_nanmedian(np.sort(profile, axis=-1), (~np.isnan(profile)).sum(axis=-1))
+    return np.nan_to_num(profile - centre[:, None]).astype(values.dtype)
+
+def rolling_robust_baseline(
+    values: np.ndarray, window: int, step: int, min_valid: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trailing median and MAD, refreshed every ``step`` points.
+
+    Refresh k uses points [k * step, k * step + window) and is the
+    baseline for points [k * step + window, (k + 1) * step + window), so
+    a point never contributes to its own baseline. Refreshing once per
+    step rather than per point keeps the sorting work small enough to
+    score tens of thousands of series per call. Missing points (NaN) are
+    left out of both statistics; windows with fewer than ``min_valid``
+    observed points give NaN. Returns two arrays shaped (series, refreshes).
+    """
+    length = values.shape[1]
+    # One copy of the windows, then everything happens in place on it; NaNs sort last
+    windows = np.array(sliding_window_view(values, window, axis=1)[:, :length - window:step])
+    valid = (~np.isnan(windows)).sum(axis=-1)
+    windows.sort(axis=-1)
+    window_median = _sorted_nanmedian(windows, valid)
+    windows -= window_median[..., None]
+    np.abs(windows, out=windows)
+    windows.sort(axis=-1)
+    enough = valid >= max(min_valid, 1)
+    return np.where(enough, window_median, np.nan), np.where(enough, _sorted_nanmedian(windows, valid), np.nan)
+
+def _expand(per_refresh: np.ndarray, step: int, length: int) -> np.ndarray:
+    return np.repeat(per_refresh, step, axis=1)[:, :length]
+
+def detect_anomaly_scores(
+    values: np.ndarray,
+    frequency: str = "daily",
+    phase: int = 0,
+    config: Optional[AnomalyConfig] = None
+) -> AnomalyScores:
+    """
+    Score every point of every series in one vectorized pass.
+
+    ``values`` is shaped (..., time); all leading dimensions, e.g.
+    restaurants x metrics, are flattened into one batch. Seasonality is
+    removed first, then each point gets a robust z-score against the
+    trailing median and MAD of the deseasonalized series. Missing values
+    (NaN), including the left padding of shorter histories, are left out
+    of the profile and baselines and never flagged; points without a
+    sufficiently observed trailing window score zero and have no
+    expected value.
+    """
+    config = config or AnomalyConfig()
+    shape = values.shape
+    # float32 halves memory traffic and enables SIMD sorting; plenty for sales figures
+    data = np.asarray(values, dtype=np.float32).reshape(-1, shape[-1])
+    series, length = data.shape
+    missing = np.isnan(data)
+
+    period = seasonal_period(frequency, length, config.min_seasonal_cycles)
+    if length >= period * config.min_seasonal_cycles:
+        profile = seasonal_profile(data, period, phase, config.min_seasonal_cycles)
+        profile = np.roll(profile, -phase % period, axis=1)
+        seasonal = np.tile(profile, (1, -(-length // period)))[:, :length]
+    else:
+        seasonal = np.zeros_like(data)
+    adjusted = data - seasonal
+
+    scores = np.zeros_like(data)
+    expected = np.full_like(data, np.nan)
+    window = min(config.window_cycles * period, max(length // 2, 1))
+    if length > window:
+        step = config.step or period
+        min_valid = int(np.ceil(config.min_baseline_fraction * window))
+        median, mad = rolling_robust_baseline(adjusted, window, step, min_valid)
+        # Flat windows would make any change infinitely anomalous
+        scale = np.maximum(mad, config.min_scale_fraction * np.abs(median) + 1e-6) / MAD_SCALE
+        tail = length - window
+        baseline = _expand(median, step, tail)
+        scores[:, window:] = (adjusted[:, window:] - baseline) / _expand(scale.astype(np.float32), step, tail)
+        expected[:, window:] = baseline + seasonal[:, window:]
+    # Missing points and points without a usable baseline
+    scores[missing | np.isnan(scores)] = 0.0
+
+    return AnomalyScores(
+        scores=scores.reshape(shape),
+        expected=expected.reshape(shape),
+        mask=(np.abs(scores) > config.threshold).reshape(shape)
+    )
+
+def collect_sales_series(
+    sales_data: Dict[str, Any],
+    metrics: List[str] = SALES_METRICS
+) -> SalesSeries:
+    """
+    Stack every restaurant's metric series from sales data into one array.
+
+    Reads ``series`` (column arrays), ``historical_data.by_restaurant``
+    ({restaurant: {metric: [...]}}) or flat ``historical_data`` metric
+    lists, also accepting ``daily_``/``hourly_`` prefixed names. Shorter
+    series are left-padded with NaN so all series end on the same point.
+    Returns (restaurant ids, metric names, array shaped restaurants x
+    metrics x time). Collect once per analysis and pass the result to
+    the anomaly, forecast and evidence steps.
+    """
+    history = sales_data.get("series") or sales_data.get("historical_data") or {}
+    by_restaurant = history.get("by_restaurant") or {"default": history}
+
+    def lookup(source: Dict[str, Any], metric: str) -> Optional[List[float]]:
+        for key in (metric, f"daily_{metric}", f"hourly_{metric}"):
+            series = source.get(key)
+            if isinstance(series, (list, tuple, np.ndarray)) and len(series):
+                return series
+        return None
+
+    found = [
+        metric for metric in metrics
+        if any(lookup(source, metric) is not None for source in by_restaurant.values())
+    ]
+    restaurants = list(by_restaurant)
+    # Group the columns by length so each group converts with one np.array call
+    by_length: Dict[int, Tuple[List[int], List[int], List[Any]]] = {}
+    for r, source in enumerate(by_restaurant.values()):
+        for m, metric in enumerate(found):
+            series = lookup(source, metric)
+            if series is not None:
+                rows, columns, group = by_length.setdefault(len(series), ([], [], []))
+                rows.append(r)
+                columns.append(m)
+                group.append(series)
+    length = max(by_length, default=0)
+    stacked = np.full((len(restaurants), len(found), length), np.nan)
+    for size, (rows, columns, group) in by_length.items():
+        # None (SQL NULL) converts to NaN
+        stacked[rows, columns, length - size:] = np.array(group, dtype=np.float64)
+    return restaurants, found, stacked
+
+def find_sales_anomalies(
+    sales_data: Dict[str, Any],
+    config: Optional[AnomalyConfig] = None,
+    limit: Optional[int] = None,
+    series: Optional[SalesSeries] = None
+) -> List[Dict[str, Any]]:
+    """Anomalous points across all restaurants and metrics, most severe first"""
+    restaurants, metrics, values = series or collect_sales_series(sales_data)
+    if values.size == 0:
+        return []
+
+    # `start` is the time of the first point of the longest series
+    history = sales_data.get("series") or sales_data.get("historical_data") or {}
+    frequency = history.get("frequency", "daily")
+    step_size = timedelta(hours=1) if frequency == "hourly" else timedelta(days=1)
+    start = history.get("start")
+    start = datetime.fromisoformat(start) if isinstance(start, str) else None
+    if start is None:
+        phase = 0
+    elif frequency == "hourly":
+        phase = start.weekday() * 24 + start.hour
+    else:
+        phase = start.weekday()
+
+    result = detect_anomaly_scores(values, frequency, phase, config)
+    flagged = np.flatnonzero(result.mask)
+    severity = np.abs(result.scores.reshape(-1)[flagged])
+    if limit is not None and len(flagged) > limit:
+        keep = np.argpartition(-severity, limit - 1)[:limit]
+        flagged, severity = flagged[keep], severity[keep]
+    flagged = flagged[np.argsort(-severity, kind="stable")]
+
+    anomalies = []
+    for r, m, t in zip(*np.unravel_index(flagged, values.shape)):
+        score = float(result.scores[r, m, t])
+        anomalies.append({
+            "restaurant_id": restaurants[r],
+            "metric": metrics[m],
+            "index": int(t),
+            "timestamp": (start + step_size * int(t)).isoformat() if start else None,
+            "value": float(values[r, m, t]),
+            "expected": round(float(result.expected[r, m, t]), 2),
+            "score": round(score, 2),
+            "direction": "spike" if score > 0 else "drop"
+        })
+    return anomalies
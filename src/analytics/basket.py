@@ -0,0 +1,197 @@
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from collections import defaultdict
+import numpy as np
+from scipy import sparse
+
+class CooccurrenceIndex:
+    """
+    Sparse item co-occurrence counts over a stream of baskets.
+
+    ``pairs[i, j]`` counts baskets holding both items i and j, and
+    ``item_counts[i]`` the baskets holding item i. New baskets are folded
+    in with one sparse product per batch, and the vocabulary grows as new
+    items appear, so the index can be kept and updated as orders arrive.
+    """
+
+    def __init__(self) -> None:
+        self.items: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.baskets = 0
+        self.item_counts = np.zeros(0, dtype=np.int64)
+        self.pairs = sparse.csr_matrix((0, 0), dtype=np.int64)
+
+    def add_baskets(self, baskets: Iterable[Iterable[str]]) -> "CooccurrenceIndex":
+        rows: List[int] = []
+        columns: List[int] = []
+        count = 0
+        for basket in baskets:
+            distinct = {self._item_id(str(item)) for item in basket if item}
+            if not distinct:
+                continue
+            rows.extend([count] * len(distinct))
+            columns.extend(distinct)
+            count += 1
+        if count == 0:
+            return self
+
+        size = len(self.items)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, columns)), shape=(count, size)
+        )
+        together = (incidence.T @ incidence).tocsr()
+        item_counts = together.diagonal()
+        together.setdiag(0)
+        together.eliminate_zeros()
+
+        if self.pairs.shape[0] < size:
+            self.pairs.resize((size, size))
+            self.item_counts = np.concatenate([self.item_counts, np.zeros(size - len(self.item_counts), dtype=np.int64)])
+        self.pairs = (self.pairs + together).tocsr()
+        self.item_counts += item_counts
+        self.baskets += count
+        return self
+
+    def _item_id(self, item: str) -> int:
+        if item not in self.index:
+            self.index[item] = len(self.items)
+            self.items.append(item)
+        return self.index[item]
+
+    def top_k(
+        self,
+        item: str,
+        k: int = 5,
+        by: str = "lift",
+        min_count: int = 2
+    ) -> List[Dict[str, Any]]:
+        """Items most associated with ``item``, ranked by lift or confidence, from one sparse row"""
+        i = self.index.get(item)
+        if i is None or self.item_counts[i] == 0:
+            return []
+        row = self.pairs.getrow(i)
+        keep = row.data >= min_count
+        partners, together = row.indices[keep], row.data[keep].astype(np.float64)
+        if len(partners) == 0:
+            return []
+
+        confidence = together / self.item_counts[i]
+        lift = confidence * self.baskets / self.item_counts[partners]
+        score = lift if by == "lift" else confidence
+        top = np.argsort(-score, kind="stable")[:k]
+        return [
+            {
+                "item": self.items[partners[j]],
+                "count": int(together[j]),
+                "support": round(float(together[j] / self.baskets), 4),
+                "confidence": round(float(confidence[j]), 4),
+                "lift": round(float(lift[j]), 3),
+            }
+            for j in top
+        ]
+
+    def pair_statistics(self, min_count: int = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every co-occurring pair (i < j) with its count, lift and both directional confidences.
+
+        Returns arrays (i, j, count, lift, confidence) computed over the
+        sparse upper triangle in one pass; ``confidence`` is shaped
+        (2, pairs) holding i -> j then j -> i.
+        """
+        upper = sparse.triu(self.pairs, k=1).tocoo()
+        keep = upper.data >= min_count
+        i, j, together = upper.row[keep], upper.col[keep], upper.data[keep].astype(np.float64)
+        confidence_ij = together / self.item_counts[i]
+        confidence_ji = together / self.item_counts[j]
+        lift = confidence_ij * self.baskets / self.item_counts[j]
+        return i, j, together, lift, np.stack([confidence_ij, confidence_ji])
+
+def order_baskets(sales_data: Dict[str, Any]) -> Iterator[Tuple[str, List[str]]]:
+    """
+    (restaurant, items) baskets from orders and ``popular_items`` snapshots.
+
+    Orders are read from ``orders`` lists with ``items`` (names or dicts
+    with ``name``/``item_name``). Each ``popular_items`` snapshot, a list
+    of names or an {item: quantity} object, counts as one basket of items
+    selling together in that period. Both the top level and the
+    ``series`` and ``historical_data`` sections, with their
+    ``by_restaurant`` entries, are read.
+    """
+    sources = [("default", sales_data)]
+    for key in ("series", "historical_data"):
+        history = sales_data.get(key) or {}
+        sources.append(("default", history))
+        sources += list((history.get("by_restaurant") or {}).items())
+
+    def names(items: Any) -> List[str]:
+        if isinstance(items, dict):
+            return [str(name) for name in items]
+        return [
+            str(item.get("name") or item.get("item_name")) if isinstance(item, dict) else str(item)
+            for item in items or []
+        ]
+
+    for default, source in sources:
+        for order in source.get("orders") or []:
+            if isinstance(order, dict):
+                yield str(order.get("restaurant_id", default)), names(order.get("items"))
+        for snapshot in source.get("popular_items") or []:
+            if isinstance(snapshot, dict) and ("items" in snapshot or "popular_items" in snapshot):
+                restaurant = str(snapshot.get("restaurant_id", default))
+                yield restaurant, names(snapshot.get("items") or snapshot.get("popular_items"))
+            else:
+                yield default, names(snapshot)
+
+def build_indexes(sales_data: Dict[str, Any]) -> Dict[str, CooccurrenceIndex]:
+    """One co-occurrence index per restaurant"""
+    baskets: Dict[str, List[List[str]]] = defaultdict(list)
+    for restaurant, items in order_baskets(sales_data):
+        baskets[restaurant].append(items)
+    return {restaurant: CooccurrenceIndex().add_baskets(b) for restaurant, b in baskets.items()}
+
+def bundle_opportunities(
+    index: CooccurrenceIndex,
+    min_lift: float = 1.2,
+    min_count: int = 3,
+    limit: int = 10,
+    restaurant_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Bundle and cross-sell suggestions from the strongest item associations.
+
+    Pairs bought together more often than chance (lift above ``min_lift``)
+    are ranked by lift weighted by how often they co-occur. The direction
+    with the higher confidence gives the cross-sell: customers ordering
+    the anchor item are the ones to offer the other.
+    """
+    if index.baskets == 0:
+        return []
+    i, j, together, lift, confidence = index.pair_statistics(min_count)
+    keep = lift >= min_lift
+    i, j, together, lift, confidence = i[keep], j[keep], together[keep], lift[keep], confidence[:, keep]
+    if len(i) == 0:
+        return []
+
+    score = np.log(lift) * np.sqrt(together)
+    top = np.argsort(-score, kind="stable")[:limit]
+    forward = confidence[0] >= confidence[1]
+    anchors = np.where(forward, i, j)
+    partners = np.where(forward, j, i)
+    best_confidence = np.maximum(confidence[0], confidence[1])
+
+    opportunities = []
+    for t in top:
+        anchor, partner = index.items[anchors[t]], index.items[partners[t]]
+        opportunities.append({
+            "type": "bundle",
+            "restaurant_id": restaurant_id,
+            "items": [anchor, partner],
+            "anchor_item": anchor,
+            "cross_sell_item": partner,
+            "co_occurrences": int(together[t]),
+            "support": round(float(together[t] / index.baskets), 4),
+            "confidence": round(float(best_confidence[t]), 4),
+            "lift": round(float(lift[t]), 3),
+            "description": f"Customers ordering {anchor} also order {partner} "
+                           f"{best_confidence[t]:.0%} of the time ({lift[t]:.1f}x the usual rate)",
+        })
+    return opportunities
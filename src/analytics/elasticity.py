@@ -0,0 +1,206 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import defaultdict
+import numpy as np
+from pydantic import BaseModel
+
+DEFAULT_ELASTICITY = -1.2  # Typical restaurant menu item, used when a category has no data
+
+class ElasticityConfig(BaseModel):
+    prior_strength: float = 3.0  # Weight of the category average, in typical observations
+    min_observations: int = 3  # Fewer than this and an item relies on its category
+    max_elasticity: float = -0.05  # Demand must fall as price rises
+    min_elasticity: float = -5.0
+
+class ElasticityEstimates:
+    """Fitted log-log demand curves, one entry per item, as parallel arrays"""
+
+    def __init__(
+        self,
+        item_ids: List[str],
+        categories: List[str],
+        elasticity: np.ndarray,
+        intercept: np.ndarray,
+        std_error: np.ndarray,
+        observations: np.ndarray,
+        shrinkage: np.ndarray,
+        baseline_price: np.ndarray,
+        baseline_volume: np.ndarray
+    ):
+        self.item_ids = item_ids
+        self.categories = categories
+        self.elasticity = elasticity
+        self.intercept = intercept
+        self.std_error = std_error
+        self.observations = observations
+        self.shrinkage = shrinkage  # 0 = own data only, 1 = category average only
+        self.baseline_price = baseline_price
+        self.baseline_volume = baseline_volume
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            item_id: {
+                "category": self.categories[i],
+                "elasticity": round(float(self.elasticity[i]), 3),
+                "std_error": round(float(self.std_error[i]), 3) if np.isfinite(self.std_error[i]) else None,
+                "observations": int(self.observations[i]),
+                "shrinkage": round(float(self.shrinkage[i]), 3),
+                "baseline_volume": round(float(self.baseline_volume[i]), 2),
+            }
+            for i, item_id in enumerate(self.item_ids)
+        }
+
+def item_key(item: Dict[str, Any]) -> str:
+    return str(item.get("item_id") or item.get("id") or item.get("name"))
+
+def item_price(item: Dict[str, Any]) -> float:
+    return _number(item.get("current_price", item.get("price")))
+
+def item_cost(item: Dict[str, Any]) -> float:
+    return _number(item.get("unit_cost", item.get("cost")))
+
+def price_history(
+    item_ids: List[str], historical_data: Optional[Dict[str, Any]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack price and volume history into (items, observations) arrays, NaN padded.
+
+    Reads ``items`` ({item_id: {"prices": [...], "volumes": [...]}}) or
+    ``price_history`` rows with item_id, price and quantity (or volume).
+    """
+    history = historical_data or {}
+    series: Dict[str, Tuple[List[float], List[float]]] = defaultdict(lambda: ([], []))
+    for item_id, columns in (history.get("items") or {}).items():
+        volumes = columns.get("volumes") or columns.get("quantities") or columns.get("units_sold") or []
+        prices, target = columns.get("prices") or [], series[str(item_id)]
+        target[0].extend(prices[:len(volumes)])
+        target[1].extend(volumes[:len(prices)])
+    for row in history.get("price_history") or []:
+        volume = row.get("quantity", row.get("volume"))
+        if row.get("price") is not None and volume is not None:
+            target = series[str(row.get("item_id"))]
+            target[0].append(row["price"])
+            target[1].append(volume)
+
+    length = max((len(series[i][0]) for i in item_ids if i in series), default=0)
+    prices = np.full((len(item_ids), length), np.nan)
+    volumes = np.full((len(item_ids), length), np.nan)
+    for row, item_id in enumerate(item_ids):
+        if item_id in series:
+            p, q = series[item_id]
+            prices[row, :len(p)] = p
+            volumes[row, :len(q)] = q
+    return prices, volumes
+
+def estimate_elasticities(
+    menu_items: List[Dict[str, Any]],
+    historical_data: Optional[Dict[str, Any]] = None,
+    config: Optional[ElasticityConfig] = None
+) -> ElasticityEstimates:
+    """
+    Fit log(volume) = a + e * log(price) for every item in one batched pass.
+
+    Sufficient statistics for all items come from masked array sums over
+    (items, observations) arrays. Each item's slope is shrunk toward its
+    category's average elasticity, which enters as ``prior_strength``
+    pseudo-observations, so items with few or barely varying prices
+    borrow from comparable items while well measured items keep their
+    own estimate.
+    """
+    config = config or ElasticityConfig()
+    item_ids = [item_key(item) for item in menu_items]
+    categories = [str(item.get("category") or "uncategorized") for item in menu_items]
+    prices, volumes = price_history(item_ids, historical_data)
+
+    valid = (prices > 0) & (volumes > 0)
+    x = np.log(np.where(valid, prices, 1.0))
+    y = np.log(np.where(valid, volumes, 1.0))
+    n = valid.sum(axis=1).astype(np.float64)
+
+    # Centred sufficient statistics per item
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(n > 0, (x * valid).sum(axis=1) / n, 0.0)
+        y_mean = np.where(n > 0, (y * valid).sum(axis=1) / n, 0.0)
+    dx = np.where(valid, x - x_mean[:, None], 0.0)
+    dy = np.where(valid, y - y_mean[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    sxy = (dx * dy).sum(axis=1)
+
+    # Unshrunk slopes of items with enough varying data give the category averages
+    own = (n >= config.min_observations) & (sxx > 1e-8)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        raw = np.where(own, sxy / sxx, np.nan)
+    raw = np.clip(raw, config.min_elasticity, config.max_elasticity)
+    category_names = sorted(set(categories))
+    category_index = np.array([category_names.index(c) for c in categories], dtype=np.int64)
+    weight = np.where(own, sxx, 0.0)
+    weighted = np.bincount(category_index, np.nan_to_num(raw) * weight, minlength=len(category_names))
+    total = np.bincount(category_index, weight, minlength=len(category_names))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        category_average = np.where(total > 0, weighted / total, DEFAULT_ELASTICITY)
+    prior = category_average[category_index]
+
+    # With centred log prices the least-squares normal equations decouple, so the
+    # whole menu is solved at once; the prior adds k pseudo-observations of slope `prior`
+    typical_variance = float(np.median(sxx[own] / n[own])) if own.any() else 0.01
+    k = config.prior_strength * max(typical_variance, 1e-6)
+    # Items below min_observations take the category average outright
+    shrinkage = np.where(own, k / (sxx + k), 1.0)
+    elasticity = np.where(own, (sxy + k * prior) / (sxx + k), prior)
+    elasticity = np.clip(elasticity, config.min_elasticity, config.max_elasticity)
+    intercept = y_mean - elasticity * x_mean
+
+    residual = np.where(valid, dy - elasticity[:, None] * dx, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = np.where(n > 2, (residual ** 2).sum(axis=1) / (n - 2), np.nan)
+        std_error = np.sqrt(variance / (sxx + k))
+
+    current = np.array([item_price(item) for item in menu_items])
+    recent_volume = _last_valid(np.where(valid, volumes, np.nan))
+    listed_volume = np.array([_number(item.get("units_sold", item.get("volume"))) for item in menu_items])
+    baseline_volume = np.where(np.isfinite(recent_volume), recent_volume, listed_volume)
+
+    return ElasticityEstimates(
+        item_ids=item_ids,
+        categories=categories,
+        elasticity=elasticity,
+        intercept=intercept,
+        std_error=std_error,
+        observations=n.astype(np.int64),
+        shrinkage=shrinkage,
+        baseline_price=current,
+        baseline_volume=np.nan_to_num(baseline_volume)
+    )
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else float("nan")
+
+def _last_valid(values: np.ndarray) -> np.ndarray:
+    """Last non-NaN value of each row, NaN for empty rows"""
+    if values.shape[1] == 0:
+        return np.full(values.shape[0], np.nan)
+    present = ~np.isnan(values)
+    last = values.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+    return np.where(present.any(axis=1), values[np.arange(len(values)), last], np.nan)
+
+def demand_response(
+    current_price: np.ndarray, new_price: np.ndarray, elasticity: np.ndarray, volume: np.ndarray
+) -> np.ndarray:
+    """Volume at ``new_price`` under a constant-elasticity demand curve"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = np.where(current_price > 0, new_price / current_price, 1.0)
+    return volume * ratio ** elasticity
+
+def expected_impact(
+    current_price: np.ndarray,
+    new_price: np.ndarray,
+    elasticity: np.ndarray,
+    volume: np.ndarray,
+    unit_cost: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Per-item revenue, margin and volume changes for price moves, as arrays"""
+    new_volume = demand_response(current_price, new_price, elasticity, volume)
+    return {
+        "revenue_impact": new_price * new_volume - current_price * volume,
+        "margin_impact": (new_price - unit_cost) * new_volume - (current_price - unit_cost) * volume,
+        "volume_impact": new_volume - volume,
+    }
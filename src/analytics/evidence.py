@@ -0,0 +1,223 @@
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, NamedTuple, Optional
+import asyncio
+import json
+import logging
+import numpy as np
+
+from src.analytics.anomaly import SalesSeries, collect_sales_series
+
+logger = logging.getLogger(__name__)
+
+EVIDENCE_KINDS = ["trend", "anomalies", "forecast"]
+EVIDENCE_WEIGHT = 0.4  # Share of the final confidence that comes from evidence
+_METRIC_ALIASES = {
+    "revenue": ["revenue", "sales", "income"],
+    "transactions": ["transactions", "orders", "order volume"],
+    "average_ticket": ["average ticket", "average_ticket", "basket", "order value"],
+}
+
+class EvidenceQuery(NamedTuple):
+    """One piece of evidence; hashable so identical queries from different insights run once"""
+    kind: str
+    metric: str
+    restaurant_id: Optional[str] = None  # None means all restaurants combined
+
+Resolver = Callable[[EvidenceQuery], Awaitable[Optional[Dict[str, Any]]]]
+
+def evidence_queries(
+    insight: Dict[str, Any],
+    metrics: List[str],
+    restaurants: List[str],
+    kinds: List[str] = EVIDENCE_KINDS
+) -> List[EvidenceQuery]:
+    """Evidence an insight needs, from the metrics and restaurants it mentions"""
+    text = " ".join([
+        str(insight.get("title", "")),
+        str(insight.get("description", "")),
+        json.dumps(insight.get("supporting_data", {}), default=str),
+    ]).lower()
+    mentioned = [
+        metric for metric in metrics
+        if any(alias in text for alias in _METRIC_ALIASES.get(metric, [metric]))
+    ]
+    if not mentioned:
+        mentioned = metrics[:1]
+
+    supporting = insight.get("supporting_data") or {}
+    ids = supporting.get("restaurant_ids") or [supporting.get("restaurant_id")]
+    targets = [str(r) for r in ids if r is not None and str(r) in restaurants] or [None]
+    return [
+        EvidenceQuery(kind, metric, restaurant)
+        for kind in kinds for metric in mentioned for restaurant in targets
+    ]
+
+async def run_evidence_queries(
+    queries: Iterable[EvidenceQuery],
+    resolve: Resolver,
+    concurrency: int = 8
+) -> Dict[EvidenceQuery, Optional[Dict[str, Any]]]:
+    """
+    Resolve each distinct query once, at most ``concurrency`` at a time.
+
+    A failing query yields None rather than failing the batch, so one
+    unavailable source only lowers the confidence of insights that use it.
+    """
+    unique = list(dict.fromkeys(queries))
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(query: EvidenceQuery) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await resolve(query)
+            except Exception as e:
+                logger.warning("Evidence query %s failed: %s", query, e)
+                return None
+
+    results = await asyncio.gather(*(run(query) for query in unique))
+    return dict(zip(unique, results))
+
+def score_confidence(
+    base: np.ndarray,
+    strengths: np.ndarray,
+    expected: np.ndarray,
+    evidence_weight: float = EVIDENCE_WEIGHT
+) -> np.ndarray:
+    """
+    Confidence for every insight in one pass.
+
+    ``base`` is each insight's own confidence, ``strengths`` is shaped
+    (insights, queries) with NaN where a query found nothing, and
+    ``expected`` counts the queries each insight asked for. Evidence
+    support is the mean strength scaled by coverage, so insights whose
+    evidence is missing or weak are discounted toward
+    ``(1 - evidence_weight) * base``.
+    """
+    found = np.sum(~np.isnan(strengths), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        coverage = np.where(expected > 0, found / expected, 0.0)
+        support = np.where(found > 0, np.nansum(strengths, axis=1) / np.maximum(found, 1), 0.0)
+    confidence = (1 - evidence_weight) * np.clip(base, 0.0, 1.0) + evidence_weight * support * coverage
+    return np.round(np.clip(confidence, 0.0, 1.0), 3)
+
+class SalesEvidenceSource:
+    """Resolves evidence queries against the sales data already fetched for an analysis"""
+
+    def __init__(self, sales_data: Dict[str, Any], series: Optional[SalesSeries] = None):
+        self.sales_data = sales_data
+        self.restaurants, self.metrics, self.values = series or collect_sales_series(sales_data)
+        self._restaurant_rows = {restaurant: row for row, restaurant in enumerate(self.restaurants)}
+        self._metric_columns = {metric: column for column, metric in enumerate(self.metrics)}
+
+    async def resolve(self, query: EvidenceQuery) -> Optional[Dict[str, Any]]:
+        handler = getattr(self, f"_{query.kind}", None)
+        return handler(query) if handler else None
+
+    def _series(self, query: EvidenceQuery) -> Optional[np.ndarray]:
+        metric_column = self._metric_columns.get(query.metric)
+        if metric_column is None or self.values.size == 0:
+            return None
+        column = self.values[:, metric_column]
+        if query.restaurant_id is None:
+            if query.metric == "average_ticket":
+                return np.nanmean(column, axis=0)
+            return np.nansum(column, axis=0)
+        row = self._restaurant_rows.get(query.restaurant_id)
+        return None if row is None else column[row]
+
+    def _trend(self, query: EvidenceQuery) -> Optional[Dict[str, Any]]:
+        """Recent quarter of the series against the quarter before it"""
+        series = self._series(query)
+        if series is None:
+            return None
+        quarter = len(series) // 4
+        if quarter == 0:
+            return None
+        previous, recent = np.nanmean(series[-2 * quarter:-quarter]), np.nanmean(series[-quarter:])
+        if not np.isfinite(previous) or not np.isfinite(recent) or previous == 0:
+            return None
+        change = float((recent - previous) / abs(previous))
+        return {
+            "type": "trend", "metric": query.metric, "restaurant_id": query.restaurant_id,
+            "previous": round(float(previous), 2), "recent": round(float(recent), 2),
+            "change": round(change, 4),
+            "strength": min(1.0, abs(change) / 0.2),  # A 20% move counts as full support
+        }
+
+    def _anomalies(self, query: EvidenceQuery) -> Optional[Dict[str, Any]]:
+        matches = [
+            anomaly for anomaly in self.sales_data.get("anomalies", [])
+            if anomaly.get("metric") == query.metric
+            and (query.restaurant_id is None or anomaly.get("restaurant_id") == query.restaurant_id)
+        ]
+        if not matches:
+            return None
+        worst = max(abs(anomaly.get("score", 0.0)) for anomaly in matches)
+        return {
+            "type": "anomalies", "metric": query.metric, "restaurant_id": query.restaurant_id,
+            "count": len(matches), "max_score": worst, "examples": matches[:3],
+            "strength": min(1.0, worst / 10),
+        }
+
+    def _forecast(self, query: EvidenceQuery) -> Optional[Dict[str, Any]]:
+        """Forecast direction, with tighter intervals counting as stronger support"""
+        by_restaurant = (self.sales_data.get("forecasts") or {}).get("restaurants", {})
+        restaurants = [query.restaurant_id] if query.restaurant_id is not None else list(by_restaurant)
+        forecasts = [
+            by_restaurant[r][query.metric] for r in restaurants
+            if query.metric in by_restaurant.get(r, {})
+        ]
+        if not forecasts:
+            return None
+        mean = np.nansum([f["forecast"] for f in forecasts], axis=0)
+        width = np.nansum([np.subtract(f["upper"], f["lower"]) for f in forecasts], axis=0)
+        level = float(np.abs(mean).mean())
+        if level == 0:
+            return None
+        return {
+            "type": "forecast", "metric": query.metric, "restaurant_id": query.restaurant_id,
+            "expected_total": round(float(mean.sum()), 2),
+            "relative_interval": round(float(width.mean()) / level, 4),
+            "strength": float(np.clip(1 - width.mean() / (2 * level), 0.0, 1.0)),
+        }
+
+async def enhance_with_evidence(
+    insights: List[Dict[str, Any]],
+    resolve: Resolver,
+    metrics: List[str],
+    restaurants: List[str],
+    concurrency: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Attach ``confidence_score`` and ``supporting_evidence`` to every insight.
+
+    The queries of all insights are collected and deduplicated, resolved
+    concurrently under ``concurrency``, and the confidences scored together.
+    """
+    if not insights:
+        return insights
+    per_insight: List[List[EvidenceQuery]] = [
+        evidence_queries(insight, metrics, restaurants) for insight in insights
+    ]
+    results = await run_evidence_queries(
+        (query for queries in per_insight for query in queries), resolve, concurrency
+    )
+
+    width = max(len(queries) for queries in per_insight) or 1
+    strengths = np.full((len(insights), width), np.nan)
+    for i, queries in enumerate(per_insight):
+        for j, query in enumerate(queries):
+            evidence = results.get(query)
+            if evidence is not None:
+                strengths[i, j] = evidence.get("strength", 0.0)
+    base = np.array([_base_confidence(insight) for insight in insights])
+    expected = np.array([len(queries) for queries in per_insight])
+    confidence = score_confidence(base, strengths, expected)
+
+    for insight, queries, score in zip(insights, per_insight, confidence):
+        insight["confidence_score"] = float(score)
+        insight["supporting_evidence"] = [results[q] for q in queries if results.get(q) is not None]
+    return insights
+
+def _base_confidence(insight: Dict[str, Any]) -> float:
+    value = insight.get("confidence")
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.5
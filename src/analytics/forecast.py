@@ -0,0 +1,423 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from statistics import NormalDist
+import itertools
+import os
+import warnings
+import numpy as np
+from pydantic import BaseModel
+
+from src.analytics.anomaly import SalesSeries, collect_sales_series
+from src.analytics.state_files import locked, save_npz_atomic
+
+MODELS = ["seasonal_naive", "linear_trend", "holt_winters"]
+DEFAULT_STATE_PATH = ".cache/forecast_state.npz"
+FREQUENCY_PERIODS = {"daily": 7, "hourly": 24}
+ANONYMOUS_RESTAURANT = "default"  # collect_sales_series id for series without a restaurant
+
+class ForecastConfig(BaseModel):
+    horizon: int = 14
+    period: Optional[int] = None  # Seasonal cycle length in points; by default 7 for daily, 24 for hourly data
+    interval_level: float = 0.9  # Coverage of the prediction intervals
+    alpha_grid: List[float] = [0.1, 0.3, 0.5, 0.8]  # Holt-Winters level smoothing
+    beta_grid: List[float] = [0.01, 0.1, 0.3]  # Holt-Winters trend smoothing
+    gamma_grid: List[float] = [0.05, 0.2, 0.5]  # Holt-Winters seasonal smoothing
+    error_decay: float = 0.98  # Forgetting factor for one-step errors and trend statistics
+
+    def for_frequency(self, frequency: str = "daily") -> "ForecastConfig":
+        """This config with the seasonal period filled in from the data frequency"""
+        if self.period is not None:
+            return self
+        return self.model_copy(update={"period": FREQUENCY_PERIODS.get(frequency, FREQUENCY_PERIODS["daily"])})
+
+class ForecastResult:
+    """Point forecasts and interval bounds, each shaped (series, horizon)"""
+
+    def __init__(self, ids: List[str], model: List[str], mean: np.ndarray, lower: np.ndarray, upper: np.ndarray):
+        self.ids = ids
+        self.model = model
+        self.mean = mean
+        self.lower = lower
+        self.upper = upper
+
+_STATE_FIELDS = [
+    "count", "last_time",
+    "recent",  # Last `period` observations, indexed by seasonal position
+    "trend_w", "trend_t", "trend_tt", "trend_y", "trend_ty",  # Decayed least-squares sums
+    "alpha", "beta", "gamma", "level", "slope", "season",  # Holt-Winters
+    "error_sum", "error_weight",  # Decayed one-step squared errors, one column per model
+]
+
+class ForecastState:
+    """
+    Fitted state for many series, updated one observation at a time.
+
+    Every model keeps only running quantities: the last seasonal cycle
+    for seasonal-naive, decayed least-squares sums for the linear trend,
+    and level/slope/season components for Holt-Winters. New observations
+    fold into that state directly, so nightly updates never refit from
+    scratch. Each model's one-step-ahead errors are tracked as it goes;
+    they pick the model per series and scale its prediction interval.
+    """
+
+    def __init__(self, ids: List[str], config: ForecastConfig):
+        config = config.for_frequency()
+        n, period = len(ids), config.period
+        self.ids = list(ids)
+        self.config = config
+        self.count = np.zeros(n, dtype=np.int64)
+        self.last_time = np.full(n, np.iinfo(np.int64).min, dtype=np.int64)
+        self.recent = np.full((n, period), np.nan)
+        self.trend_w, self.trend_t, self.trend_tt, self.trend_y, self.trend_ty = np.zeros((5, n))
+        self.alpha, self.beta, self.gamma = np.zeros((3, n))
+        self.level, self.slope = np.zeros((2, n))
+        self.season = np.zeros((n, period))
+        self.error_sum = np.zeros((n, len(MODELS)))
+        self.error_weight = np.zeros((n, len(MODELS)))
+
+    @classmethod
+    def fit(
+        cls,
+        ids: List[str],
+        values: np.ndarray,
+        times: Optional[np.ndarray] = None,
+        config: Optional[ForecastConfig] = None
+    ) -> "ForecastState":
+        """
+        Fit all series at once; ``values`` is (series, time), NaN for gaps.
+
+        Holt-Winters smoothing parameters are chosen per series by running
+        every grid combination side by side and keeping the one with the
+        lowest one-step error.
+        """
+        state = cls(ids, config or ForecastConfig())
+        config = state.config
+        values = np.asarray(values, dtype=np.float64)
+        n, length = values.shape
+        if times is None:
+            times = np.arange(length)
+        period = config.period
+
+        # Holt-Winters grid search: (series, combinations) arrays, one time loop.
+        # float32, in-place updates and season laid out (position, series,
+        # combination) keep each step to a few passes over contiguous memory.
+        grid = np.array(
+            list(itertools.product(config.alpha_grid, config.beta_grid, config.gamma_grid)), dtype=np.float32
+        )
+        alpha, beta, gamma = grid[:, 0], grid[:, 1], grid[:, 2]
+        initial_level, initial_slope, initial_season = _initial_components(values, times, period)
+        shape = (n, len(grid))
+        level = np.repeat(initial_level[:, None], len(grid), axis=1).astype(np.float32)
+        slope = np.repeat(initial_slope[:, None], len(grid), axis=1).astype(np.float32)
+        season = np.repeat(initial_season.T[:, :, None], len(grid), axis=2).astype(np.float32)
+        sse = np.zeros(shape, dtype=np.float32)
+        forecast, error, new_level = np.empty((3,) + shape, dtype=np.float32)
+        observed = ~np.isnan(values)
+        seen = np.zeros(n, dtype=np.int64)
+        for t in range(length):
+            y = values[:, t, None].astype(np.float32)
+            valid = observed[:, t]
+            s = season[times[t] % period]
+            np.add(level, slope, out=forecast)
+            np.add(forecast, s, out=error)
+            np.subtract(y, error, out=error)
+            warm = valid & (seen >= period)
+            sse[warm] += error[warm] ** 2
+            gaps = ~valid
+            if gaps.any():
+                y = np.where(gaps[:, None], 0.0, y).astype(np.float32)
+                kept = level[gaps], slope[gaps], s[gaps]
+            # level' = alpha (y - s) + (1 - alpha) (level + slope), and likewise for slope and season
+            np.subtract(y, s, out=new_level)
+            new_level -= forecast
+            new_level *= alpha
+            new_level += forecast
+            slope *= 1 - beta
+            slope += beta * (new_level - level)
+            s += gamma * (y - new_level - s)
+            level, new_level = new_level, level
+            if gaps.any():
+                # Missing points leave the state as it was
+                level[gaps], slope[gaps], s[gaps] = kept
+            seen += valid
+
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(n)
+        state.alpha, state.beta, state.gamma = alpha[best], beta[best], gamma[best]
+        state.level = level[rows, best].astype(np.float64)
+        state.slope = slope[rows, best].astype(np.float64)
+        state.season = season[:, rows, best].T.astype(np.float64)
+        state.alpha, state.beta, state.gamma = (
+            state.alpha.astype(np.float64), state.beta.astype(np.float64), state.gamma.astype(np.float64)
+        )
+
+        # Replay the other models and the error bookkeeping with the chosen parameters
+        state._observe_all(values, times, update_holt_winters=False)
+        warm_steps = np.maximum(seen - period, 1)
+        state.error_sum[:, 2] = sse[rows, best].astype(np.float64) / warm_steps * state.error_weight[:, 2]
+        return state
+
+    def _observe_all(self, values: np.ndarray, times: np.ndarray, update_holt_winters: bool = True) -> None:
+        for t in range(values.shape[1]):
+            y = values[:, t]
+            self._observe(y, (~np.isnan(y)) & (times[t] > self.last_time), times[t], update_holt_winters)
+
+    def _observe(self, y: np.ndarray, valid: np.ndarray, time: int, update_holt_winters: bool) -> None:
+        config, period = self.config, self.config.period
+        decay = config.error_decay
+        y = np.where(valid, y, 0.0)
+        position = time % period
+
+        # One-step forecasts of every model before seeing y
+        predictions = np.stack([
+            self.recent[:, position],
+            self._trend_at(self.count),
+            self.level + self.slope + self.season[:, position],
+        ], axis=1)
+        scored = valid & (self.count >= period)
+        errors = np.where(scored[:, None], (y[:, None] - predictions) ** 2, 0.0)
+        columns = slice(None) if update_holt_winters else slice(0, 2)
+        self.error_sum[:, columns] = np.where(
+            scored[:, None], decay * self.error_sum[:, columns] + errors[:, columns], self.error_sum[:, columns]
+        )
+        self.error_weight = np.where(scored[:, None], decay * self.error_weight + 1, self.error_weight)
+
+        # Seasonal naive and decayed least squares on the observation index
+        self.recent[:, position] = np.where(valid, y, self.recent[:, position])
+        t = self.count.astype(np.float64)
+        for name, term in (("trend_w", 1.0), ("trend_t", t), ("trend_tt", t * t), ("trend_y", y), ("trend_ty", t * y)):
+            current = getattr(self, name)
+            setattr(self, name, np.where(valid, decay * current + term, current))
+
+        if update_holt_winters:
+            s = self.season[:, position]
+            new_level = self.alpha * (y - s) + (1 - self.alpha) * (self.level + self.slope)
+            new_slope = self.beta * (new_level - self.level) + (1 - self.beta) * self.slope
+            self.season[:, position] = np.where(valid, self.gamma * (y - new_level) + (1 - self.gamma) * s, s)
+            self.level = np.where(valid, new_level, self.level)
+            self.slope = np.where(valid, new_slope, self.slope)
+
+        self.count += valid
+        self.last_time = np.where(valid, time, self.last_time)
+
+    def _trend_coefficients(self) -> Tuple[np.ndarray, np.ndarray]:
+        w, st, stt, sy, sty = self.trend_w, self.trend_t, self.trend_tt, self.trend_y, self.trend_ty
+        denominator = w * stt - st * st
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(np.abs(denominator) > 1e-9, (w * sty - st * sy) / denominator, 0.0)
+            intercept = np.where(w > 0, (sy - slope * st) / w, 0.0)
+        return intercept, slope
+
+    def _trend_at(self, t: np.ndarray) -> np.ndarray:
+        intercept, slope = self._trend_coefficients()
+        return intercept + slope * t
+
+    def update(self, ids: List[str], values: np.ndarray, times: np.ndarray) -> "ForecastState":
+        """
+        Fold new observations into the state without refitting.
+
+        Points at or before a series' last seen time are skipped, so the
+        full recent history can be passed each night. Unknown series are
+        fitted on what is given and added to the state.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        known = {series_id: i for i, series_id in enumerate(self.ids)}
+        rows = [known.get(series_id) for series_id in ids]
+        new = [i for i, row in enumerate(rows) if row is None]
+        existing = [i for i, row in enumerate(rows) if row is not None]
+
+        if existing:
+            subset = self._take([rows[i] for i in existing])
+            later = times[None, :] > subset.last_time[:, None]
+            if later.any():
+                first = int(np.argmax(later.any(axis=0)))
+                subset._observe_all(values[existing, first:], times[first:])
+                self._assign([rows[i] for i in existing], subset)
+        if new:
+            self._append(ForecastState.fit([ids[i] for i in new], values[new], times, self.config))
+        return self
+
+    def forecast(self, horizon: Optional[int] = None) -> ForecastResult:
+        """Forecast every series with the model that has the lowest recent one-step error"""
+        config, period = self.config, self.config.period
+        horizon = horizon or config.horizon
+        n = len(self.ids)
+        steps = np.arange(1, horizon + 1)
+        future = self.count[:, None] + steps[None, :] - 1  # Observation index, for the trend
+        positions = (self.last_time[:, None] + steps[None, :]) % period
+        rows = np.arange(n)[:, None]
+
+        intercept, slope = self._trend_coefficients()
+        means = np.stack([
+            self.recent[rows, positions],
+            intercept[:, None] + slope[:, None] * future,
+            self.level[:, None] + steps[None, :] * self.slope[:, None] + self.season[rows, positions],
+        ], axis=1)  # (series, model, horizon)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rmse = np.sqrt(np.where(self.error_weight > 0, self.error_sum / self.error_weight, np.inf))
+        rmse = np.where(np.isnan(means).any(axis=2), np.inf, rmse)
+        # Without scored history, Holt-Winters from its initial components is the safest guess
+        best = np.where(np.isinf(rmse).all(axis=1), 2, np.argmin(rmse, axis=1))
+
+        # How the one-step error grows with the horizon, per model
+        j = steps[None, :-1] if horizon > 1 else np.zeros((1, 0))
+        hw_terms = (self.alpha[:, None] * (1 + j * self.beta[:, None])
+                    + self.gamma[:, None] * (j % period == 0)) ** 2
+        growth = np.stack([
+            np.sqrt(np.broadcast_to((steps - 1) // period + 1, (n, horizon))),
+            np.ones((n, horizon)),
+            np.sqrt(1 + np.concatenate([np.zeros((n, 1)), np.cumsum(hw_terms, axis=1)], axis=1)),
+        ], axis=1)
+
+        pick = best[:, None, None]
+        mean = np.take_along_axis(means, pick, axis=1)[:, 0]
+        sigma = np.take_along_axis(rmse, best[:, None], axis=1) * np.take_along_axis(growth, pick, axis=1)[:, 0]
+        sigma = np.where(np.isfinite(sigma), sigma, np.nan)
+        z = NormalDist().inv_cdf(0.5 + config.interval_level / 2)
+        return ForecastResult(
+            ids=self.ids,
+            model=[MODELS[b] for b in best],
+            mean=mean,
+            lower=mean - z * sigma,
+            upper=mean + z * sigma
+        )
+
+    def _take(self, rows: List[int]) -> "ForecastState":
+        subset = ForecastState([self.ids[r] for r in rows], self.config)
+        for name in _STATE_FIELDS:
+            setattr(subset, name, getattr(self, name)[rows].copy())
+        return subset
+
+    def _assign(self, rows: List[int], subset: "ForecastState") -> None:
+        for name in _STATE_FIELDS:
+            getattr(self, name)[rows] = getattr(subset, name)
+
+    def _append(self, other: "ForecastState") -> None:
+        self.ids.extend(other.ids)
+        for name in _STATE_FIELDS:
+            setattr(self, name, np.concatenate([getattr(self, name), getattr(other, name)]))
+
+    def save(self, path: str) -> None:
+        """Write to exactly ``path``, replacing it atomically"""
+        save_npz_atomic(
+            path,
+            ids=np.array(self.ids, dtype=str),
+            config=np.array(self.config.model_dump_json()),
+            **{name: getattr(self, name) for name in _STATE_FIELDS}
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ForecastState"]:
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as stored:
+            state = cls(stored["ids"].tolist(), ForecastConfig.model_validate_json(str(stored["config"])))
+            for name in _STATE_FIELDS:
+                setattr(state, name, stored[name])
+        return state
+
+def _initial_components(
+    values: np.ndarray, times: np.ndarray, period: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Holt-Winters starting level, slope and season from the first two cycles"""
+    first = values[:, :period]
+    second = values[:, period:2 * period]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN cycles
+        level = np.nan_to_num(np.nanmean(first, axis=1))
+        if second.shape[1] == period:
+            slope = np.nan_to_num((np.nanmean(second, axis=1) - level) / period)
+        else:
+            slope = np.zeros(len(values))
+    season = np.zeros((len(values), period))
+    season[:, times[:first.shape[1]] % period] = np.nan_to_num(first - level[:, None])
+    return level, slope, season
+
+def state_file(state_path: str, frequency: str, period: int) -> str:
+    """Cache file for one frequency and seasonal period, next to ``state_path``"""
+    path = Path(state_path)
+    return str(path.with_name(f"{path.stem}.{frequency}-{period}{path.suffix or '.npz'}"))
+
+def forecast_sales(
+    sales_data: Dict[str, Any],
+    config: Optional[ForecastConfig] = None,
+    state_path: Optional[str] = None,
+    series: Optional[SalesSeries] = None
+) -> Dict[str, Any]:
+    """
+    Forecast every restaurant's sales metrics, reusing and updating cached state.
+
+    The seasonal period follows the data frequency unless the config sets
+    one. State is cached per frequency and period next to ``state_path``
+    (FORECAST_STATE_PATH, default .cache/forecast_state.npz) when the data
+    carries a ``start`` time, so later calls only fold in points newer
+    than those already seen. The state file is read, updated and
+    replaced under a file lock. Series without a restaurant id are always
+    fitted from scratch, since they cannot be told apart between callers.
+    """
+    restaurants, metrics, values = series or collect_sales_series(sales_data)
+    if values.size == 0:
+        return {}
+
+    history = sales_data.get("series") or sales_data.get("historical_data") or {}
+    frequency = "hourly" if history.get("frequency") == "hourly" else "daily"
+    config = (config or ForecastConfig()).for_frequency(frequency)
+    step = timedelta(hours=1) if frequency == "hourly" else timedelta(days=1)
+    start = history.get("start")
+    start = datetime.fromisoformat(start) if isinstance(start, str) else None
+
+    ids = [f"{r}:{m}" for r in restaurants for m in metrics]
+    flat = values.reshape(len(ids), -1)
+    epoch = datetime(1970, 1, 1, tzinfo=start.tzinfo if start else None)
+    times = np.arange(flat.shape[1])
+    if start is not None:
+        first = int((start - epoch) / step)
+        times = np.arange(first, first + flat.shape[1])
+    cached = [i for i, series_id in enumerate(ids) if not series_id.startswith(f"{ANONYMOUS_RESTAURANT}:")]
+    if start is None or not cached:
+        # Without timestamps or restaurant ids new points cannot be told apart, so nothing is cached
+        states = [ForecastState.fit(ids, flat, times, config)]
+    else:
+        path = state_file(
+            state_path or os.environ.get("FORECAST_STATE_PATH", DEFAULT_STATE_PATH), frequency, config.period
+        )
+        cached_ids = [ids[i] for i in cached]
+        # Concurrent workers would otherwise lose each other's updates
+        with locked(path):
+            state = ForecastState.load(path)
+            if state is None or state.config != config:
+                state = ForecastState.fit(cached_ids, flat[cached], times, config)
+            else:
+                state.update(cached_ids, flat[cached], times)
+            state.save(path)
+        states = [state]
+        anonymous = sorted(set(range(len(ids))) - set(cached))
+        if anonymous:
+            states.append(ForecastState.fit([ids[i] for i in anonymous], flat[anonymous], times, config))
+
+    wanted = set(ids)
+    forecasts: Dict[str, Dict[str, Any]] = {}
+    for state in states:
+        result = state.forecast(config.horizon)
+        for i, series_id in enumerate(result.ids):
+            if series_id not in wanted:
+                continue
+            restaurant, metric = series_id.rsplit(":", 1)
+            last = state.last_time[i] if state.count[i] else times[-1]
+            forecasts.setdefault(restaurant, {})[metric] = {
+                "model": result.model[i],
+                "timestamps": [
+                    (epoch + step * int(last + h)).isoformat()
+                    for h in range(1, config.horizon + 1)
+                ] if start is not None else None,
+                "forecast": np.round(result.mean[i], 2).tolist(),
+                "lower": np.round(result.lower[i], 2).tolist(),
+                "upper": np.round(result.upper[i], 2).tolist(),
+            }
+    return {
+        "horizon": config.horizon,
+        "interval_level": config.interval_level,
+        "restaurants": forecasts
+    }
@@ -0,0 +1,124 @@
+from typing import Dict, Any, List, Sequence, Tuple
+from functools import lru_cache
+import re
+import unicodedata
+import numpy as np
+from scipy import sparse
+
+NGRAM_SIZES = (2, 3)
+_THAI_TONE_MARKS = re.compile("[\u0e48-\u0e4c]")  # Tone marks and thanthakhat, often typed inconsistently
+_ZERO_WIDTH = re.compile("[\u200b-\u200d\ufeff]")
+_SPACES = re.compile(r"\s+")
+_THAI_GAP = re.compile("(?<=[\u0e00-\u0e7f]) (?=[\u0e00-\u0e7f])")  # Thai is written without word spaces
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical form of a menu item name for matching.
+
+    NFKC folds full-width and compatibility characters, case is folded,
+    punctuation and symbols become spaces. For Thai the decomposed sara am
+    is recomposed, tone marks are dropped and spaces between Thai words
+    removed, since listings spell these inconsistently while the base
+    letters carry the dish name.
+    """
+    text = unicodedata.normalize("NFKC", name).casefold()
+    text = _ZERO_WIDTH.sub("", text).replace("\u0e4d\u0e32", "\u0e33")
+    text = _THAI_TONE_MARKS.sub("", text)
+    text = "".join(" " if unicodedata.category(char)[0] in "PS" else char for char in text)
+    return _THAI_GAP.sub("", _SPACES.sub(" ", text).strip())
+
+def name_ngrams(name: str) -> List[str]:
+    """Character n-grams of the normalized name; works without word boundaries, as Thai needs"""
+    text = f" {normalize_name(name)} "
+    return [text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)]
+
+class NameMatchIndex:
+    """
+    TF-IDF weighted character n-gram index over a fixed set of names.
+
+    Names are stored as L2-normalized sparse rows, kept column-major so
+    each query n-gram reads only the names that contain it. Scores are
+    cosine similarities in [0, 1]; all queries of a batch are scored with
+    one sparse product.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self.vocabulary: Dict[str, int] = {}
+        rows, columns = [], []
+        for row, name in enumerate(self.names):
+            for gram in name_ngrams(name):
+                rows.append(row)
+                columns.append(self.vocabulary.setdefault(gram, len(self.vocabulary)))
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, columns)), shape=(len(self.names), len(self.vocabulary))
+        )
+        counts.sum_duplicates()
+        document_frequency = np.bincount(counts.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(self.names)) / (1 + document_frequency)) + 1.0
+        self.matrix = _l2_normalize(counts.multiply(self.idf).tocsr()).T.tocsr()  # (grams, names)
+
+    def vectorize(self, queries: Sequence[str]) -> sparse.csr_matrix:
+        rows, columns = [], []
+        for row, query in enumerate(queries):
+            for gram in name_ngrams(query):
+                column = self.vocabulary.get(gram)
+                if column is not None:  # Unseen n-grams cannot match anything
+                    rows.append(row)
+                    columns.append(column)
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, columns)), shape=(len(queries), len(self.vocabulary))
+        )
+        counts.sum_duplicates()
+        weighted = counts.multiply(self.idf).tocsr()
+        # Unseen n-grams still count toward the query's norm, at the weight of a
+        # never-seen term, so a query sharing only a few n-grams is not overrated
+        unseen = np.array([len(name_ngrams(q)) for q in queries]) - np.asarray(counts.sum(axis=1)).ravel()
+        unseen_idf = np.log(1 + len(self.names)) + 1.0
+        norm = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel() + unseen * unseen_idf ** 2)
+        return sparse.diags(np.where(norm > 0, 1 / np.maximum(norm, 1e-12), 0.0)) @ weighted
+
+    def top_k(
+        self, queries: Sequence[str], k: int = 3, min_score: float = 0.3
+    ) -> List[List[Tuple[int, float]]]:
+        """Best (name index, score) matches for each query, highest first"""
+        if not self.names or not queries:
+            return [[] for _ in queries]
+        scores = (self.vectorize(queries) @ self.matrix).tocsr()
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            candidates, values = scores.indices[start:end], scores.data[start:end]
+            keep = values >= min_score
+            candidates, values = candidates[keep], values[keep]
+            if len(values) > k:
+                best = np.argpartition(-values, k - 1)[:k]
+                candidates, values = candidates[best], values[best]
+            order = np.argsort(-values, kind="stable")
+            results.append([(int(candidates[i]), round(float(values[i]), 4)) for i in order])
+        return results
+
+def _l2_normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norm = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return sparse.diags(np.where(norm > 0, 1 / np.maximum(norm, 1e-12), 0.0)) @ matrix
+
+@lru_cache(maxsize=32)
+def _cached_index(names: Tuple[str, ...]) -> NameMatchIndex:
+    return NameMatchIndex(names)
+
+def get_name_index(names: Sequence[str]) -> NameMatchIndex:
+    """Index for a competitor item set, built once and reused while the set is unchanged"""
+    return _cached_index(tuple(names))
+
+def match_menu_items(
+    menu_names: Sequence[str],
+    candidate_names: Sequence[str],
+    k: int = 3,
+    min_score: float = 0.3
+) -> List[List[Dict[str, Any]]]:
+    """Top-k candidate matches for every menu item name"""
+    index = get_name_index(candidate_names)
+    return [
+        [{"index": i, "name": index.names[i], "score": score} for i, score in matches]
+        for matches in index.top_k(menu_names, k, min_score)
+    ]
@@ -0,0 +1,129 @@
+from typing import Optional
+import numpy as np
+
+from src.analytics.elasticity import demand_response
+
+class MenuPriceSolution:
+    """Chosen price per item and the menu totals it implies"""
+
+    def __init__(
+        self,
+        prices: np.ndarray,
+        volume: np.ndarray,
+        revenue: float,
+        profit: float,
+        margin: Optional[float],
+        feasible: bool
+    ):
+        self.prices = prices
+        self.volume = volume
+        self.revenue = revenue
+        self.profit = profit
+        self.margin = margin  # Over items with a known cost; None if there are none
+        self.feasible = feasible
+
+def price_grid(
+    current_price: np.ndarray,
+    min_adjustment: float,
+    max_adjustment: float,
+    steps: int = 41
+) -> np.ndarray:
+    """
+    Candidate prices shaped (items, candidates).
+
+    Every candidate changes the price by zero or by an amount between
+    ``min_adjustment`` and ``max_adjustment`` in either direction, so the
+    adjustment limits hold for anything the search can pick.
+    """
+    half = max(steps // 2, 1)
+    if max_adjustment <= 0 or max_adjustment < min_adjustment:
+        moves = np.zeros(1)
+    else:
+        smallest = min_adjustment if min_adjustment > 0 else max_adjustment / half
+        magnitudes = np.linspace(smallest, max_adjustment, half)
+        moves = np.concatenate([-magnitudes[::-1], [0.0], magnitudes])
+    return current_price[:, None] + moves[None, :]
+
+def _best_candidates(
+    profit: np.ndarray, revenue: np.ndarray, costed: np.ndarray, target_margin: float, weight: float
+) -> np.ndarray:
+    # Lagrangian of "maximize profit subject to profit >= target * revenue on costed items"
+    objective = profit + weight * np.where(costed[:, None], profit - target_margin * revenue, 0.0)
+    return np.argmax(objective, axis=1)
+
+def _slack(
+    choice: np.ndarray, profit: np.ndarray, revenue: np.ndarray, costed: np.ndarray, target_margin: float
+) -> float:
+    rows = np.arange(len(choice))
+    return float((profit[rows, choice] - target_margin * revenue[rows, choice])[costed].sum())
+
+def optimize_menu_prices(
+    current_price: np.ndarray,
+    unit_cost: np.ndarray,
+    elasticity: np.ndarray,
+    volume: np.ndarray,
+    min_adjustment: float = 0.0,
+    max_adjustment: float = 5.0,
+    target_margin: Optional[float] = None,
+    steps: int = 41,
+    iterations: int = 40
+) -> MenuPriceSolution:
+    """
+    Choose prices for the whole menu at once to maximize profit.
+
+    Every item's demand at every candidate price is evaluated as one
+    (items, candidates) array. The menu margin target, profit over
+    revenue for items with a known cost, couples the items; it is
+    handled with a Lagrange multiplier found by bisection, each step
+    being a vectorized argmax over the grid, so the constraint shapes
+    the search instead of filtering its output. Items with unknown cost
+    (NaN) maximize revenue and do not count toward the margin.
+    """
+    current_price = np.asarray(current_price, dtype=np.float64)
+    costed = np.isfinite(unit_cost)
+    cost = np.where(costed, unit_cost, 0.0)
+
+    candidates = price_grid(current_price, min_adjustment, max_adjustment, steps)
+    demand = demand_response(current_price[:, None], candidates, elasticity[:, None], volume[:, None])
+    revenue = candidates * demand
+    profit = (candidates - cost[:, None]) * demand
+    # Non-positive prices are never allowed
+    profit = np.where(candidates > 0, profit, -np.inf)
+
+    weight, feasible = 0.0, True
+    choice = _best_candidates(profit, revenue, costed, 0.0, 0.0)
+    if target_margin is not None and costed.any():
+        if _slack(choice, profit, revenue, costed, target_margin) < 0:
+            low, high = 0.0, 1.0
+            while high < 1e6 and _slack(
+                _best_candidates(profit, revenue, costed, target_margin, high), profit, revenue, costed, target_margin
+            ) < 0:
+                low, high = high, high * 4
+            feasible = high < 1e6
+            for _ in range(iterations if feasible else 0):
+                middle = (low + high) / 2
+                middle_choice = _best_candidates(profit, revenue, costed, target_margin, middle)
+                if _slack(middle_choice, profit, revenue, costed, target_margin) < 0:
+                    low = middle
+                else:
+                    high = middle
+            weight = high
+        choice = _best_candidates(profit, revenue, costed, target_margin, weight)
+
+    rows = np.arange(len(current_price))
+    chosen_revenue, chosen_profit = revenue[rows, choice], profit[rows, choice]
+    costed_revenue = float(chosen_revenue[costed].sum())
+    margin = float(chosen_profit[costed].sum()) / costed_revenue if costed_revenue > 0 else None
+    return MenuPriceSolution(
+        prices=candidates[rows, choice],
+        volume=demand[rows, choice],
+        revenue=float(chosen_revenue.sum()),
+        profit=float(chosen_profit.sum()),
+        margin=margin,
+        feasible=feasible
+    )
+
+def recommendation_confidence(std_error: np.ndarray, shrinkage: np.ndarray) -> np.ndarray:
+    """Confidence in each item's demand curve: lower when noisy or borrowed from the category"""
+    noise = np.where(np.isfinite(std_error), np.minimum(std_error, 0.5), 0.5)
+    return np.round(np.clip(0.95 - 0.35 * shrinkage - noise, 0.0, 1.0), 3)
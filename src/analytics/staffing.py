@@ -0,0 +1,190 @@
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel
+from scipy import sparse
+from scipy.optimize import LinearConstraint, milp
+
+from src.analytics.traffic_cube import HOURS, WEEKDAYS
+
+class StaffingConfig(BaseModel):
+    service_rate: float = 12.0  # Customers one staff member serves per hour
+    min_staff: int = 1  # Coverage floor whenever the venue sees customers
+    min_shift_hours: int = 4
+    max_shift_hours: int = 8
+    hourly_wage: float = 60.0
+    shift_overhead: float = 0.0  # Fixed cost per shift, favours fewer, longer shifts
+    time_limit: float = 10.0  # Seconds for the integer program before the greedy fallback
+
+class StaffingPlan:
+    """Shifts and hourly coverage for a batch of (location, day) problems, as arrays"""
+
+    def __init__(
+        self,
+        required: np.ndarray,
+        scheduled: np.ndarray,
+        shifts: List[List[Tuple[int, int, int]]],
+        cost: np.ndarray,
+        solver: str
+    ):
+        self.required = required  # (locations, 7, 24)
+        self.scheduled = scheduled  # (locations, 7, 24)
+        self.shifts = shifts  # Per flattened (location, day): (start hour, hours, staff)
+        self.cost = cost  # (locations, 7)
+        self.solver = solver  # "milp" or "greedy"
+
+def required_staff(demand: np.ndarray, config: StaffingConfig) -> np.ndarray:
+    """
+    Staff needed per hour to serve ``demand`` customers.
+
+    NaN demand marks hours the venue is closed, which need nobody; open
+    hours need at least ``min_staff``.
+    """
+    open_hours = np.isfinite(demand)
+    needed = np.ceil(np.where(open_hours, demand, 0.0) / config.service_rate)
+    return np.where(open_hours, np.maximum(needed, config.min_staff), 0).astype(np.int64)
+
+def _shift_patterns(config: StaffingConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every (start, length) shift within a day, and its (24, shifts) coverage matrix"""
+    lengths = np.arange(config.min_shift_hours, config.max_shift_hours + 1)
+    starts, sizes = np.meshgrid(np.arange(HOURS), lengths, indexing="ij")
+    keep = starts + sizes <= HOURS
+    starts, sizes = starts[keep], sizes[keep]
+    hours = np.arange(HOURS)[:, None]
+    coverage = (hours >= starts) & (hours < starts + sizes)
+    return starts, sizes, coverage.astype(np.float64)
+
+def _solve_milp(
+    required: np.ndarray, config: StaffingConfig
+) -> Optional[np.ndarray]:
+    """Shift counts for every problem from one block-diagonal integer program"""
+    starts, sizes, coverage = _shift_patterns(config)
+    problems = required.shape[0]
+    matrix = sparse.kron(sparse.identity(problems, format="csr"), sparse.csr_matrix(coverage), format="csr")
+    cost = np.tile(sizes * config.hourly_wage + config.shift_overhead, problems)
+    result = milp(
+        cost,
+        constraints=LinearConstraint(matrix, lb=required.ravel().astype(np.float64), ub=np.inf),
+        integrality=np.ones(len(cost)),
+        options={"time_limit": config.time_limit},
+    )
+    if result.status != 0 or result.x is None:
+        return None
+    return np.round(result.x).astype(np.int64).reshape(problems, len(starts))
+
+def _solve_greedy(required: np.ndarray, config: StaffingConfig) -> np.ndarray:
+    """
+    Left-to-right cover: at the first uncovered hour start as many shifts as are short.
+
+    Each shift runs through the following hours that are still short,
+    between the minimum and maximum length, and is moved earlier if it
+    would run past midnight. Used when the integer program fails.
+    """
+    starts, sizes, _ = _shift_patterns(config)
+    pattern = {(int(s), int(l)): i for i, (s, l) in enumerate(zip(starts, sizes))}
+    counts = np.zeros((required.shape[0], len(starts)), dtype=np.int64)
+    for p, need in enumerate(required):
+        covered = np.zeros(HOURS, dtype=np.int64)
+        for hour in range(HOURS):
+            short = need[hour] - covered[hour]
+            if short <= 0:
+                continue
+            run = 1
+            while hour + run < HOURS and need[hour + run] > covered[hour + run]:
+                run += 1
+            length = int(np.clip(run, config.min_shift_hours, config.max_shift_hours))
+            start = min(hour, HOURS - length)
+            counts[p, pattern[(start, length)]] += short
+            covered[start:start + length] += short
+    return counts
+
+def optimize_staffing_plan(demand: np.ndarray, config: Optional[StaffingConfig] = None) -> StaffingPlan:
+    """
+    Minimum-cost shifts covering hourly demand for many locations and days.
+
+    ``demand`` holds expected customers shaped (locations, 7, 24), NaN
+    where closed. Every (location, day) is a set-cover over all shifts of
+    allowed length; shift-coverage matrices have consecutive ones, so the
+    integer program is solved at its LP relaxation and all problems go to
+    the solver together as one block-diagonal model.
+    """
+    config = config or StaffingConfig()
+    demand = np.asarray(demand, dtype=np.float64)
+    required = required_staff(demand, config)
+    flat = required.reshape(-1, HOURS)
+
+    starts, sizes, coverage = _shift_patterns(config)
+    counts, solver = _solve_milp(flat, config), "milp"
+    if counts is None:
+        counts, solver = _solve_greedy(flat, config), "greedy"
+
+    scheduled = (counts @ coverage.T.astype(np.int64)).reshape(required.shape)
+    cost = (counts @ (sizes * config.hourly_wage + config.shift_overhead)).reshape(required.shape[:2])
+    shifts = [
+        [(int(starts[i]), int(sizes[i]), int(row[i])) for i in np.flatnonzero(row)]
+        for row in counts
+    ]
+    return StaffingPlan(required, scheduled, shifts, cost, solver)
+
+def staffing_matrix(current_staffing: Dict[str, List[Any]]) -> np.ndarray:
+    """
+    (7, 24) current staff from StaffingLevel lists keyed by weekday name or ISO date.
+
+    Hours that are not listed count as unstaffed.
+    """
+    current = np.zeros((7, HOURS), dtype=np.int64)
+    for key, levels in current_staffing.items():
+        name = str(key).lower()
+        if name in WEEKDAYS:
+            weekday = WEEKDAYS.index(name)
+        else:
+            weekday = int((np.datetime64(name[:10], "D").astype(np.int64) + 3) % 7)
+        for level in levels:
+            hour = level["hour"] if isinstance(level, dict) else level.hour
+            staff = level["current_staff"] if isinstance(level, dict) else level.current_staff
+            current[weekday, hour] = staff
+    return current
+
+def staffing_recommendations(
+    plan: StaffingPlan, current: np.ndarray, config: StaffingConfig, location: int = 0
+) -> Dict[str, Any]:
+    """Per-day shifts and hourly changes against ``current`` staffing, with savings"""
+    required, scheduled = plan.required[location], plan.scheduled[location]
+    recommendations = []
+    for day in range(7):
+        changes = np.flatnonzero(scheduled[day] != current[day])
+        if len(changes) == 0:
+            continue
+        recommendations.append({
+            "weekday": WEEKDAYS[day],
+            "shifts": [
+                {"start_hour": start, "hours": hours, "staff": staff}
+                for start, hours, staff in plan.shifts[location * 7 + day]
+            ],
+            "hourly_changes": [
+                {
+                    "hour": int(hour),
+                    "current_staff": int(current[day, hour]),
+                    "recommended_staff": int(scheduled[day, hour]),
+                    "required_staff": int(required[day, hour]),
+                }
+                for hour in changes
+            ],
+        })
+
+    current_hours, planned_hours = int(current.sum()), int(scheduled.sum())
+    understaffed = current < required
+    return {
+        "recommendations": recommendations,
+        "efficiency_gains": {
+            "current_staff_hours": current_hours,
+            "recommended_staff_hours": planned_hours,
+            "understaffed_hours_resolved": int(understaffed.sum()),
+            "overstaffed_hours_removed": int(np.maximum(current - np.maximum(scheduled, required), 0).sum()),
+            "solver": plan.solver,
+        },
+        "cost_impact": {
+            "current_weekly_cost": round(current_hours * config.hourly_wage, 2),
+            "recommended_weekly_cost": round(float(plan.cost[location].sum()), 2),
+            "weekly_change": round(float(plan.cost[location].sum()) - current_hours * config.hourly_wage, 2),
+        },
+    }
@@ -0,0 +1,36 @@
+from typing import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import fcntl
+import os
+import tempfile
+import numpy as np
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on ``path`` across processes, e.g. around load, update and save"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def save_npz_atomic(path: str, **arrays: np.ndarray) -> None:
+    """
+    Write ``arrays`` to exactly ``path``, replacing it atomically.
+
+    The file is written next to ``path`` and renamed over it, so readers
+    never see a partial file.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=Path(path).parent, prefix=f".{Path(path).name}.")
+    try:
+        # Saving through a file object keeps NumPy from appending .npz to the name
+        with os.fdopen(handle, "wb") as stored:
+            np.savez(stored, **arrays)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
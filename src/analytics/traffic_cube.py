@@ -0,0 +1,196 @@
+from typing import Dict, Any, List, Optional, Sequence, Type
+import warnings
+import numpy as np
+
+TRAFFIC_METRICS = ["customer_count", "average_dwell_time", "conversion_rate", "peak_capacity"]
+HOURS = 24
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+class TrafficCube:
+    """
+    Dense traffic history: ``values[day, hour, metric]`` over consecutive dates.
+
+    Days or hours without data are NaN, so reductions use the nan-aware
+    NumPy functions. ``dates`` is a datetime64[D] index and ``weekdays``
+    the matching Monday=0 weekday of every row. Per-day fields that are
+    not hourly metrics (totals, weather, events) ride along so the cube
+    converts back to the pydantic models losslessly.
+    """
+
+    def __init__(
+        self,
+        start: np.datetime64,
+        values: np.ndarray,
+        total_customers: Optional[np.ndarray] = None,
+        weather: Optional[List[Optional[Dict[str, Any]]]] = None,
+        events: Optional[List[List[Dict[str, Any]]]] = None
+    ):
+        days = values.shape[0]
+        self.dates = np.datetime64(start, "D") + np.arange(days)
+        self.values = values
+        self.total_customers = total_customers if total_customers is not None else np.full(days, np.nan)
+        self.weather = weather if weather is not None else [None] * days
+        self.events = events if events is not None else [[] for _ in range(days)]
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        # 1970-01-01 was a Thursday
+        return (self.dates.astype(np.int64) + 3) % 7
+
+    @property
+    def observed(self) -> np.ndarray:
+        """Days with at least one hourly record"""
+        return ~np.isnan(self.values[:, :, 0]).all(axis=1)
+
+    def metric(self, name: str) -> np.ndarray:
+        """(days, hours) view of one metric"""
+        return self.values[:, :, TRAFFIC_METRICS.index(name)]
+
+    @classmethod
+    def from_days(cls, days: Sequence[Any]) -> "TrafficCube":
+        """Build from DayTraffic models (or dicts of the same shape), in any date order"""
+        if not days:
+            return cls(np.datetime64("1970-01-01"), np.full((0, HOURS, len(TRAFFIC_METRICS)), np.nan, dtype=np.float64))
+
+        def field(record: Any, name: str) -> Any:
+            return record[name] if isinstance(record, dict) else getattr(record, name)
+
+        day_index = np.array([np.datetime64(field(day, "date")[:10], "D") for day in days])
+        start = day_index.min()
+        offsets = (day_index - start).astype(np.int64)
+        length = int(offsets.max()) + 1
+
+        # Flatten all hourly records into parallel lists, then scatter them in one assignment
+        rows, hours, records = [], [], []
+        for offset, day in zip(offsets.tolist(), days):
+            for hourly in field(day, "hourly_breakdown"):
+                rows.append(offset)
+                hours.append(field(hourly, "hour"))
+                records.append([float(field(hourly, name)) for name in TRAFFIC_METRICS])
+        values = np.full((length, HOURS, len(TRAFFIC_METRICS)), np.nan, dtype=np.float64)
+        if records:
+            values[np.array(rows), np.array(hours)] = np.array(records, dtype=np.float64)
+
+        total_customers = np.full(length, np.nan)
+        total_customers[offsets] = [field(day, "total_customers") for day in days]
+        weather: List[Optional[Dict[str, Any]]] = [None] * length
+        events: List[List[Dict[str, Any]]] = [[] for _ in range(length)]
+        for offset, day in zip(offsets.tolist(), days):
+            weather[offset] = field(day, "weather_conditions")
+            events[offset] = list(field(day, "local_events") or [])
+        return cls(start, values, total_customers, weather, events)
+
+    def to_days(self, day_type: Type[Any], hour_type: Type[Any]) -> List[Any]:
+        """
+        Rebuild the day models, e.g. ``cube.to_days(DayTraffic, HourlyTraffic)``.
+
+        Values came from validated models, so they are constructed without
+        revalidation; calendar gaps filled in by the cube are skipped.
+        """
+        days = []
+        customers, dwell, conversion, peak = (self.values[:, :, i] for i in range(len(TRAFFIC_METRICS)))
+        present = ~np.isnan(customers)
+        for row in np.flatnonzero(self.observed | ~np.isnan(self.total_customers)):
+            breakdown = [
+                hour_type.model_construct(
+                    hour=int(hour),
+                    customer_count=int(customers[row, hour]),
+                    average_dwell_time=float(dwell[row, hour]),
+                    conversion_rate=float(conversion[row, hour]),
+                    peak_capacity=bool(peak[row, hour])
+                )
+                for hour in np.flatnonzero(present[row])
+            ]
+            total = self.total_customers[row]
+            days.append(day_type.model_construct(
+                date=str(self.dates[row]),
+                total_customers=int(total) if np.isfinite(total) else int(np.nansum(customers[row])),
+                hourly_breakdown=breakdown,
+                weather_conditions=self.weather[row],
+                local_events=self.events[row]
+            ))
+        return days
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> "TrafficCube":
+        """Days from ``start`` to ``end`` inclusive, as a view on the same arrays"""
+        first = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start[:10], "D")))
+        last = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end[:10], "D"), side="right"))
+        return TrafficCube(
+            self.dates[first] if first < len(self.dates) else np.datetime64("1970-01-01"),
+            self.values[first:last],
+            self.total_customers[first:last],
+            self.weather[first:last],
+            self.events[first:last]
+        )
+
+    def hourly_profile(self, name: str = "customer_count", statistic: str = "mean") -> np.ndarray:
+        """Per-hour mean (or 'p95'/'max') across days, shaped (24,)"""
+        data = self.metric(name)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # Hours never observed stay NaN
+            if statistic == "p95":
+                return np.nanpercentile(data, 95, axis=0)
+            if statistic == "max":
+                return np.nanmax(data, axis=0)
+            return np.nanmean(data, axis=0)
+
+    def weekday_hour_profile(self, name: str = "customer_count") -> np.ndarray:
+        """Mean per weekday and hour, shaped (7, 24)"""
+        data = self.metric(name)
+        present = ~np.isnan(data)
+        sums = np.zeros((7, HOURS))
+        counts = np.zeros((7, HOURS))
+        np.add.at(sums, self.weekdays, np.where(present, data, 0.0))
+        np.add.at(counts, self.weekdays, present)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def daily_totals(self) -> np.ndarray:
+        """Customers per day from the hourly counts; NaN for days without data"""
+        customers = self.metric("customer_count")
+        return np.where(self.observed, np.nansum(customers, axis=1), np.nan)
+
+def peak_periods(
+    hourly_profile: Dict[str, List[Optional[float]]],
+    venue_capacity: Optional[int] = None,
+    peak_quantile: float = 0.75,
+    bottleneck_utilization: float = 0.85
+) -> Dict[str, Any]:
+    """
+    Peak hours, bottlenecks and capacity utilization from the hourly profile.
+
+    Peaks are hours at or above the ``peak_quantile`` of mean traffic.
+    Bottlenecks are hours whose 95th percentile load reaches
+    ``bottleneck_utilization`` of the venue capacity, or that were flagged
+    at peak capacity on at least half of the days.
+    """
+    def array(name: str) -> np.ndarray:
+        return np.array([np.nan if v is None else v for v in hourly_profile.get(name, [None] * HOURS)], dtype=np.float64)
+
+    mean, p95, flagged = array("mean_customers"), array("p95_customers"), array("peak_capacity_share")
+    if not np.isfinite(mean).any():
+        return {"peak_hours": [], "bottlenecks": [], "capacity_utilization": {}}
+
+    threshold = np.nanquantile(mean, peak_quantile)
+    peak_hours = np.flatnonzero(np.nan_to_num(mean, nan=-np.inf) >= threshold)
+    utilization = p95 / venue_capacity if venue_capacity else np.full(HOURS, np.nan)
+    bottleneck = (np.nan_to_num(utilization) >= bottleneck_utilization) | (np.nan_to_num(flagged) >= 0.5)
+
+    return {
+        "peak_hours": [
+            {"hour": int(h), "average_customers": round(float(mean[h]), 1)}
+            for h in peak_hours[np.argsort(-mean[peak_hours], kind="stable")]
+        ],
+        "bottlenecks": [
+            {
+                "hour": int(h),
+                "p95_customers": None if np.isnan(p95[h]) else round(float(p95[h]), 1),
+                "utilization": None if np.isnan(utilization[h]) else round(float(utilization[h]), 3),
+                "peak_capacity_share": None if np.isnan(flagged[h]) else round(float(flagged[h]), 3),
+            }
+            for h in np.flatnonzero(bottleneck)
+        ],
+        "capacity_utilization": {
+            str(h): round(float(utilization[h]), 3) for h in range(HOURS) if np.isfinite(utilization[h])
+        },
+    }
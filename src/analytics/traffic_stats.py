@@ -0,0 +1,356 @@
+from typing import Dict, Any, List, Optional, Sequence
+import os
+import warnings
+import numpy as np
+from pydantic import BaseModel
+
+from src.analytics.state_files import locked, save_npz_atomic
+from src.analytics.traffic_cube import HOURS, TRAFFIC_METRICS, WEEKDAYS, TrafficCube
+
+DEFAULT_STATS_PATH = ".cache/traffic_stats.npz"
+_NO_DAY = np.iinfo(np.int64).min
+_P95_Z = 1.645  # One-sided 95% point of the normal, for p95 from mean and deviation
+
+class TrafficStatsConfig(BaseModel):
+    ewma_alpha: float = 0.2  # Per weekday-hour cell, so one observation a week
+
+_STATS_FIELDS = [
+    "count", "mean", "m2", "ewma", "ewma_weight", "minimum", "maximum",
+    "day_count", "day_total", "trend_sums", "first_day", "last_day"
+]
+
+def _day_number(day: Any) -> int:
+    value = day["date"] if isinstance(day, dict) else day.date
+    return int(np.datetime64(value[:10], "D").astype(np.int64))
+
+def _later_days(counted: set, late: Sequence[Any]) -> np.ndarray:
+    """For each day of the cube built from ``late``, the counted days on the same weekday after it"""
+    days = np.array(sorted(counted))
+    numbers = [_day_number(day) for day in late]
+    cube_days = np.arange(min(numbers), max(numbers) + 1)
+    same_weekday = (days[None, :] - cube_days[:, None]) % 7 == 0
+    return (same_weekday & (days[None, :] > cube_days[:, None])).sum(axis=1)
+
+class TrafficStatistics:
+    """
+    Streaming traffic statistics per location, weekday and hour.
+
+    Cells are shaped (locations, 7, 24, metrics) and hold a Welford count,
+    mean and sum of squared deviations, a bias-corrected EWMA, and the
+    minimum and maximum. Per weekday the number of days and their summed
+    customers are kept, and per location the running sums of a linear fit
+    of daily customers on the day number, plus the set of days already
+    counted. New days are merged in batches with Chan's parallel update,
+    which holds in any order, so analysis reads 168 cells per location
+    however long the history grows. ``config`` applies to locations added
+    later; each location keeps the config it was built with.
+    """
+
+    def __init__(self, ids: List[str], config: TrafficStatsConfig):
+        self.ids = list(ids)
+        self.config = config
+        self.configs = [config for _ in self.ids]
+        self.seen_days: List[set] = [set() for _ in self.ids]
+        locations, shape = len(self.ids), (len(self.ids), 7, HOURS, len(TRAFFIC_METRICS))
+        self.count = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.ewma = np.zeros(shape)
+        self.ewma_weight = np.zeros(shape)
+        self.minimum = np.full(shape, np.inf)
+        self.maximum = np.full(shape, -np.inf)
+        self.day_count = np.zeros((locations, 7))
+        self.day_total = np.zeros((locations, 7))
+        self.trend_sums = np.zeros((locations, 5))  # n, sum t, sum t^2, sum y, sum t*y
+        self.first_day = np.full(locations, _NO_DAY, dtype=np.int64)  # Origin of the trend fit
+        self.last_day = np.full(locations, _NO_DAY, dtype=np.int64)
+
+    def row(self, location: str) -> int:
+        """Index of ``location``, adding empty accumulators the first time it is seen"""
+        if location not in self.ids:
+            empty = TrafficStatistics([location], self.config)
+            self.ids.append(location)
+            self.configs.append(self.config)
+            self.seen_days.append(set())
+            for name in _STATS_FIELDS:
+                setattr(self, name, np.concatenate([getattr(self, name), getattr(empty, name)]))
+        return self.ids.index(location)
+
+    def reset(self, location: str, config: TrafficStatsConfig) -> None:
+        """Empty the accumulators of ``location`` and rebuild them under ``config``"""
+        row = self.row(location)
+        empty = TrafficStatistics([location], config)
+        for name in _STATS_FIELDS:
+            getattr(self, name)[row] = getattr(empty, name)[0]
+        self.configs[row] = config
+        self.seen_days[row] = set()
+
+    def update(
+        self,
+        location: str,
+        days: Sequence[Any],
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> "TrafficStatistics":
+        """
+        Fold in DayTraffic records (models or dicts) not yet counted for ``location``.
+
+        Days already counted are skipped, so the same history can be passed
+        on every run without double counting; late days older than the
+        newest one counted are merged like any other. Only days between
+        ``start`` and ``end`` (ISO dates, inclusive) are used when given.
+        """
+        row = self.row(location)
+        seen = self.seen_days[row]
+        first = _day_number({"date": start}) if start else _NO_DAY
+        last = _day_number({"date": end}) if end else np.iinfo(np.int64).max
+        # The last record of a repeated date wins, as in TrafficCube.from_days
+        new = {
+            number: day for number, day in ((_day_number(day), day) for day in days)
+            if number not in seen and first <= number <= last
+        }
+        if not new:
+            return self
+        late = [day for number, day in new.items() if number <= self.last_day[row]]
+        fresh = [day for number, day in new.items() if number > self.last_day[row]]
+        if fresh:
+            self.fold(row, TrafficCube.from_days(fresh))
+        if late:
+            self.fold(row, TrafficCube.from_days(late), later=_later_days(seen | set(new), late))
+        seen.update(new)
+        return self
+
+    def fold(self, row: int, cube: TrafficCube, later: Optional[np.ndarray] = None) -> None:
+        """
+        Merge the days of ``cube`` into the accumulators of ``row``.
+
+        Days are taken to follow everything counted so far unless
+        ``later`` gives, per cube day, how many counted days on the same
+        weekday come after it; such late days enter the EWMA with the
+        weight their position earns and leave newer observations undecayed.
+        """
+        values, weekdays = cube.values, cube.weekdays
+        alpha = self.configs[row].ewma_alpha
+        decay = 1.0 - alpha
+        for weekday in np.unique(weekdays):
+            batch = values[weekdays == weekday]
+            present = np.isfinite(batch)
+            k = present.sum(axis=0).astype(np.float64)
+            if not k.any():
+                continue
+            data = np.where(present, batch, 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                batch_mean = np.where(k > 0, data.sum(axis=0) / k, 0.0)
+            batch_m2 = (np.where(present, batch - batch_mean, 0.0) ** 2).sum(axis=0)
+
+            # Chan et al.: merge the batch's mean and squared deviations into the running ones
+            count, mean = self.count[row, weekday], self.mean[row, weekday]
+            total = count + k
+            with np.errstate(invalid="ignore", divide="ignore"):
+                delta = batch_mean - mean
+                share = np.where(total > 0, k / total, 0.0)
+            self.m2[row, weekday] += batch_m2 + delta ** 2 * count * share
+            self.mean[row, weekday] = mean + delta * share
+            self.count[row, weekday] = total
+
+            if later is None:
+                # Later observations in the batch discount earlier ones, one step per observation
+                steps = np.cumsum(present[::-1], axis=0)[::-1] - present
+                carried = decay ** k * self.ewma_weight[row, weekday]
+            else:
+                steps = later[weekdays == weekday][:, None, None]
+                carried = self.ewma_weight[row, weekday]
+            weights = np.where(present, alpha * decay ** steps, 0.0)
+            weight = carried + weights.sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.ewma[row, weekday] = np.where(
+                    weight > 0, (carried * self.ewma[row, weekday] + (weights * data).sum(axis=0)) / weight, 0.0
+                )
+            self.ewma_weight[row, weekday] = weight
+
+            self.minimum[row, weekday] = np.fmin(self.minimum[row, weekday], np.where(present, batch, np.inf).min(axis=0))
+            self.maximum[row, weekday] = np.fmax(self.maximum[row, weekday], np.where(present, batch, -np.inf).max(axis=0))
+
+        totals = cube.daily_totals()
+        observed = np.isfinite(totals)
+        if not observed.any():
+            return
+        self.day_count[row] += np.bincount(weekdays[observed], minlength=7)
+        self.day_total[row] += np.bincount(weekdays[observed], totals[observed], minlength=7)
+        days = cube.dates[observed].astype(np.int64)
+        if self.first_day[row] == _NO_DAY:
+            self.first_day[row] = days[0]
+        t, y = (days - self.first_day[row]).astype(np.float64), totals[observed]
+        self.trend_sums[row] += [len(t), t.sum(), (t * t).sum(), y.sum(), (t * y).sum()]
+        self.last_day[row] = max(self.last_day[row], days[-1])
+
+    def variance(self, row: int) -> np.ndarray:
+        """Sample variance per (weekday, hour, metric); NaN with fewer than two observations"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count[row] > 1, self.m2[row] / (self.count[row] - 1), np.nan)
+
+    def hourly(self, row: int, metric: str = "customer_count") -> Dict[str, np.ndarray]:
+        """Mean, deviation and EWMA per hour, pooling the weekday cells"""
+        m = TRAFFIC_METRICS.index(metric)
+        count, mean, m2 = self.count[row, :, :, m], self.mean[row, :, :, m], self.m2[row, :, :, m]
+        ewma, weight = self.ewma[row, :, :, m], self.ewma_weight[row, :, :, m]
+        total = count.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pooled = np.where(total > 0, (count * mean).sum(axis=0) / total, np.nan)
+            spread = (m2 + count * (mean - pooled) ** 2).sum(axis=0)
+            std = np.sqrt(np.where(total > 1, spread / (total - 1), np.nan))
+            recent = np.where(total > 0, (weight * ewma).sum(axis=0) / weight.sum(axis=0), np.nan)
+        return {"mean": pooled, "std": std, "ewma": recent}
+
+    def weekday_hour_mean(self, row: int, metric: str = "customer_count") -> np.ndarray:
+        m = TRAFFIC_METRICS.index(metric)
+        return np.where(self.count[row, :, :, m] > 0, self.mean[row, :, :, m], np.nan)
+
+    def save(self, path: str) -> None:
+        """Write to exactly ``path``, replacing it atomically"""
+        seen_rows = [np.full(len(days), row, dtype=np.int64) for row, days in enumerate(self.seen_days)]
+        seen_days = [np.array(sorted(days), dtype=np.int64) for days in self.seen_days]
+        save_npz_atomic(
+            path,
+            ids=np.array(self.ids, dtype=str),
+            config=np.array(self.config.model_dump_json()),
+            configs=np.array([config.model_dump_json() for config in self.configs], dtype=str),
+            seen_rows=np.concatenate(seen_rows or [np.zeros(0, dtype=np.int64)]),
+            seen_days=np.concatenate(seen_days or [np.zeros(0, dtype=np.int64)]),
+            **{name: getattr(self, name) for name in _STATS_FIELDS}
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TrafficStatistics"]:
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as stored:
+            stats = cls(stored["ids"].tolist(), TrafficStatsConfig.model_validate_json(str(stored["config"])))
+            stats.configs = [TrafficStatsConfig.model_validate_json(config) for config in stored["configs"].tolist()]
+            for row, day in zip(stored["seen_rows"].tolist(), stored["seen_days"].tolist()):
+                stats.seen_days[row].add(day)
+            for name in _STATS_FIELDS:
+                setattr(stats, name, stored[name])
+        return stats
+
+def _rounded(values: np.ndarray, digits: int = 2) -> List[Optional[float]]:
+    return [None if not np.isfinite(v) else round(float(v), digits) for v in values]
+
+def traffic_patterns(stats: TrafficStatistics, location: str) -> Dict[str, Any]:
+    """Trends, weekday seasonality and hourly profiles read from the accumulators"""
+    if location not in stats.ids:
+        return {"patterns": [], "trends": {}, "seasonality": {}}
+    row = stats.ids.index(location)
+    day_count, day_total = stats.day_count[row], stats.day_total[row]
+    days = float(day_count.sum())
+    if days == 0:
+        return {"patterns": [], "trends": {}, "seasonality": {}}
+
+    overall = float(day_total.sum()) / days
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weekday_means = np.where(day_count > 0, day_total / day_count, np.nan)
+    weekday_index = weekday_means / overall if overall > 0 else np.full(7, np.nan)
+
+    # Least-squares slope of daily customers from the running sums
+    n, st, stt, sy, sty = stats.trend_sums[row]
+    denominator = n * stt - st * st
+    slope = float((n * sty - st * sy) / denominator) if n >= 2 and denominator > 0 else 0.0
+
+    customers = stats.hourly(row)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        recent, average = np.nansum(customers["ewma"]), np.nansum(customers["mean"])
+    change = float(recent / average - 1) if average > 0 else None
+
+    patterns = []
+    if np.isfinite(customers["mean"]).any():
+        peak_hour = int(np.nanargmax(customers["mean"]))
+        patterns.append({"type": "peak_hour", "hour": peak_hour, "average_customers": round(float(customers["mean"][peak_hour]), 1)})
+    if np.isfinite(weekday_index).any():
+        busiest, quietest = int(np.nanargmax(weekday_index)), int(np.nanargmin(weekday_index))
+        patterns.append({"type": "busiest_weekday", "weekday": WEEKDAYS[busiest], "index": round(float(weekday_index[busiest]), 2)})
+        patterns.append({"type": "quietest_weekday", "weekday": WEEKDAYS[quietest], "index": round(float(weekday_index[quietest]), 2)})
+    if change is not None and abs(change) >= 0.05:
+        patterns.append({"type": "growth" if change > 0 else "decline", "recent_vs_average": round(change, 3)})
+
+    # p95 assumes roughly normal hourly counts; never below the mean or above the observed maximum
+    p95 = np.fmin(customers["mean"] + _P95_Z * np.nan_to_num(customers["std"]),
+                  stats.maximum[row, :, :, 0].max(axis=0))
+    return {
+        "patterns": patterns,
+        "trends": {
+            "days_observed": int(days),
+            "average_daily_customers": round(overall, 1),
+            "daily_slope": round(slope, 3),
+            "recent_vs_average": None if change is None else round(change, 3),
+        },
+        "seasonality": {
+            "weekday_index": dict(zip(WEEKDAYS, _rounded(weekday_index, 3))),
+            "weekday_hour_customers": [_rounded(day, 1) for day in stats.weekday_hour_mean(row)],
+        },
+        "hourly_profile": {
+            "mean_customers": _rounded(customers["mean"], 1),
+            "recent_customers": _rounded(customers["ewma"], 1),
+            "p95_customers": _rounded(p95, 1),
+            "peak_capacity_share": _rounded(stats.hourly(row, "peak_capacity")["mean"], 3),
+            "mean_conversion_rate": _rounded(stats.hourly(row, "conversion_rate")["mean"], 4),
+            "mean_dwell_time": _rounded(stats.hourly(row, "average_dwell_time")["mean"], 1),
+        },
+    }
+
+def update_traffic_statistics(
+    location: str,
+    days: Sequence[Any],
+    config: Optional[TrafficStatsConfig] = None,
+    stats_path: Optional[str] = None
+) -> TrafficStatistics:
+    """
+    Load the cached statistics, fold in new days for ``location`` and save them.
+
+    The cache lives at ``stats_path`` (TRAFFIC_STATS_PATH, default
+    .cache/traffic_stats.npz) and is read, updated and replaced under a
+    file lock, so concurrent workers never lose each other's updates. A
+    location built with a different configuration is rebuilt from
+    ``days``; other locations are kept. The file is only rewritten when
+    something changed.
+    """
+    config = config or TrafficStatsConfig()
+    stats_path = stats_path or os.environ.get("TRAFFIC_STATS_PATH", DEFAULT_STATS_PATH)
+    with locked(stats_path):
+        stats = TrafficStatistics.load(stats_path) or TrafficStatistics([], config)
+        stats.config = config
+        known = location in stats.ids
+        row = stats.row(location)
+        reset = stats.configs[row] != config
+        if reset:
+            stats.reset(location, config)
+        counted = len(stats.seen_days[row])
+        stats.update(location, days)
+        if not known or reset or len(stats.seen_days[row]) != counted:
+            stats.save(stats_path)
+    return stats
+
+def window_patterns(
+    stats: TrafficStatistics,
+    location: str,
+    days: Sequence[Any],
+    start: str,
+    end: str
+) -> Dict[str, Any]:
+    """
+    traffic_patterns for the days between ``start`` and ``end`` (ISO dates, inclusive).
+
+    When every day counted for ``location`` lies in the window, the
+    cached cells are the window and are read directly. Otherwise the
+    window is folded from ``days`` into fresh accumulators: minimum,
+    maximum and the EWMA cannot be taken back out of running cells.
+    """
+    first, last = _day_number({"date": start}), _day_number({"date": end})
+    config = stats.config
+    if location in stats.ids:
+        row = stats.ids.index(location)
+        seen, config = stats.seen_days[row], stats.configs[row]
+        if seen and first <= min(seen) and max(seen) <= last:
+            return traffic_patterns(stats, location)
+    window = TrafficStatistics([], config).update(location, days, start=start, end=end)
+    return traffic_patterns(window, location)
@@ -0,0 +1,181 @@
+from sqlalchemy import JSON, Integer, Numeric, and_, case, cast, func, literal, select, true, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import re
+import numpy as np
+
+from src.db.models import RestaurantAnalytics
+
+# Lookbacks up to this long are bucketed by hour, longer ones by day
+HOURLY_BUCKET_LIMIT = timedelta(days=7)
+DEFAULT_LOOKBACK = timedelta(days=30)
+
+_UNITS = {"h": "hours", "hour": "hours", "d": "days", "day": "days", "w": "weeks", "week": "weeks"}
+_TIMEFRAME = re.compile(r"^(?:last_?)?(\d+)\s*_?([a-z]+?)s?$")
+_NAMED_TIMEFRAMES = {
+    "today": timedelta(days=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "quarter": timedelta(days=90),
+    "year": timedelta(days=365),
+}
+_NUMBER = r"^-?[0-9]+(\.[0-9]+)?$"
+
+def parse_timeframe(timeframe: str) -> Tuple[timedelta, str]:
+    """Lookback and bucket ("hour" or "day") for timeframes like "7d", "last_90_days" or "month" """
+    name = timeframe.strip().lower().removeprefix("last_").removeprefix("this_")
+    if name in _NAMED_TIMEFRAMES:
+        lookback = _NAMED_TIMEFRAMES[name]
+    else:
+        match = _TIMEFRAME.match(name)
+        if match and match.group(2) in ("m", "month"):
+            lookback = timedelta(days=30 * int(match.group(1)))
+        elif match and match.group(2) in _UNITS:
+            lookback = timedelta(**{_UNITS[match.group(2)]: int(match.group(1))})
+        else:
+            lookback = DEFAULT_LOOKBACK
+    return lookback, "hour" if lookback <= HOURLY_BUCKET_LIMIT else "day"
+
+def _window_filter(start: datetime, end: datetime, restaurant_ids: Optional[List[int]]):
+    conditions = [RestaurantAnalytics.timestamp >= start, RestaurantAnalytics.timestamp < end]
+    if restaurant_ids:
+        conditions.append(RestaurantAnalytics.restaurant_id.in_(restaurant_ids))
+    return and_(*conditions)
+
+def sales_series_query(
+    bucket: str, start: datetime, end: datetime, restaurant_ids: Optional[List[int]] = None
+) -> Select:
+    """Per restaurant and time bucket sums, grouped in the database"""
+    period = func.date_trunc(bucket, RestaurantAnalytics.timestamp).label("bucket")
+    revenue = func.sum(RestaurantAnalytics.revenue)
+    orders = func.sum(RestaurantAnalytics.orders)
+    return (
+        select(
+            RestaurantAnalytics.restaurant_id,
+            period,
+            revenue.label("revenue"),
+            orders.label("transactions"),
+            (revenue / func.nullif(orders, 0)).label("average_ticket"),
+            func.sum(RestaurantAnalytics.views).label("views"),
+            func.avg(RestaurantAnalytics.customer_retention_rate).label("customer_retention_rate"),
+        )
+        .where(_window_filter(start, end, restaurant_ids))
+        .group_by(RestaurantAnalytics.restaurant_id, period)
+        .order_by(RestaurantAnalytics.restaurant_id, period)
+    )
+
+def items_sold_query(
+    start: datetime, end: datetime, restaurant_ids: Optional[List[int]] = None
+) -> Select:
+    """
+    Item totals unpacked from the ``popular_items`` JSON by the database.
+
+    Objects are read as {item: quantity}; arrays of names count each
+    appearance once. Quantities that are not numbers are ignored.
+    """
+    window = _window_filter(start, end, restaurant_ids)
+    column = RestaurantAnalytics.popular_items
+
+    def when(kind: str, empty: str):
+        # The JSON functions raise on the other shape, so each sees an empty value instead
+        return case((func.json_typeof(column) == kind, column), else_=cast(literal(empty), JSON))
+
+    entries = func.json_each_text(when("object", "{}")).table_valued("key", "value").lateral("entries")
+    quantity = case((entries.c.value.op("~")(_NUMBER), cast(entries.c.value, Numeric)), else_=literal(0))
+    from_objects = (
+        select(entries.c.key.label("item"), quantity.label("quantity"))
+        .select_from(RestaurantAnalytics)
+        .join(entries, true())
+        .where(window)
+    )
+    names = func.json_array_elements_text(when("array", "[]")).table_valued("value").lateral("names")
+    from_arrays = (
+        select(names.c.value.label("item"), literal(1).label("quantity"))
+        .select_from(RestaurantAnalytics)
+        .join(names, true())
+        .where(window)
+    )
+    items = union_all(from_objects, from_arrays).subquery("items")
+    total = cast(func.sum(items.c.quantity), Integer)
+    return (
+        select(items.c.item, total.label("quantity"))
+        .group_by(items.c.item)
+        .order_by(total.desc())
+    )
+
+def pivot_series(
+    rows: List[Tuple[Any, ...]],
+    columns: List[str],
+    bucket: str,
+    start: datetime,
+    end: datetime
+) -> Dict[str, Dict[str, List[Optional[float]]]]:
+    """
+    Turn (restaurant_id, bucket, *metrics) rows into dense column arrays.
+
+    Every restaurant gets one value per bucket from ``start`` to ``end``;
+    buckets without rows are None. Returns {restaurant: {metric: [...]}}.
+    """
+    step = timedelta(hours=1) if bucket == "hour" else timedelta(days=1)
+    length = max(int((end - start) / step), 0)
+    if not rows or length == 0:
+        return {}
+    restaurants = sorted({row[0] for row in rows})
+    row_of = {restaurant: i for i, restaurant in enumerate(restaurants)}
+    values = np.full((len(restaurants), len(columns), length), np.nan)
+    for restaurant, period, *metrics in rows:
+        index = int((period - start) / step)
+        if 0 <= index < length:
+            values[row_of[restaurant], :, index] = [np.nan if m is None else float(m) for m in metrics]
+
+    def as_list(series: np.ndarray) -> List[Optional[float]]:
+        return [None if np.isnan(v) else v for v in series.tolist()]
+
+    return {
+        str(restaurant): {column: as_list(values[i, j]) for j, column in enumerate(columns)}
+        for i, restaurant in enumerate(restaurants)
+    }
+
+def query_sales_aggregates(
+    db: Session,
+    timeframe: str,
+    restaurant_ids: Optional[List[int]] = None,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Sales totals, item counts and per-restaurant series for a timeframe.
+
+    Aggregation happens in two grouped queries, so only one row per
+    restaurant and bucket, plus one per item, leaves the database.
+    """
+    lookback, bucket = parse_timeframe(timeframe)
+    end = end or datetime.utcnow()
+    # Whole buckets only: the series ends with the last complete one
+    end = end.replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        end = end.replace(hour=0)
+    start = end - lookback
+    columns = ["revenue", "transactions", "average_ticket", "views", "customer_retention_rate"]
+
+    rows = [tuple(row) for row in db.execute(sales_series_query(bucket, start, end, restaurant_ids))]
+    items = db.execute(items_sold_query(start, end, restaurant_ids)).all()
+
+    revenue = sum(row[2] or 0.0 for row in rows)
+    transactions = sum(row[3] or 0 for row in rows)
+    return {
+        "totals": {
+            "revenue": float(revenue),
+            "transactions": int(transactions),
+            "average_ticket": float(revenue / transactions) if transactions else 0.0,
+            "items_sold": {item: int(quantity) for item, quantity in items},
+        },
+        "series": {
+            "frequency": "hourly" if bucket == "hour" else "daily",
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "by_restaurant": pivot_series(rows, columns, bucket, start, end),
+        },
+    }
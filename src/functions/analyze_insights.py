@@ -1,39 +1,271 @@
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
-import openai
-import os
+from typing import Dict, Any, AsyncIterator, List, Optional, Set
+import asyncio
+import logging
+
+from src.functions.insight_parser import (
+    Insight, IncrementalInsightParser, load_json, parse_insights, validate_insight_list
+)
+from src.functions.llm_cache import get_llm_cache, make_cache_key
+from src.functions.local_insights import generate_local_insights, has_data
+from src.functions.llm_client import get_llm_client_manager, llm_api_key, llm_base_url
+from src.functions.prompt_builder import DEFAULT_TOKEN_BUDGET, PromptBuilder
+from src.functions.rate_limiter import Priority, get_rate_limiter
+from src.monitoring.llm_metrics import track_llm_call
+
+INSIGHTS_MODEL = "gpt-4"
+INSIGHTS_SYSTEM_PROMPT = "You are a restaurant analytics expert."
+
+# LLM requests left running after a budget overrun so they can warm the cache
+_background_requests: Set[asyncio.Task] = set()
 
 class AnalyzeInsightsInput(BaseModel):
     project_data: Dict[str, Any]
     category: Optional[str] = None
+    use_cache: bool = True
+    token_budget: int = DEFAULT_TOKEN_BUDGET  # Tokens allowed for project_data
+    priority: Priority = Priority.NORMAL
+    agent: Optional[str] = None  # Calling agent, for LLM call metrics
+    workflow_id: Optional[str] = None
+    # Answer with local rule-based insights if the LLM takes longer than this
+    latency_budget_ms: Optional[int] = None
 
-class Insight(BaseModel):
-    id: str
-    title: str
-    description: str
+class InsightSection(BaseModel):
     category: str
-    confidence: float
-    impact: str  # "HIGH", "MEDIUM", "LOW"
-    supporting_data: Dict[str, Any]
-    recommendations: List[str]
+    project_data: Dict[str, Any]
+
+class AnalyzeInsightsBatchInput(BaseModel):
+    sections: List[InsightSection]
+    shared_context: Optional[Dict[str, Any]] = None
+    use_cache: bool = True
+    token_budget: int = DEFAULT_TOKEN_BUDGET  # Tokens allowed per section
+    priority: Priority = Priority.NORMAL
+    agent: Optional[str] = None  # Calling agent, for LLM call metrics
+    workflow_id: Optional[str] = None
+
+async def _request_completion(
+    messages: List[Dict[str, str]],
+    category: Optional[str],
+    use_cache: bool,
+    priority: Priority = Priority.NORMAL,
+    agent: Optional[str] = None,
+    workflow_id: Optional[str] = None,
+    function: str = "analyze_insights",
+    metrics_categories: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Request a JSON chat completion, serving repeats from the response cache"""
+    response_format = {"type": "json_object"}
+
+    async with track_llm_call(
+        function, INSIGHTS_MODEL, agent=agent, workflow_id=workflow_id,
+        category="+".join(metrics_categories) if metrics_categories else category,
+        cache_hit=use_cache, categories=metrics_categories
+    ) as call:
+        async def request_insights() -> Dict[str, Any]:
+            call.record.cache_hit = False
+            # Call OpenAI API through the shared connection pool
+            manager = get_llm_client_manager()
+            client = manager.get_client(
+                base_url=llm_base_url(), api_key=llm_api_key("OPENAI_API_KEY")
+            )
+            async with get_rate_limiter().limit(messages, priority) as usage:
+                call.dequeued(usage["queue_wait"])
+                async with manager.slot():
+                    completion = await client.chat.completions.create(
+                        model=INSIGHTS_MODEL,
+                        messages=messages,
+                        response_format=response_format
+                    )
+                usage["total_tokens"] = completion.usage.total_tokens if completion.usage else None
+            result = completion.model_dump()
+            call.record.set_usage(result.get("usage"))
+            return result
+
+        if not use_cache:
+            return await request_insights()
+
+        cache_key = make_cache_key(INSIGHTS_MODEL, messages, response_format=response_format)
+        return await get_llm_cache().get_or_create(cache_key, request_insights, category=category)
+
+def _insight_messages(
+    project_data: Dict[str, Any], category: Optional[str], token_budget: int
+) -> List[Dict[str, str]]:
+    # Serialize the data compactly so the prompt stays within the token budget
+    serialized = PromptBuilder(token_budget=token_budget, model=INSIGHTS_MODEL).build(project_data)
+
+    # Prepare the prompt for the LLM
+    prompt = f"""
+    Analyze the following restaurant data and generate actionable insights.
+    
+    {serialized.text}
+    
+    {"Focus on the " + category + " category." if category else ""}
+    
+    For each insight, provide:
+    1. A clear title
+    2. A detailed description
+    3. Supporting data points
+    4. Confidence level (0.0-1.0)
+    5. Business impact (HIGH, MEDIUM, LOW)
+    6. Actionable recommendations
+    
+    Format as a JSON object with an "insights" list. Each insight has the fields
+    id, title, description, category, confidence, impact, supporting_data and
+    recommendations.
+    """
+    
+    return [
+        {"role": "system", "content": INSIGHTS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
 
 async def analyze_insights(input_data: AnalyzeInsightsInput) -> Dict[str, Any]:
     """
     Analyzes project data and generates insights using LLM.
     
     This function processes the data and uses OpenAI to generate
-    actionable insights based on the patterns found.
+    actionable insights based on the patterns found. Empty data, or an
+    LLM slower than latency_budget_ms, is answered with rule-based local
+    insights instead, marked with source "local".
     """
     project_data = input_data.project_data
     category = input_data.category
+
+    # Nothing to analyze: answer locally instead of waiting on the LLM
+    if not has_data(project_data, category):
+        return {"insights": [], "source": "local", "fallback_reason": "no_data"}
     
-    # Prepare the prompt for the LLM
+    messages = _insight_messages(project_data, category, input_data.token_budget)
+    request = asyncio.ensure_future(_request_completion(
+        messages, category, input_data.use_cache, input_data.priority,
+        agent=input_data.agent, workflow_id=input_data.workflow_id
+    ))
+    if input_data.latency_budget_ms is None:
+        response = await request
+    else:
+        try:
+            response = await asyncio.wait_for(
+                asyncio.shield(request), input_data.latency_budget_ms / 1000
+            )
+        except asyncio.TimeoutError:
+            _detach_request(request, keep_running=input_data.use_cache)
+            logging.info(
+                "LLM exceeded the %d ms insight budget, returning local insights",
+                input_data.latency_budget_ms
+            )
+            return {
+                "insights": generate_local_insights(project_data),
+                "source": "local",
+                "fallback_reason": "latency_budget"
+            }
+    
+    # Validate the model output against the Insight schema, repairing defects
+    parsed = parse_insights(response["choices"][0]["message"]["content"], category)
+    if parsed.errors:
+        logging.warning("Dropped %d malformed insight(s): %s", len(parsed.errors), parsed.errors)
+    if not parsed.insights and parsed.errors:
+        return {
+            "insights": generate_local_insights(project_data),
+            "source": "local",
+            "fallback_reason": "unparseable_response",
+            "parse_errors": parsed.errors
+        }
+
+    insights = {
+        "insights": [insight.model_dump() for insight in parsed.insights],
+        "source": "llm"
+    }
+    if parsed.errors:
+        insights["parse_errors"] = parsed.errors
+    return insights
+
+async def analyze_insights_stream(input_data: AnalyzeInsightsInput) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streams insights one at a time as the model finishes writing each of them.
+
+    Streamed responses bypass the response cache and the latency budget;
+    insights that fail validation are logged and skipped.
+    """
+    project_data = input_data.project_data
+    category = input_data.category
+    if not has_data(project_data, category):
+        return
+
+    messages = _insight_messages(project_data, category, input_data.token_budget)
+    parser = IncrementalInsightParser(category)
+    manager = get_llm_client_manager()
+    client = manager.get_client(base_url=llm_base_url(), api_key=llm_api_key("OPENAI_API_KEY"))
+
+    async with track_llm_call(
+        "analyze_insights_stream", INSIGHTS_MODEL, agent=input_data.agent,
+        workflow_id=input_data.workflow_id, category=category
+    ) as call, get_rate_limiter().limit(messages, input_data.priority) as usage:
+        call.dequeued(usage["queue_wait"])
+        async with manager.slot():
+            stream = await client.chat.completions.create(
+                model=INSIGHTS_MODEL,
+                messages=messages,
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                if chunk.usage:
+                    usage["total_tokens"] = chunk.usage.total_tokens
+                    call.record.set_usage(chunk.usage.model_dump())
+                for choice in chunk.choices:
+                    if choice.delta.content:
+                        call.first_token()
+                        for insight in parser.feed(choice.delta.content):
+                            yield insight.model_dump()
+        for insight in parser.finish():
+            yield insight.model_dump()
+
+    if parser.errors:
+        logging.warning("Dropped %d malformed streamed insight(s): %s", len(parser.errors), parser.errors)
+
+def _detach_request(request: asyncio.Task, keep_running: bool) -> None:
+    """Stop waiting on an LLM request; a cacheable one finishes in the background"""
+    if not keep_running:
+        request.cancel()
+        return
+
+    def finished(task: asyncio.Task) -> None:
+        _background_requests.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning("Background insight request failed: %s", str(task.exception()))
+
+    _background_requests.add(request)
+    request.add_done_callback(finished)
+
+async def analyze_insights_batch(input_data: AnalyzeInsightsBatchInput) -> Dict[str, Any]:
+    """
+    Generates insights for several categories in a single LLM round trip.
+
+    The system prompt and shared context are sent once and the model
+    returns insights keyed by category. Categories missing from the
+    response, or every category if the batched call fails, fall back to
+    concurrent per-category analyze_insights calls.
+    """
+    categories = [section.category for section in input_data.sections]
+    builder = PromptBuilder(token_budget=input_data.token_budget, model=INSIGHTS_MODEL)
+
+    section_blocks = "\n".join(
+        f"[{section.category}] {builder.build(section.project_data).text}"
+        for section in input_data.sections
+    )
+    shared_context = (
+        f"Shared context: {builder.build(input_data.shared_context).text}"
+        if input_data.shared_context else ""
+    )
+
     prompt = f"""
-    Analyze the following restaurant data and generate actionable insights.
+    Analyze the following restaurant data and generate actionable insights
+    separately for each category: {", ".join(categories)}.
     
-    {project_data}
+    {shared_context}
     
-    {"Focus on the " + category + " category." if category else ""}
+    {section_blocks}
     
     For each insight, provide:
     1. A clear title
@@ -43,46 +275,60 @@ async def analyze_insights(input_data: AnalyzeInsightsInput) -> Dict[str, Any]:
     5. Business impact (HIGH, MEDIUM, LOW)
     6. Actionable recommendations
     
-    Format as a JSON list of insights.
+    Format as a JSON object mapping each category name to its list of insights.
     """
-    
-    # Call OpenAI API to generate insights
-    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-    response = await client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a restaurant analytics expert."},
-            {"role": "user", "content": prompt}
-        ],
-        response_format={"type": "json_object"}
-    )
-    
-    # Process and structure the insights
-    insights_data = response.choices[0].message.content
-    
-    # In production, you would parse the JSON response
-    # For now, returning a structured example
-    insights = {
-        "insights": [
-            {
-                "id": "ins-001",
-                "title": "Peak Hour Staffing Optimization",
-                "description": "Your restaurant is understaffed during peak hours (6-8pm), leading to longer wait times and reduced customer satisfaction.",
-                "category": "staffing",
-                "confidence": 0.87,
-                "impact": "HIGH",
-                "supporting_data": {
-                    "avg_wait_time_peak": "24 minutes",
-                    "avg_wait_time_normal": "12 minutes",
-                    "customer_satisfaction_delta": "-15%"
-                },
-                "recommendations": [
-                    "Add 2 additional servers during 6-8pm peak hours",
-                    "Implement pre-shift prep to speed up service during rush",
-                    "Consider staggered reservation times to distribute traffic"
-                ]
-            }
-        ]
+
+    messages = [
+        {"role": "system", "content": INSIGHTS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    # The combined response lives only as long as its shortest-lived category
+    cache_category = None
+    if input_data.use_cache and categories:
+        cache_category = min(categories, key=get_llm_cache().ttl_for)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        response = await _request_completion(
+            messages, cache_category, input_data.use_cache, input_data.priority,
+            agent=input_data.agent, workflow_id=input_data.workflow_id,
+            function="analyze_insights_batch", metrics_categories=categories
+        )
+        by_category, _ = load_json(response["choices"][0]["message"]["content"])
+        for category in categories:
+            category_insights = by_category.get(category)
+            if isinstance(category_insights, dict):
+                category_insights = category_insights.get("insights")
+            if isinstance(category_insights, list):
+                parsed = validate_insight_list(category_insights, category)
+                results[category] = {
+                    "insights": [insight.model_dump() for insight in parsed.insights]
+                }
+                if parsed.errors:
+                    results[category]["parse_errors"] = parsed.errors
+    except Exception as e:
+        logging.warning("Batched insight generation failed, falling back: %s", str(e))
+
+    fallback_sections = [section for section in input_data.sections if section.category not in results]
+    fallback_categories = [section.category for section in fallback_sections]
+    if fallback_sections:
+        fallback_results = await asyncio.gather(*(
+            analyze_insights(AnalyzeInsightsInput(
+                project_data=section.project_data,
+                category=section.category,
+                use_cache=input_data.use_cache,
+                token_budget=input_data.token_budget,
+                priority=input_data.priority,
+                agent=input_data.agent,
+                workflow_id=input_data.workflow_id
+            ))
+            for section in fallback_sections
+        ))
+        for section, result in zip(fallback_sections, fallback_results):
+            results[section.category] = result
+
+    return {
+        "results": results,
+        "batched_categories": [c for c in categories if c not in fallback_categories],
+        "fallback_categories": fallback_categories
     }
-    
-    return insights
\ No newline at end of file
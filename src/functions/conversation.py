@@ -0,0 +1,151 @@
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel, Field
+from restack_ai.function import log
+
+from src.functions.llm_chat import LlmChatInput, Message, llm_chat
+from src.functions.prompt_builder import count_tokens
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below for your own future reference. Keep "
+    "facts, numbers, decisions, open questions and user preferences; drop "
+    "pleasantries. Reply with the summary only."
+)
+
+# Fixed per-message overhead the chat format adds on top of the content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[str | None, list[Message]], Awaitable[str]]
+
+
+class ConversationConfig(BaseModel):
+    window_tokens: int = 3000  # Budget for the recent messages sent each turn
+    compact_threshold_tokens: int = 4000  # History size that triggers summarizing
+    # Recent history kept verbatim after summarizing; below window_tokens so
+    # the next few turns fit the window without another summary
+    compact_target_tokens: int = 2000
+    min_recent_messages: int = 4  # Never summarized away
+    model: str | None = None
+
+
+def message_tokens(message: Message) -> int:
+    tokens = count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+    for tool_call in message.tool_calls or []:
+        tokens += count_tokens(tool_call.function.name + tool_call.function.arguments)
+    return tokens
+
+
+class ConversationState(BaseModel):
+    """
+    History of one chat session, kept to a bounded prompt size.
+
+    The system prompt is stored separately and sent once at the start of
+    every request. Once the history grows past the compaction threshold,
+    or the window would otherwise leave turns out, older turns are folded
+    into a short memory message by the summarizer and only the most
+    recent turns are kept verbatim.
+    """
+
+    system_prompt: str | None = None
+    memory: str | None = None
+    messages: list[Message] = Field(default_factory=list)
+    config: ConversationConfig = Field(default_factory=ConversationConfig)
+
+    def add(self, message: Message) -> None:
+        if message.role == "system":
+            self.system_prompt = message.content
+            return
+        self.messages.append(message)
+
+    def history_tokens(self) -> int:
+        return sum(message_tokens(m) for m in self.messages)
+
+    def _safe_start(self, start: int) -> int:
+        # Tool results must stay with the assistant turn that requested them
+        while start < len(self.messages) and self.messages[start].role == "tool":
+            start += 1
+        return start
+
+    def _window_start(self, budget: int | None = None) -> int:
+        budget = self.config.window_tokens if budget is None else budget
+        start = len(self.messages)
+        used = 0
+        while start > 0:
+            tokens = message_tokens(self.messages[start - 1])
+            kept = len(self.messages) - start
+            if used + tokens > budget and kept >= self.config.min_recent_messages:
+                break
+            used += tokens
+            start -= 1
+        return self._safe_start(start)
+
+    def window(self) -> list[Message]:
+        """Messages to send this turn: system prompt, memory, then recent turns"""
+        window = []
+        if self.system_prompt:
+            window.append(Message(role="system", content=self.system_prompt))
+        if self.memory:
+            window.append(
+                Message(role="system", content=f"Summary of earlier conversation: {self.memory}")
+            )
+        window.extend(self.messages[self._window_start():])
+        return window
+
+    async def compact(self, summarize: Summarizer | None = None) -> bool:
+        """Fold older turns into memory if the history is over the threshold or the window"""
+        # Turns the window leaves out must be summarized, or they are lost
+        if self.history_tokens() <= self.config.compact_threshold_tokens and self._window_start() == 0:
+            return False
+
+        start = self._window_start(min(self.config.compact_target_tokens, self.config.window_tokens))
+        if start == 0:
+            return False
+
+        older, self.messages = self.messages[:start], self.messages[start:]
+        self.memory = await (summarize or self._summarize_with_llm)(self.memory, older)
+        log.info(
+            "Conversation compacted",
+            summarized_messages=len(older),
+            remaining_messages=len(self.messages),
+        )
+        return True
+
+    async def _summarize_with_llm(self, memory: str | None, older: list[Message]) -> str:
+        transcript = "\n".join(
+            f"{m.role}: {m.content}" for m in older if m.content
+        )
+        if memory:
+            transcript = f"Earlier summary: {memory}\n{transcript}"
+        result = await llm_chat(
+            LlmChatInput(
+                system_content=SUMMARY_PROMPT,
+                model=self.config.model,
+                messages=[Message(role="user", content=transcript)],
+            )
+        )
+        return result["choices"][0]["message"]["content"] or ""
+
+    def to_chat_input(self, **kwargs) -> LlmChatInput:
+        return LlmChatInput(model=self.config.model, messages=self.window(), **kwargs)
+
+
+async def chat_turn(
+    state: ConversationState,
+    content: str,
+    summarize: Summarizer | None = None,
+    **chat_kwargs,
+) -> dict:
+    """Add a user message, keep the history bounded and ask the model for a reply"""
+    state.add(Message(role="user", content=content))
+    await state.compact(summarize)
+
+    result = await llm_chat(state.to_chat_input(**chat_kwargs))
+    reply = result["choices"][0]["message"]
+    state.add(
+        Message(
+            role="assistant",
+            content=reply.get("content") or "",
+            tool_calls=reply.get("tool_calls"),
+        )
+    )
+    return result
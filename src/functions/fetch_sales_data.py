@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import asyncio
+
+from src.db.config import SessionLocal
+from src.db.sales_queries import query_sales_aggregates
+
+class FetchSalesDataInput(BaseModel):
+    timeframe: str
+    restaurant_ids: Optional[List[int]] = None
+    end: Optional[datetime] = None  # Defaults to now
+
+def _query(input_data: FetchSalesDataInput) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return query_sales_aggregates(db, input_data.timeframe, input_data.restaurant_ids, input_data.end)
+    finally:
+        db.close()
+
+async def fetch_sales_aggregates(input_data: FetchSalesDataInput) -> Dict[str, Any]:
+    """
+    Fetches aggregated sales for a timeframe from restaurant_analytics.
+
+    Grouping happens in the database; the result holds window totals and
+    per-restaurant column arrays rather than individual rows.
+    """
+    # The session API is blocking, so keep it off the event loop
+    return await asyncio.to_thread(_query, input_data)
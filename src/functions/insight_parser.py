@@ -0,0 +1,290 @@
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, List, Optional, Tuple
+import json
+import re
+
+class Insight(BaseModel):
+    id: str
+    title: str
+    description: str
+    category: str
+    confidence: float
+    impact: str  # "HIGH", "MEDIUM", "LOW"
+    supporting_data: Dict[str, Any]
+    recommendations: List[str]
+
+class ParsedInsights(BaseModel):
+    insights: List[Insight] = []
+    errors: List[str] = []
+    repaired: bool = False
+
+_CODE_FENCE = re.compile(r"^```[\w-]*\s*(.*?)\s*```$", re.S)
+_LITERALS = {"True": "true", "False": "false", "None": "null", "NaN": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+def repair_json(text: str) -> str:
+    """
+    Fix the defects models commonly produce in JSON output.
+
+    Handles markdown fences and surrounding prose, trailing commas,
+    Python literals, raw newlines inside strings, and output truncated
+    mid-value, which is cut back to the last complete element and closed.
+    """
+    text = text.strip()
+    fenced = _CODE_FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, open containers) just before each top-level-safe comma
+    cut_points: List[Tuple[int, List[str]]] = []
+    in_string = escape = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                char = "\\n"
+            out.append(char)
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            while out and out[-1] in " \t\r\n":
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                break  # Anything after the outermost value is prose
+            i += 1
+            continue
+        elif char == ",":
+            cut_points.append((len(out), list(stack)))
+        elif char.isalpha():
+            word = re.match(r"[A-Za-z]+", text[i:]).group(0)
+            out.append(_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        out.append(char)
+        i += 1
+
+    repaired = "".join(out)
+    if not stack and not in_string:
+        return repaired
+
+    closed = repaired + ('"' if in_string else "") + _close(stack)
+    try:
+        json.loads(closed)
+        return closed
+    except ValueError:
+        pass
+    # Drop the incomplete trailing element and close what was open before it
+    for length, open_stack in reversed(cut_points):
+        candidate = "".join(out[:length]) + _close(open_stack)
+        try:
+            json.loads(candidate)
+            return candidate
+        except ValueError:
+            continue
+    return closed
+
+def _close(stack: List[str]) -> str:
+    return "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+def load_json(content: str) -> Tuple[Any, bool]:
+    """Parse model output, repairing it if needed; returns (value, repaired)"""
+    try:
+        return json.loads(content), False
+    except ValueError:
+        return json.loads(repair_json(content)), True
+
+def _normalize(raw: Dict[str, Any], index: int, category: Optional[str]) -> Dict[str, Any]:
+    """Coerce near-miss field values into the Insight schema"""
+    insight = dict(raw)
+    insight.setdefault("id", f"ins-{index + 1:03d}")
+    if not insight.get("category"):
+        insight["category"] = category or "general"
+    if isinstance(insight.get("impact"), str):
+        insight["impact"] = insight["impact"].strip().upper()
+
+    confidence = insight.get("confidence")
+    if isinstance(confidence, str):
+        percent = confidence.strip().endswith("%")
+        try:
+            confidence = float(confidence.strip().rstrip("%"))
+            insight["confidence"] = confidence / 100 if percent else confidence
+        except ValueError:
+            pass
+    elif isinstance(confidence, (int, float)) and 1 < confidence <= 100:
+        insight["confidence"] = confidence / 100
+
+    recommendations = insight.get("recommendations")
+    if recommendations is None:
+        insight["recommendations"] = []
+    elif isinstance(recommendations, str):
+        insight["recommendations"] = [recommendations]
+
+    supporting_data = insight.get("supporting_data")
+    if supporting_data is None:
+        insight["supporting_data"] = {}
+    elif not isinstance(supporting_data, dict):
+        insight["supporting_data"] = {"data": supporting_data}
+    return insight
+
+def validate_insight(
+    raw: Any, index: int, category: Optional[str] = None
+) -> Tuple[Optional[Insight], Optional[str]]:
+    """Validate one parsed insight against the schema"""
+    if not isinstance(raw, dict):
+        return None, f"Insight {index}: expected an object, got {type(raw).__name__}"
+    try:
+        return Insight.model_validate(_normalize(raw, index, category)), None
+    except ValidationError as e:
+        fields = ", ".join(".".join(str(part) for part in err["loc"]) for err in e.errors())
+        return None, f"Insight {index}: invalid {fields}"
+
+def validate_insight_list(raw_insights: List[Any], category: Optional[str] = None) -> ParsedInsights:
+    result = ParsedInsights()
+    for index, raw in enumerate(raw_insights):
+        insight, error = validate_insight(raw, index, category)
+        if insight is not None:
+            result.insights.append(insight)
+        else:
+            result.errors.append(error)
+    return result
+
+def extract_insight_list(payload: Any) -> Optional[List[Any]]:
+    """Find the insights array in a payload shaped as a list, {"insights": [...]} or one insight"""
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        if isinstance(payload.get("insights"), list):
+            return payload["insights"]
+        if "title" in payload and "description" in payload:
+            return [payload]
+        lists = [value for value in payload.values() if isinstance(value, list)]
+        if len(lists) == 1:
+            return lists[0]
+    return None
+
+def parse_insights(content: Optional[str], category: Optional[str] = None) -> ParsedInsights:
+    """Parse a complete model response into validated insights"""
+    if not content:
+        return ParsedInsights(errors=["Empty response"])
+    try:
+        payload, repaired = load_json(content)
+    except ValueError as e:
+        return ParsedInsights(errors=[f"Unparseable response: {e}"], repaired=True)
+
+    raw_insights = extract_insight_list(payload)
+    if raw_insights is None:
+        return ParsedInsights(errors=["Response contains no insights array"], repaired=repaired)
+    result = validate_insight_list(raw_insights, category)
+    result.repaired = repaired
+    return result
+
+class IncrementalInsightParser:
+    """
+    Parses a streamed insights response as it arrives.
+
+    Each call to ``feed`` scans only the new text and returns the insights
+    whose objects closed in it, already validated, so they can be used
+    while the rest of the array is still being generated. ``finish``
+    salvages a truncated final insight where possible.
+    """
+
+    def __init__(self, category: Optional[str] = None) -> None:
+        self.category = category
+        self.errors: List[str] = []
+        self.emitted = 0
+        self._length = 0
+        self._in_string = False
+        self._escape = False
+        self._depth = 0
+        self._array_depth: Optional[int] = None  # Depth of the insights array's elements
+        self._array_closed = False
+        self._object_start: Optional[int] = None
+        self._index = 0
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[Insight]:
+        completed: List[Insight] = []
+        offset = self._length
+        self._buffer += chunk
+        self._length += len(chunk)
+        for position, char in enumerate(chunk, start=offset):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if (char == "[" and self._array_depth is None
+                        and not self._array_closed and self._depth <= 2):
+                    self._array_depth = self._depth
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._object_start = position
+            elif char in "}]":
+                if (char == "}" and self._object_start is not None
+                        and self._depth == self._array_depth + 1):
+                    insight = self._complete(self._buffer[self._object_start:position + 1])
+                    if insight is not None:
+                        completed.append(insight)
+                    self._object_start = None
+                elif char == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                    self._array_closed = True
+                self._depth -= 1
+        return completed
+
+    def finish(self) -> List[Insight]:
+        """Flush at end of stream, salvaging a truncated insight or an array-less response"""
+        if self._object_start is not None:
+            insight = self._complete(repair_json(self._buffer[self._object_start:]))
+            self._object_start = None
+            return [insight] if insight is not None else []
+        if self._index == 0 and self._buffer.strip():
+            parsed = parse_insights(self._buffer, self.category)
+            self.errors.extend(parsed.errors)
+            self.emitted += len(parsed.insights)
+            return parsed.insights
+        return []
+
+    def _complete(self, text: str) -> Optional[Insight]:
+        index = self._index
+        self._index += 1
+        try:
+            raw, _ = load_json(text)
+        except ValueError as e:
+            self.errors.append(f"Insight {index}: unparseable ({e})")
+            return None
+        insight, error = validate_insight(raw, index, self.category)
+        if error:
+            self.errors.append(error)
+        else:
+            self.emitted += 1
+        return insight
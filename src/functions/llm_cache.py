@@ -0,0 +1,225 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+class LlmCacheConfig(BaseModel):
+    """Sizing and expiry settings for the LLM response cache"""
+
+    enabled: bool = True
+    memory_entries: int = 512
+    sqlite_path: Optional[str] = ".cache/llm_responses.sqlite3"
+    default_ttl: float = 3600.0  # seconds
+    category_ttls: Dict[str, float] = {
+        "sales": 6 * 3600.0,
+        "pricing": 6 * 3600.0,
+        "traffic": 3600.0,
+        "sentiment": 3 * 3600.0,
+        "chat": 600.0,
+    }
+
+    @classmethod
+    def from_env(cls) -> "LlmCacheConfig":
+        """Build a config, letting LLM_CACHE_* environment variables override defaults"""
+        config = cls()
+        if os.environ.get("LLM_CACHE_ENABLED") is not None:
+            config.enabled = os.environ["LLM_CACHE_ENABLED"].lower() in ("1", "true", "yes")
+        if os.environ.get("LLM_CACHE_PATH") is not None:
+            config.sqlite_path = os.environ["LLM_CACHE_PATH"] or None
+        return config
+
+
+class LlmCacheStats(BaseModel):
+    """Counters describing how much work the cache saved"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    saved_prompt_tokens: int = 0
+    saved_completion_tokens: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _normalize_message(message: Any) -> Dict[str, Any]:
+    # Content is hashed verbatim: whitespace can carry meaning (code, tables, indentation)
+    if isinstance(message, BaseModel):
+        message = message.model_dump(exclude_none=True)
+    return {k: v for k, v in dict(message).items() if v is not None}
+
+
+def make_cache_key(
+    model: str,
+    messages: List[Any],
+    tools: Optional[List[Any]] = None,
+    temperature: Optional[float] = None,
+    **params: Any,
+) -> str:
+    """Hash everything that affects the completion into a stable key"""
+    payload = {
+        "model": model,
+        "messages": [_normalize_message(m) for m in messages],
+        "tools": tools or [],
+        "temperature": temperature,
+        "params": params,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _SqliteTier:
+    """On-disk tier; all access is serialized and run off the event loop"""
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " category TEXT,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str, now: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, category: str, value: Dict[str, Any], expires_at: float) -> None:
+        encoded = json.dumps(value, separators=(",", ":"), default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, category, value, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, category, encoded, expires_at),
+            )
+            self._conn.commit()
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+            return cursor.rowcount
+
+
+class LlmResponseCache:
+    """
+    Two-tier cache for chat completion responses.
+
+    Responses are stored as plain dicts (``ChatCompletion.model_dump()``)
+    under a hash of model, exact messages, tools and sampling
+    parameters. Lookups go to an in-memory LRU first and then to SQLite,
+    promoting disk hits back into memory.
+    """
+
+    def __init__(self, config: Optional[LlmCacheConfig] = None) -> None:
+        self.config = config or LlmCacheConfig.from_env()
+        self.stats = LlmCacheStats()
+        self._memory: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._disk: Optional[_SqliteTier] = None
+        if self.config.enabled and self.config.sqlite_path:
+            self._disk = _SqliteTier(self.config.sqlite_path)
+
+    def ttl_for(self, category: Optional[str]) -> float:
+        return self.config.category_ttls.get(category or "", self.config.default_ttl)
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look a response up, recording the hit or miss"""
+        now = time.time()
+        cached = self._memory.get(key)
+        if cached is not None and cached[1] > now:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            self._record_hit(cached[0])
+            return copy.deepcopy(cached[0])
+        if cached is not None:
+            del self._memory[key]
+
+        if self._disk is not None:
+            stored = await asyncio.to_thread(self._disk.get, key, now)
+            if stored is not None:
+                self._remember(key, *stored)
+                self.stats.disk_hits += 1
+                self._record_hit(stored[0])
+                return copy.deepcopy(stored[0])
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any], category: Optional[str] = None) -> None:
+        """Store a response under the TTL for its category"""
+        expires_at = time.time() + self.ttl_for(category)
+        # Callers get their own copies, so nobody can mutate the cached response
+        self._remember(key, copy.deepcopy(value), expires_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, category or "", value, expires_at)
+
+    async def get_or_create(
+        self,
+        key: str,
+        create: Callable[[], Awaitable[Dict[str, Any]]],
+        category: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return the cached response or call `create` and cache its result"""
+        if not self.config.enabled:
+            return await create()
+
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        value = await create()
+        await self.set(key, value, category)
+        return value
+
+    def _record_hit(self, value: Dict[str, Any]) -> None:
+        usage = value.get("usage") or {}
+        self.stats.saved_prompt_tokens += usage.get("prompt_tokens") or 0
+        self.stats.saved_completion_tokens += usage.get("completion_tokens") or 0
+
+
+# Global cache instance
+_cache: Optional[LlmResponseCache] = None
+
+
+def get_llm_cache() -> LlmResponseCache:
+    """Get the global LLM response cache"""
+    global _cache
+    if _cache is None:
+        _cache = LlmResponseCache()
+    return _cache
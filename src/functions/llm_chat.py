@@ -1,8 +1,7 @@
-import os
-from typing import Literal
+from typing import Any, AsyncIterator, Iterable, Literal
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import NOT_GIVEN
 from openai.types.chat.chat_completion import ChatCompletion
 from openai.types.chat.chat_completion_message_tool_call import (
     ChatCompletionMessageToolCall,
@@ -13,8 +12,20 @@ from openai.types.chat.chat_completion_tool_param import (
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.llm_cache import get_llm_cache, make_cache_key
+from src.functions.llm_client import (
+    RESTACK_BASE_URL,
+    get_llm_client_manager,
+    llm_api_key,
+    llm_base_url,
+)
+from src.functions.rate_limiter import Priority, get_rate_limiter
+from src.monitoring.llm_metrics import track_llm_call
+
 load_dotenv()
 
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+
 
 class Message(BaseModel):
     role: Literal["system", "user", "assistant", "tool"]
@@ -28,6 +39,11 @@ class LlmChatInput(BaseModel):
     model: str | None = None
     messages: list[Message] | None = None
     tools: list[ChatCompletionToolParam] | None = None
+    temperature: float | None = None
+    use_cache: bool = False  # Sampled chat differs per call; opt in for deterministic prompts
+    priority: Priority = Priority.INTERACTIVE
+    agent: str | None = None  # Calling agent, for LLM call metrics
+    workflow_id: str | None = None
 
 
 def raise_exception(message: str) -> None:
@@ -35,34 +51,195 @@ def raise_exception(message: str) -> None:
     raise NonRetryableError(message)
 
 
+def _chat_client():
+    api_key = llm_api_key("RESTACK_API_KEY")
+    if api_key is None:
+        raise_exception("RESTACK_API_KEY is not set")
+
+    return get_llm_client_manager().get_client(
+        base_url=llm_base_url(RESTACK_BASE_URL), api_key=api_key
+    )
+
+
+def build_messages(
+    messages: list[Message] | None, system_content: str | None = None
+) -> list[dict]:
+    """Request messages with the system prompt placed once, at the start"""
+    messages = list(messages or [])
+    if system_content and not any(
+        m.role == "system" and m.content == system_content for m in messages
+    ):
+        messages.insert(0, Message(role="system", content=system_content))
+    return [m.model_dump(exclude_none=True) for m in messages]
+
+
+def _request_params(function_input: LlmChatInput) -> dict:
+    return {
+        "model": function_input.model or DEFAULT_CHAT_MODEL,
+        "messages": build_messages(
+            function_input.messages, function_input.system_content
+        ),
+        "tools": function_input.tools,
+        "temperature": function_input.temperature,
+    }
+
+
 @function.defn()
 async def llm_chat(function_input: LlmChatInput) -> ChatCompletion:
     try:
         log.info("llm_chat function started", function_input=function_input)
 
-        if os.environ.get("RESTACK_API_KEY") is None:
-            raise_exception("RESTACK_API_KEY is not set")
-
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
+        manager = get_llm_client_manager()
+        client = _chat_client()
 
         log.info("pydantic_function_tool", tools=function_input.tools)
 
-        if function_input.system_content:
-            function_input.messages.append(
-                Message(role="system", content=function_input.system_content or "")
-            )
-
-        result = client.chat.completions.create(
-            model=function_input.model or "gpt-4o-mini",
-            messages=function_input.messages,
-            tools=function_input.tools,
-        )
+        params = _request_params(function_input)
+
+        async with track_llm_call(
+            "llm_chat",
+            params["model"],
+            agent=function_input.agent,
+            workflow_id=function_input.workflow_id,
+            category="chat",
+            cache_hit=function_input.use_cache,
+        ) as call:
+
+            async def request_completion() -> dict:
+                call.record.cache_hit = False
+                limiter = get_rate_limiter()
+                async with limiter.limit(
+                    params["messages"], function_input.priority
+                ) as usage:
+                    call.dequeued(usage["queue_wait"])
+                    async with manager.slot():
+                        completion = await client.chat.completions.create(
+                            **{**params, "temperature": _given(params["temperature"])}
+                        )
+                    usage["total_tokens"] = (
+                        completion.usage.total_tokens if completion.usage else None
+                    )
+                result = completion.model_dump()
+                call.record.set_usage(result.get("usage"))
+                return result
+
+            if function_input.use_cache:
+                result = await get_llm_cache().get_or_create(
+                    make_cache_key(**params), request_completion, category="chat"
+                )
+            else:
+                result = await request_completion()
 
         log.info("llm_chat function completed", result=result)
 
-        return result.model_dump()
+        return result
     except Exception as e:
         error_message = f"LLM chat failed: {e}"
         raise NonRetryableError(error_message) from e
+
+
+async def llm_chat_stream(function_input: LlmChatInput) -> AsyncIterator[dict]:
+    """
+    Stream a chat completion, yielding each chunk as soon as it arrives.
+
+    Chunks are ``ChatCompletionChunk.model_dump()`` dicts, so content and
+    tool-call arguments arrive as partial deltas. Pass the collected chunks
+    to ``assemble_chat_completion`` to get the ``llm_chat`` result shape.
+    Streamed responses are not served from the response cache.
+    """
+    try:
+        log.info("llm_chat_stream started", function_input=function_input)
+
+        manager = get_llm_client_manager()
+        client = _chat_client()
+        params = _request_params(function_input)
+
+        limiter = get_rate_limiter()
+        async with track_llm_call(
+            "llm_chat_stream",
+            params["model"],
+            agent=function_input.agent,
+            workflow_id=function_input.workflow_id,
+            category="chat",
+        ) as call, limiter.limit(params["messages"], function_input.priority) as usage:
+            call.dequeued(usage["queue_wait"])
+            async with manager.slot():
+                stream = await client.chat.completions.create(
+                    **{**params, "temperature": _given(params["temperature"])},
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                async for chunk in stream:
+                    if chunk.usage:
+                        usage["total_tokens"] = chunk.usage.total_tokens
+                        call.record.set_usage(chunk.usage.model_dump())
+                    if any(
+                        choice.delta.content or choice.delta.tool_calls
+                        for choice in chunk.choices
+                    ):
+                        call.first_token()
+                    yield chunk.model_dump()
+    except Exception as e:
+        error_message = f"LLM chat stream failed: {e}"
+        raise NonRetryableError(error_message) from e
+
+
+def assemble_chat_completion(chunks: Iterable[Any]) -> dict:
+    """Merge streamed chunks back into a ``ChatCompletion``-shaped dict"""
+    completion: dict = {
+        "id": None,
+        "object": "chat.completion",
+        "created": None,
+        "model": None,
+        "system_fingerprint": None,
+        "choices": [],
+        "usage": None,
+    }
+    choices: dict[int, dict] = {}
+
+    for chunk in chunks:
+        if isinstance(chunk, BaseModel):
+            chunk = chunk.model_dump()
+        for key in ("id", "created", "model", "system_fingerprint"):
+            completion[key] = completion[key] or chunk.get(key)
+        if chunk.get("usage"):
+            completion["usage"] = chunk["usage"]
+
+        for choice_delta in chunk.get("choices") or []:
+            choice = choices.setdefault(
+                choice_delta["index"],
+                {
+                    "index": choice_delta["index"],
+                    "message": {"role": "assistant", "content": None, "tool_calls": None},
+                    "finish_reason": None,
+                    "logprobs": None,
+                },
+            )
+            if choice_delta.get("finish_reason"):
+                choice["finish_reason"] = choice_delta["finish_reason"]
+
+            delta = choice_delta.get("delta") or {}
+            message = choice["message"]
+            if delta.get("role"):
+                message["role"] = delta["role"]
+            if delta.get("content"):
+                message["content"] = (message["content"] or "") + delta["content"]
+
+            for call_delta in delta.get("tool_calls") or []:
+                tool_calls = message["tool_calls"] = message["tool_calls"] or []
+                while len(tool_calls) <= call_delta["index"]:
+                    tool_calls.append(
+                        {"id": None, "type": "function", "function": {"name": "", "arguments": ""}}
+                    )
+                tool_call = tool_calls[call_delta["index"]]
+                tool_call["id"] = call_delta.get("id") or tool_call["id"]
+                function_delta = call_delta.get("function") or {}
+                tool_call["function"]["name"] += function_delta.get("name") or ""
+                tool_call["function"]["arguments"] += function_delta.get("arguments") or ""
+
+    completion["choices"] = [choices[index] for index in sorted(choices)]
+    return completion
+
+
+def _given(value: Any) -> Any:
+    return NOT_GIVEN if value is None else value
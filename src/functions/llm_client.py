@@ -0,0 +1,146 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+from src.monitoring.llm_metrics import count_http_attempt
+
+RESTACK_BASE_URL = "https://ai.restack.io"
+
+
+def llm_base_url(default: Optional[str] = None) -> Optional[str]:
+    """Endpoint for LLM calls; LLM_BASE_URL redirects every call, e.g. to a local mock"""
+    return os.environ.get("LLM_BASE_URL") or default
+
+
+def llm_api_key(env_name: str) -> Optional[str]:
+    """API key for LLM calls; LLM_API_KEY takes precedence over the provider's variable"""
+    return os.environ.get("LLM_API_KEY") or os.environ.get(env_name)
+
+
+class LlmClientConfig(BaseModel):
+    """Connection pooling, concurrency and timeout settings for LLM calls"""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0  # seconds
+    max_concurrency: int = 8
+    connect_timeout: float = 5.0  # seconds
+    request_timeout: float = 60.0  # seconds
+    max_retries: int = 2
+
+    @classmethod
+    def from_env(cls) -> "LlmClientConfig":
+        """Build a config, letting LLM_* environment variables override defaults"""
+        overrides = {}
+        for name, field in cls.model_fields.items():
+            value = os.environ.get(f"LLM_{name.upper()}")
+            if value is not None:
+                overrides[name] = field.annotation(value)
+        return cls(**overrides)
+
+
+class LlmClientManager:
+    """
+    Process-wide owner of async LLM clients.
+
+    One AsyncOpenAI client, backed by a keep-alive httpx pool, is kept per
+    (base_url, api_key) pair so repeated calls reuse open connections
+    instead of paying a TLS handshake each time. A shared semaphore caps
+    how many requests are in flight at once.
+    """
+
+    def __init__(self, config: Optional[LlmClientConfig] = None) -> None:
+        self.config = config or LlmClientConfig.from_env()
+        self._clients: Dict[Tuple[Optional[str], Optional[str]], AsyncOpenAI] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    def _bind_loop(self) -> None:
+        # httpx pools and semaphores belong to the loop they were created on
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            previous_loop, stale = self._loop, list(self._clients.values())
+            self._loop = loop
+            self._clients = {}
+            self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+            if stale:
+                self._close_stale(stale, previous_loop)
+
+    def _close_stale(self, clients: List[AsyncOpenAI], loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close clients left behind by a loop change, on their own loop if it still runs"""
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            for client in clients:
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+            return
+        task = asyncio.get_running_loop().create_task(_close_quietly(clients))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def get_client(
+        self, base_url: Optional[str] = None, api_key: Optional[str] = None
+    ) -> AsyncOpenAI:
+        """Return the pooled client for an endpoint, creating it on first use"""
+        self._bind_loop()
+        key = (base_url, api_key)
+        client = self._clients.get(key)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    self.config.request_timeout, connect=self.config.connect_timeout
+                ),
+                # Every attempt passes through here, so retries can be counted
+                event_hooks={"request": [count_http_attempt]},
+            )
+            client = AsyncOpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                max_retries=self.config.max_retries,
+                http_client=http_client,
+            )
+            self._clients[key] = client
+        return client
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the shared concurrency slots for the duration of a call"""
+        self._bind_loop()
+        async with self._semaphore:
+            yield
+
+    async def aclose(self) -> None:
+        """Close every pooled connection"""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.close()
+
+
+async def _close_quietly(clients: List[AsyncOpenAI]) -> None:
+    # Their loop is gone, so closing can fail on dead transports; the sockets are released either way
+    for client in clients:
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+
+# Global manager instance
+_manager: Optional[LlmClientManager] = None
+
+
+def get_llm_client_manager() -> LlmClientManager:
+    """Get the global LLM client manager"""
+    global _manager
+    if _manager is None:
+        _manager = LlmClientManager()
+    return _manager
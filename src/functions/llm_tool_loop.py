@@ -0,0 +1,155 @@
+import asyncio
+import inspect
+import json
+from typing import Any, Awaitable, Callable
+
+from openai import pydantic_function_tool
+from openai.types.chat.chat_completion_tool_param import ChatCompletionToolParam
+from pydantic import BaseModel, ValidationError
+from restack_ai.function import NonRetryableError, function, log
+
+from src.functions.fetch_project_data import FetchProjectDataInput, fetch_project_data
+from src.functions.llm_chat import LlmChatInput, Message, llm_chat
+from src.functions.prompt_builder import compact_json
+
+
+class ChatTool(BaseModel):
+    name: str
+    description: str | None = None
+    input_model: type[BaseModel]
+    func: Callable[[Any], Awaitable[Any]]
+
+
+class ToolRegistry:
+    """Functions the model may call, keyed by tool name"""
+
+    def __init__(self) -> None:
+        self._tools: dict[str, ChatTool] = {}
+
+    def register(
+        self,
+        func: Callable[[Any], Awaitable[Any]],
+        input_model: type[BaseModel],
+        name: str | None = None,
+        description: str | None = None,
+    ) -> None:
+        """Expose an async function taking a single pydantic input as a tool"""
+        name = name or func.__name__
+        self._tools[name] = ChatTool(
+            name=name,
+            description=description or inspect.getdoc(func),
+            input_model=input_model,
+            func=func,
+        )
+
+    def subset(self, names: list[str]) -> "ToolRegistry":
+        """Registry holding only the named tools"""
+        unknown = [name for name in names if name not in self._tools]
+        if unknown:
+            raise ValueError(f"Unknown tools: {', '.join(unknown)}")
+        registry = ToolRegistry()
+        registry._tools = {name: self._tools[name] for name in names}
+        return registry
+
+    def schemas(self) -> list[ChatCompletionToolParam]:
+        return [
+            pydantic_function_tool(tool.input_model, name=tool.name, description=tool.description)
+            for tool in self._tools.values()
+        ]
+
+    async def execute(self, tool_call: dict, timeout: float) -> Message:
+        """Run one tool call and wrap its result, or its error, as a tool message"""
+        name = tool_call["function"]["name"]
+        try:
+            tool = self._tools.get(name)
+            if tool is None:
+                raise ValueError(f"Unknown tool: {name}")
+            arguments = json.loads(tool_call["function"]["arguments"] or "{}")
+            output = await asyncio.wait_for(
+                tool.func(tool.input_model(**arguments)), timeout=timeout
+            )
+            content = output if isinstance(output, str) else compact_json(output)
+        except asyncio.TimeoutError:
+            content = compact_json({"error": f"Tool {name} timed out after {timeout}s"})
+        except (ValueError, ValidationError) as e:
+            content = compact_json({"error": f"Invalid call to {name}: {e}"})
+        except Exception as e:
+            log.error("Tool call failed", tool=name, error=str(e))
+            content = compact_json({"error": f"Tool {name} failed: {e}"})
+
+        return Message(role="tool", content=content, tool_call_id=tool_call["id"])
+
+
+def default_tool_registry() -> ToolRegistry:
+    """Registry exposing the project data functions to the model"""
+    registry = ToolRegistry()
+    registry.register(fetch_project_data, FetchProjectDataInput)
+    return registry
+
+
+class LlmToolLoopInput(BaseModel):
+    chat: LlmChatInput
+    tool_names: list[str] | None = None  # Tools from the default registry; all when None
+    max_turns: int = 5
+    tool_timeout: float = 30.0  # seconds per tool call
+
+
+@function.defn()
+async def llm_chat_with_tools(function_input: LlmToolLoopInput) -> dict:
+    """Tool loop over the default registry, restricted to ``tool_names`` when given"""
+    registry = default_tool_registry()
+    if function_input.tool_names is not None:
+        try:
+            registry = registry.subset(function_input.tool_names)
+        except ValueError as e:
+            raise NonRetryableError(str(e)) from e
+    return await run_tool_loop(function_input, registry)
+
+
+async def run_tool_loop(
+    function_input: LlmToolLoopInput, registry: ToolRegistry | None = None
+) -> dict:
+    """
+    Chat with the model, executing the tools it asks for until it answers.
+
+    All tool calls from one assistant turn run concurrently, each under
+    its own timeout, and their results are appended as ``tool`` messages
+    before the next turn. Stops after ``max_turns`` model calls.
+    """
+    registry = registry or default_tool_registry()
+    chat = function_input.chat
+    messages = list(chat.messages or [])
+    tools = chat.tools or registry.schemas()
+    result: dict = {}
+
+    for turn in range(1, function_input.max_turns + 1):
+        result = await llm_chat(
+            chat.model_copy(update={"messages": list(messages), "tools": tools})
+        )
+        message = result["choices"][0]["message"]
+        tool_calls = message.get("tool_calls")
+        if not tool_calls:
+            return {
+                "completion": result,
+                "messages": [m.model_dump(exclude_none=True) for m in messages],
+                "turns": turn,
+                "completed": True,
+            }
+
+        messages.append(
+            Message(role="assistant", content=message.get("content") or "", tool_calls=tool_calls)
+        )
+        log.info("Executing tool calls", turn=turn, tools=[c["function"]["name"] for c in tool_calls])
+        messages.extend(
+            await asyncio.gather(
+                *(registry.execute(call, function_input.tool_timeout) for call in tool_calls)
+            )
+        )
+
+    log.warning("Tool loop stopped at max turns", max_turns=function_input.max_turns)
+    return {
+        "completion": result,
+        "messages": [m.model_dump(exclude_none=True) for m in messages],
+        "turns": function_input.max_turns,
+        "completed": False,
+    }
@@ -0,0 +1,236 @@
+from pydantic import BaseModel
+from typing import Dict, Any, Iterator, List, Optional
+from collections import defaultdict
+import statistics
+
+LOCAL_SOURCE = "local_rules"
+
+class LocalInsightRules(BaseModel):
+    """Thresholds for the rule-based insights computed without the LLM"""
+    understaffing_load_ratio: float = 1.5  # Customers per staff vs. the median hour
+    peak_traffic_quantile: float = 0.75  # Hours at or above this traffic quantile are peaks
+    price_outlier_z: float = 3.5  # Robust (median/MAD) z-score
+    min_price_group_size: int = 4
+    rating_drop_threshold: float = 0.3  # Stars
+    min_rating_points: int = 4
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+# Categories whose payloads are metrics, where zeros and bare labels mean nothing was measured
+NUMERIC_CATEGORIES = {"sales", "pricing", "traffic"}
+
+def has_data(value: Any, category: Optional[str] = None) -> bool:
+    """
+    Whether the payload holds anything to analyze.
+
+    For numeric categories only non-zero numbers count, so placeholder
+    payloads of zeros and labels are skipped. Any other category, such as
+    sentiment over review text, also counts non-empty strings.
+    """
+    if category not in NUMERIC_CATEGORIES and isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, dict):
+        return any(has_data(v, category) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_data(v, category) for v in value)
+    return _is_number(value) and value != 0
+
+def _record_lists(value: Any) -> Iterator[List[Dict[str, Any]]]:
+    """Every list of dicts nested anywhere in the payload"""
+    if isinstance(value, dict):
+        for child in value.values():
+            yield from _record_lists(child)
+    elif isinstance(value, list):
+        records = [v for v in value if isinstance(v, dict)]
+        if records:
+            yield records
+        for child in records:
+            yield from _record_lists(child)
+
+def _quantile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def _insight(
+    rule: str,
+    index: int,
+    title: str,
+    description: str,
+    category: str,
+    confidence: float,
+    impact: str,
+    supporting_data: Dict[str, Any],
+    recommendations: List[str]
+) -> Dict[str, Any]:
+    return {
+        "id": f"local-{rule}-{index:03d}",
+        "title": title,
+        "description": description,
+        "category": category,
+        "confidence": round(confidence, 2),
+        "impact": impact,
+        "supporting_data": {**supporting_data, "source": LOCAL_SOURCE},
+        "recommendations": recommendations
+    }
+
+def peak_hour_understaffing(
+    project_data: Dict[str, Any], rules: LocalInsightRules
+) -> List[Dict[str, Any]]:
+    """Peak hours where staffing falls short of requirements or of the usual load per staff"""
+    shortfall: Dict[int, List[int]] = defaultdict(list)
+    customers: Dict[int, List[float]] = defaultdict(list)
+    staff: Dict[int, List[float]] = defaultdict(list)
+
+    for records in _record_lists(project_data):
+        for record in records:
+            hour = record.get("hour")
+            if not isinstance(hour, int):
+                continue
+            if _is_number(record.get("current_staff")):
+                staff[hour].append(record["current_staff"])
+                if _is_number(record.get("required_staff")):
+                    shortfall[hour].append(record["required_staff"] - record["current_staff"])
+            if _is_number(record.get("customer_count")):
+                customers[hour].append(record["customer_count"])
+
+    understaffed: Dict[int, Dict[str, float]] = {}
+    for hour, gaps in shortfall.items():
+        average_gap = statistics.fmean(gaps)
+        if average_gap > 0:
+            understaffed[hour] = {"missing_staff": round(average_gap, 1)}
+
+    if customers:
+        hourly_customers = {hour: statistics.fmean(v) for hour, v in customers.items()}
+        peak_level = _quantile(list(hourly_customers.values()), rules.peak_traffic_quantile)
+        load = {
+            hour: hourly_customers[hour] / statistics.fmean(staff[hour])
+            for hour in hourly_customers
+            if staff.get(hour) and statistics.fmean(staff[hour]) > 0
+        }
+        if len(load) >= 3:
+            typical_load = statistics.median(load.values())
+            for hour, hour_load in load.items():
+                if (hourly_customers[hour] >= peak_level
+                        and hour_load > rules.understaffing_load_ratio * typical_load):
+                    understaffed.setdefault(hour, {})["customers_per_staff"] = round(hour_load, 1)
+                    understaffed[hour]["typical_customers_per_staff"] = round(typical_load, 1)
+
+    if not understaffed:
+        return []
+
+    hours = sorted(understaffed)
+    missing = sum(details.get("missing_staff", 0) for details in understaffed.values())
+    return [_insight(
+        "understaffing", 1,
+        "Peak Hour Understaffing",
+        f"Staffing is short during {len(hours)} peak hour(s): "
+        f"{', '.join(f'{h:02d}:00' for h in hours)}.",
+        "staffing",
+        min(0.95, 0.6 + 0.05 * len(hours)),
+        "HIGH" if len(hours) >= 3 or missing >= 3 else "MEDIUM",
+        {"hours": {str(h): understaffed[h] for h in hours}},
+        [
+            f"Schedule additional staff for {', '.join(f'{h:02d}:00' for h in hours)}",
+            "Stagger shift starts to cover the ramp into peak periods"
+        ]
+    )]
+
+def price_outliers(
+    project_data: Dict[str, Any], rules: LocalInsightRules
+) -> List[Dict[str, Any]]:
+    """Menu items priced far from comparable items, by robust z-score within each category"""
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for records in _record_lists(project_data):
+        for record in records:
+            price = record.get("price", record.get("current_price"))
+            name = record.get("name") or record.get("item_name") or record.get("item_id")
+            if _is_number(price) and price > 0 and name:
+                groups[str(record.get("category") or "all")].append({"name": str(name), "price": float(price)})
+
+    insights = []
+    for group, items in sorted(groups.items()):
+        if len(items) < rules.min_price_group_size:
+            continue
+        prices = [item["price"] for item in items]
+        median = statistics.median(prices)
+        mad = statistics.median(abs(p - median) for p in prices)
+        if mad == 0:
+            continue
+        outliers = []
+        for item in items:
+            z = 0.6745 * (item["price"] - median) / mad
+            if abs(z) > rules.price_outlier_z:
+                outliers.append({**item, "robust_z": round(z, 2)})
+        if not outliers:
+            continue
+        insights.append(_insight(
+            "price-outlier", len(insights) + 1,
+            "Price Outlier Detected",
+            f"{len(outliers)} item(s) in {group} are priced far from the "
+            f"category median of {median:.2f}: {', '.join(o['name'] for o in outliers)}.",
+            "pricing",
+            min(0.95, 0.55 + 0.05 * len(items)),
+            "MEDIUM",
+            {"group": group, "median_price": median, "outliers": outliers},
+            [f"Review the price of {o['name']} against comparable items" for o in outliers]
+        ))
+    return insights
+
+def rating_drops(
+    project_data: Dict[str, Any], rules: LocalInsightRules
+) -> List[Dict[str, Any]]:
+    """Rating series whose recent half averages clearly below the earlier half"""
+    insights = []
+    for records in _record_lists(project_data):
+        points = []
+        for record in records:
+            rating = record.get("average_rating", record.get("rating"))
+            if _is_number(rating):
+                weight = record.get("review_count")
+                points.append((str(record.get("date", "")), float(rating), weight if _is_number(weight) and weight > 0 else 1))
+        if len(points) < rules.min_rating_points:
+            continue
+        if all(date for date, _, _ in points):
+            points.sort(key=lambda point: point[0])
+
+        half = len(points) // 2
+        earlier, recent = points[:half], points[half:]
+        before = sum(r * w for _, r, w in earlier) / sum(w for _, _, w in earlier)
+        after = sum(r * w for _, r, w in recent) / sum(w for _, _, w in recent)
+        drop = before - after
+        if drop < rules.rating_drop_threshold:
+            continue
+        insights.append(_insight(
+            "rating-drop", len(insights) + 1,
+            "Rating Drop",
+            f"Average rating fell from {before:.2f} to {after:.2f} over the period.",
+            "sentiment",
+            min(0.95, 0.6 + 0.02 * len(points)),
+            "HIGH" if drop >= 2 * rules.rating_drop_threshold else "MEDIUM",
+            {"previous_rating": round(before, 2), "recent_rating": round(after, 2), "points": len(points)},
+            [
+                "Read recent negative reviews for recurring complaints",
+                "Follow up on service or quality changes made during the period"
+            ]
+        ))
+    return insights
+
+LOCAL_RULES = [peak_hour_understaffing, price_outliers, rating_drops]
+
+def generate_local_insights(
+    project_data: Dict[str, Any],
+    rules: Optional[LocalInsightRules] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compute the common insights directly from numeric inputs.
+
+    Deterministic and fast enough to run on every request, so it serves
+    as the answer when there is nothing for the LLM to analyze or when
+    the LLM misses its latency budget.
+    """
+    rules = rules or LocalInsightRules()
+    insights = []
+    for rule in LOCAL_RULES:
+        insights.extend(rule(project_data, rules))
+    return insights
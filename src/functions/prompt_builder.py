@@ -0,0 +1,224 @@
+from pydantic import BaseModel
+from typing import Dict, Any, List, Optional, Tuple
+import json
+import math
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a character heuristic
+    tiktoken = None
+
+DEFAULT_TOKEN_BUDGET = 1000
+CHARS_PER_TOKEN = 4
+
+# Higher priority sections are kept intact the longest when trimming
+DEFAULT_SECTION_PRIORITIES: Dict[str, int] = {
+    "metrics": 10,
+    "anomalies": 9,
+    "recommendations": 9,
+    "pricing_analysis": 8,
+    "traffic_analysis": 8,
+    "sentiment_data": 8,
+    "category_insights": 7,
+    "opportunities": 7,
+    "forecasts": 6,
+    "timeframe": 6,
+    "venue_capacity": 6,
+    "market_context": 4,
+    "historical_data": 3,
+}
+DEFAULT_PRIORITY = 5
+
+_encoders: Dict[str, Any] = {}
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with tiktoken when available, otherwise estimate from length"""
+    if tiktoken is not None:
+        encoder = _encoders.get(model or "")
+        if encoder is None:
+            try:
+                encoder = tiktoken.encoding_for_model(model or "gpt-4")
+            except KeyError:
+                encoder = tiktoken.get_encoding("cl100k_base")
+            _encoders[model or ""] = encoder
+        return len(encoder.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def compact_json(value: Any) -> str:
+    """Serialize without whitespace; unknown types fall back to str"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def summarize_series(values: List[float]) -> Dict[str, Any]:
+    """Replace a numeric series with summary statistics"""
+    count = len(values)
+    mean = sum(values) / count
+    variance = sum((v - mean) ** 2 for v in values) / count
+    return {
+        "count": count,
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+        "mean": round(mean, 4),
+        "std": round(math.sqrt(variance), 4),
+        "first": values[0],
+        "last": values[-1],
+    }
+
+class PromptBuildResult(BaseModel):
+    text: str
+    tokens: int
+    summarized: List[str] = []
+    omitted: List[str] = []
+
+class PromptBuilder:
+    """
+    Serializes project data for an LLM prompt within a token budget.
+
+    Values are written as minified JSON with empty fields dropped,
+    uniform lists of records are written as column/row tables and long
+    numeric series are reduced to summary statistics. If the result is
+    still over budget, sections are summarized more aggressively and then
+    omitted, lowest priority first.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        priorities: Optional[Dict[str, int]] = None,
+        series_threshold: int = 24,
+        aggressive_threshold: int = 6,
+        max_string_length: int = 280,
+        model: Optional[str] = None
+    ):
+        self.token_budget = token_budget
+        self.priorities = {**DEFAULT_SECTION_PRIORITIES, **(priorities or {})}
+        self.series_threshold = series_threshold
+        self.aggressive_threshold = aggressive_threshold
+        self.max_string_length = max_string_length
+        self.model = model
+
+    def build(self, project_data: Dict[str, Any]) -> PromptBuildResult:
+        """Serialize project data, trimming sections until they fit the budget"""
+        sections: Dict[str, Tuple[Any, int]] = {}
+        for name, value in project_data.items():
+            compacted = self._compact(value, self.series_threshold, None)
+            if compacted is not None:
+                sections[name] = (compacted, self._section_tokens(name, compacted))
+
+        total = sum(tokens for _, tokens in sections.values())
+        by_priority = sorted(
+            sections, key=lambda name: self.priorities.get(name, DEFAULT_PRIORITY)
+        )
+        summarized: List[str] = []
+        omitted: List[str] = []
+
+        for name in by_priority:
+            if total <= self.token_budget:
+                break
+            compacted = self._compact(
+                project_data[name], self.aggressive_threshold, self.max_string_length
+            )
+            tokens = self._section_tokens(name, compacted)
+            if tokens < sections[name][1]:
+                total -= sections[name][1] - tokens
+                sections[name] = (compacted, tokens)
+                summarized.append(name)
+
+        for name in by_priority:
+            if total <= self.token_budget:
+                break
+            total -= sections.pop(name)[1]
+            omitted.append(name)
+
+        payload = {name: value for name, (value, _) in sections.items()}
+        if omitted:
+            payload["_omitted"] = omitted
+        text = compact_json(payload)
+        return PromptBuildResult(
+            text=text,
+            tokens=count_tokens(text, self.model),
+            summarized=summarized,
+            omitted=omitted
+        )
+
+    def _section_tokens(self, name: str, value: Any) -> int:
+        return count_tokens(compact_json({name: value}), self.model)
+
+    def _compact(self, value: Any, series_threshold: int, max_string: Optional[int]) -> Any:
+        """Return a smaller equivalent of value, or None if it carries nothing"""
+        if isinstance(value, BaseModel):
+            value = value.model_dump()
+        if value is None or value is Ellipsis:
+            return None
+        if isinstance(value, str):
+            if max_string is not None and len(value) > max_string:
+                return value[:max_string] + "…"
+            return value
+        if isinstance(value, float):
+            return round(value, 4)
+        if isinstance(value, dict):
+            compacted = {}
+            for key, item in value.items():
+                item = self._compact(item, series_threshold, max_string)
+                if item is not None:
+                    compacted[key] = item
+            return compacted or None
+        if isinstance(value, (list, tuple)):
+            return self._compact_list(list(value), series_threshold, max_string)
+        return value
+
+    def _compact_list(self, values: List[Any], series_threshold: int, max_string: Optional[int]) -> Any:
+        values = [v for v in values if v is not None and v is not Ellipsis]
+        if not values:
+            return None
+
+        if all(_is_number(v) for v in values):
+            if len(values) > series_threshold:
+                return {"series_summary": summarize_series(values)}
+            return [round(v, 4) if isinstance(v, float) else v for v in values]
+
+        if all(isinstance(v, dict) for v in values):
+            columns = list(values[0].keys())
+            if all(list(v.keys()) == columns for v in values):
+                return self._compact_table(values, columns, series_threshold, max_string)
+
+        compacted = [self._compact(v, series_threshold, max_string) for v in values]
+        compacted = [v for v in compacted if v is not None]
+        if len(compacted) > series_threshold:
+            return compacted[:series_threshold] + [{"omitted_items": len(compacted) - series_threshold}]
+        return compacted or None
+
+    def _compact_table(
+        self,
+        rows: List[Dict[str, Any]],
+        columns: List[str],
+        series_threshold: int,
+        max_string: Optional[int]
+    ) -> Dict[str, Any]:
+        """Write uniform records as a table, summarizing numeric columns when long"""
+        if len(rows) <= series_threshold:
+            return {
+                "columns": columns,
+                "rows": [
+                    [self._compact(row[c], series_threshold, max_string) for c in columns]
+                    for row in rows
+                ]
+            }
+
+        summary = {}
+        for column in columns:
+            column_values = [row[column] for row in rows]
+            if all(_is_number(v) for v in column_values):
+                summary[column] = summarize_series(column_values)
+        tail = rows[-3:]
+        return {
+            "row_count": len(rows),
+            "column_summary": summary,
+            "columns": columns,
+            "last_rows": [
+                [self._compact(row[c], series_threshold, max_string) for c in columns]
+                for row in tail
+            ]
+        }
@@ -0,0 +1,316 @@
+import asyncio
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.functions.prompt_builder import count_tokens
+
+
+class Priority(IntEnum):
+    """Queue lanes; lower values are served first"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+class RateLimitConfig(BaseModel):
+    """Provider limits; a limit of None is not enforced"""
+
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    default_completion_tokens: int = 512  # Assumed output size when not capped
+    shared_state_path: Optional[str] = None  # SQLite file shared across processes
+
+    @classmethod
+    def from_env(cls) -> "RateLimitConfig":
+        """Read LLM_RPM, LLM_TPM and LLM_RATE_LIMIT_DB"""
+        return cls(
+            requests_per_minute=int(os.environ["LLM_RPM"]) if os.environ.get("LLM_RPM") else None,
+            tokens_per_minute=int(os.environ["LLM_TPM"]) if os.environ.get("LLM_TPM") else None,
+            shared_state_path=os.environ.get("LLM_RATE_LIMIT_DB") or None,
+        )
+
+
+class LaneStats(BaseModel):
+    granted: int = 0
+    total_wait: float = 0.0  # seconds
+    max_wait: float = 0.0  # seconds
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.granted if self.granted else 0.0
+
+
+def estimate_request_tokens(
+    messages: List[Any], max_tokens: Optional[int] = None, default_completion_tokens: int = 512
+) -> int:
+    """Estimate the prompt plus completion tokens a chat request will be billed for"""
+    prompt = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", "")
+        prompt += count_tokens(content or "") + 4
+    return prompt + (max_tokens or default_completion_tokens)
+
+
+class _LocalBuckets:
+    """Request and token buckets held in this process"""
+
+    blocking = False
+
+    def __init__(self, config: RateLimitConfig) -> None:
+        # name -> (capacity, refill per second, level, last refill time)
+        self._buckets: Dict[str, List[float]] = {}
+        now = time.monotonic()
+        for name, per_minute in (
+            ("requests", config.requests_per_minute),
+            ("tokens", config.tokens_per_minute),
+        ):
+            if per_minute:
+                self._buckets[name] = [per_minute, per_minute / 60.0, per_minute, now]
+
+    def try_consume(self, tokens: int) -> float:
+        """Take one request and `tokens` if both are available, else return the wait"""
+        now = time.monotonic()
+        wanted = {"requests": 1, "tokens": tokens}
+        wait = 0.0
+        for name, bucket in self._buckets.items():
+            capacity, rate, level, updated = bucket
+            bucket[2] = level = min(capacity, level + (now - updated) * rate)
+            bucket[3] = now
+            amount = min(wanted[name], capacity)
+            if level < amount:
+                wait = max(wait, (amount - level) / rate)
+        if wait == 0.0:
+            for name, bucket in self._buckets.items():
+                bucket[2] -= min(wanted[name], bucket[0])
+        return wait
+
+    def adjust(self, tokens: int) -> None:
+        bucket = self._buckets.get("tokens")
+        if bucket is not None:
+            bucket[2] = min(bucket[0], bucket[2] - tokens)
+
+
+class _SqliteBuckets:
+    """
+    Buckets stored in a SQLite file so several worker processes share one budget.
+
+    Calls block on file locks, so the limiter runs them in a worker thread;
+    the lock serializes this process's threads on the one connection.
+    """
+
+    blocking = True
+
+    def __init__(self, config: RateLimitConfig) -> None:
+        self._lock = threading.Lock()
+        Path(config.shared_state_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            config.shared_state_path, timeout=0.05, isolation_level=None, check_same_thread=False
+        )
+        self._limits = {
+            name: per_minute
+            for name, per_minute in (
+                ("requests", config.requests_per_minute),
+                ("tokens", config.tokens_per_minute),
+            )
+            if per_minute
+        }
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (name TEXT PRIMARY KEY, level REAL, updated REAL)"
+        )
+
+    def _levels(self, now: float) -> Dict[str, float]:
+        levels = {}
+        for name, per_minute in self._limits.items():
+            row = self._conn.execute(
+                "SELECT level, updated FROM rate_buckets WHERE name = ?", (name,)
+            ).fetchone()
+            level, updated = row if row else (per_minute, now)
+            levels[name] = min(per_minute, level + (now - updated) * per_minute / 60.0)
+        return levels
+
+    def _store(self, levels: Dict[str, float], now: float) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO rate_buckets (name, level, updated) VALUES (?, ?, ?)",
+            [(name, level, now) for name, level in levels.items()],
+        )
+
+    def try_consume(self, tokens: int) -> float:
+        now = time.time()
+        wanted = {"requests": 1, "tokens": tokens}
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                return 0.01  # Another process holds the lock; retry shortly
+            try:
+                levels = self._levels(now)
+                wait = 0.0
+                for name, level in levels.items():
+                    amount = min(wanted[name], self._limits[name])
+                    if level < amount:
+                        wait = max(wait, (amount - level) * 60.0 / self._limits[name])
+                if wait == 0.0:
+                    for name in levels:
+                        levels[name] -= min(wanted[name], self._limits[name])
+                self._store(levels, now)
+                self._conn.execute("COMMIT")
+                return wait
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def adjust(self, tokens: int) -> None:
+        if "tokens" not in self._limits:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                return  # Best effort; the estimate already charged most of the cost
+            try:
+                levels = self._levels(now)
+                levels["tokens"] = min(self._limits["tokens"], levels["tokens"] - tokens)
+                self._store(levels, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+class LlmRateLimiter:
+    """
+    Token-bucket scheduler for requests-per-minute and tokens-per-minute.
+
+    Callers are queued rather than rejected: each waits in a priority lane
+    until both buckets can cover its estimated cost, and lanes are served
+    strictly in priority order, first come first served within a lane.
+    Once the real usage is known, ``settle`` corrects the token bucket by
+    the difference from the estimate.
+    """
+
+    def __init__(self, config: Optional[RateLimitConfig] = None) -> None:
+        self.config = config or RateLimitConfig.from_env()
+        self.enabled = bool(self.config.requests_per_minute or self.config.tokens_per_minute)
+        self._buckets = (
+            _SqliteBuckets(self.config) if self.config.shared_state_path else _LocalBuckets(self.config)
+        )
+        self._queue: List[Tuple[int, int, asyncio.Future, int]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.lanes: Dict[Priority, LaneStats] = {p: LaneStats() for p in Priority}
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, estimated_tokens: int, priority: Priority = Priority.NORMAL) -> float:
+        """Wait until the request may be sent, returning the time spent queued"""
+        if not self.enabled:
+            return 0.0
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future, estimated_tokens))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+
+        waited = time.monotonic() - started
+        stats = self.lanes[Priority(priority)]
+        stats.granted += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        return waited
+
+    async def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Charge or refund the difference between estimated and billed tokens"""
+        if self.enabled and actual_tokens is not None and actual_tokens != estimated_tokens:
+            await self._call_buckets(self._buckets.adjust, actual_tokens - estimated_tokens)
+
+    async def _call_buckets(self, method: Any, tokens: int) -> Any:
+        # Shared buckets wait on SQLite locks, which must not stall the event loop
+        if self._buckets.blocking:
+            return await asyncio.to_thread(method, tokens)
+        return method(tokens)
+
+    @asynccontextmanager
+    async def limit(
+        self, messages: List[Any], priority: Priority = Priority.NORMAL, max_tokens: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Hold a rate-limit grant around one request; set ``usage["total_tokens"]``
+        on the yielded dict to settle the estimate afterwards.
+        """
+        estimate = estimate_request_tokens(
+            messages, max_tokens, self.config.default_completion_tokens
+        )
+        usage: Dict[str, Any] = {"estimated_tokens": estimate, "total_tokens": None}
+        usage["queue_wait"] = await self.acquire(estimate, priority)
+        try:
+            yield usage
+        finally:
+            await self.settle(estimate, usage["total_tokens"])
+
+    def _dispatch(self) -> None:
+        """Make sure one dispatcher task is serving the queue"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._serve())
+
+    async def _serve(self) -> None:
+        while self._queue:
+            entry = self._queue[0]
+            _, _, future, tokens = entry
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            wait = await self._call_buckets(self._buckets.try_consume, tokens)
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            # The head may have changed while the bucket call ran; grant the entry that was charged
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            if future.done():
+                await self._call_buckets(self._buckets.adjust, -tokens)
+                continue
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "lanes": {
+                priority.name.lower(): {**lane.model_dump(), "average_wait": lane.average_wait}
+                for priority, lane in self.lanes.items()
+            },
+        }
+
+
+# Global limiter instance
+_limiter: Optional[LlmRateLimiter] = None
+
+
+def get_rate_limiter() -> LlmRateLimiter:
+    """Get the global LLM rate limiter"""
+    global _limiter
+    if _limiter is None:
+        _limiter = LlmRateLimiter()
+    return _limiter
@@ -0,0 +1,248 @@
+from typing import Dict, Any, List, Optional, Iterator
+from abc import ABC, abstractmethod
+from collections import deque
+from enum import IntEnum
+from pathlib import Path
+import asyncio
+import json
+import logging
+import os
+import random
+import weakref
+from pydantic import BaseModel, Field
+
+class AuditLevel(IntEnum):
+    """Severity of an audited agent action"""
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+class AuditConfig(BaseModel):
+    """Controls how much of an agent's activity is retained and flushed"""
+    buffer_size: int = Field(500, ge=1)
+    min_level: AuditLevel = AuditLevel.INFO
+    action_levels: Dict[str, AuditLevel] = {}
+    sample_rates: Dict[str, float] = {}  # action -> probability of keeping
+    flush_batch_size: int = Field(200, ge=1)
+
+class AuditEntry:
+    """Single audited action; details are only serialized when flushed"""
+
+    __slots__ = ("timestamp", "action", "agent_type", "level", "details")
+
+    def __init__(
+        self,
+        timestamp: int,
+        action: str,
+        agent_type: str,
+        level: AuditLevel,
+        details: Dict[str, Any]
+    ):
+        self.timestamp = timestamp
+        self.action = action
+        self.agent_type = agent_type
+        self.level = level
+        self.details = details
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "action": self.action,
+            "agent_type": self.agent_type,
+            "level": self.level.name,
+            "details": self.details
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=str, separators=(",", ":"))
+
+    def __getitem__(self, key: str) -> Any:
+        # Keeps dict-style access working for code that read the old list of dicts
+        return self.to_dict()[key]
+
+class AuditSink(ABC):
+    """Durable destination for flushed audit entries"""
+
+    @abstractmethod
+    async def write_batch(self, entries: List[AuditEntry]) -> None:
+        ...
+
+class JsonlAuditSink(AuditSink):
+    """Appends audit entries to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    async def write_batch(self, entries: List[AuditEntry]) -> None:
+        if not entries:
+            return
+        lines = "".join(entry.to_json() + "\n" for entry in entries)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+class AuditLog:
+    """
+    Fixed-size in-memory audit trail for one agent.
+
+    Recording is a level check, an optional sampling draw and two deque
+    appends; nothing is formatted or written on the calling path. Entries
+    waiting for the sink live in a second bounded deque, so an absent or
+    slow flusher drops the oldest entries instead of growing memory.
+    """
+
+    def __init__(self, agent_type: str, config: Optional[AuditConfig] = None):
+        self.agent_type = agent_type
+        self.config = config or AuditConfig()
+        self._buffer: deque = deque(maxlen=self.config.buffer_size)
+        self._pending: deque = deque(maxlen=self.config.buffer_size)
+        self.dropped = 0
+        get_audit_flusher().register(self)
+
+    def level_for(self, action: str, level: Optional[AuditLevel] = None) -> AuditLevel:
+        """Resolve the effective level of an action"""
+        if level is not None:
+            return level
+        return self.config.action_levels.get(action, AuditLevel.INFO)
+
+    def is_enabled_for(self, action: str, level: Optional[AuditLevel] = None) -> bool:
+        """Check whether an action would be recorded, before building its details"""
+        return self.level_for(action, level) >= self.config.min_level
+
+    def record(
+        self,
+        timestamp: int,
+        action: str,
+        details: Dict[str, Any],
+        level: Optional[AuditLevel] = None
+    ) -> Optional[AuditEntry]:
+        """Record an action, returning the entry or None if it was filtered out"""
+        effective_level = self.level_for(action, level)
+        if effective_level < self.config.min_level:
+            return None
+
+        sample_rate = self.config.sample_rates.get(action)
+        if (sample_rate is not None and effective_level < AuditLevel.WARNING
+                and random.random() >= sample_rate):
+            return None
+
+        entry = AuditEntry(timestamp, action, self.agent_type, effective_level, details)
+        self._buffer.append(entry)
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(entry)
+        return entry
+
+    def drain(self, limit: int) -> List[AuditEntry]:
+        """Remove up to `limit` entries awaiting the sink"""
+        batch = []
+        while self._pending and len(batch) < limit:
+            batch.append(self._pending.popleft())
+        return batch
+
+    def requeue(self, entries: List[AuditEntry]) -> None:
+        """
+        Put back a batch the sink failed to write.
+
+        The batch is older than anything still pending, so when the queue
+        cannot hold it all its oldest entries are dropped and counted, as
+        a full queue does on append.
+        """
+        overflow = len(entries) - (self._pending.maxlen - len(self._pending))
+        if overflow > 0:
+            self.dropped += overflow
+            logging.warning("Audit queue full for %s, dropped %d oldest entries", self.agent_type, overflow)
+            entries = entries[overflow:]
+        self._pending.extendleft(reversed(entries))
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Materialize the retained entries as dicts"""
+        return [entry.to_dict() for entry in self._buffer]
+
+    def __iter__(self) -> Iterator[AuditEntry]:
+        return iter(self._buffer)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+class AuditFlusher:
+    """Background task that flushes all registered audit logs to a sink"""
+
+    def __init__(self, sink: Optional[AuditSink] = None):
+        self.sink = sink
+        self._logs: "weakref.WeakSet[AuditLog]" = weakref.WeakSet()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, audit_log: AuditLog) -> None:
+        self._logs.add(audit_log)
+
+    async def flush(self) -> int:
+        """Flush every pending entry, returning the number written"""
+        if self.sink is None:
+            return 0
+
+        written = 0
+        for audit_log in list(self._logs):
+            while True:
+                batch = audit_log.drain(audit_log.config.flush_batch_size)
+                if not batch:
+                    break
+                try:
+                    await self.sink.write_batch(batch)
+                except Exception as e:
+                    audit_log.requeue(batch)
+                    logging.error("Error flushing audit log: %s", str(e))
+                    return written
+                written += len(batch)
+        return written
+
+    def start(self, interval: float = 5.0) -> None:
+        """Start periodic flushing on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """Stop the periodic task and write out whatever is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+# Global flusher instance
+_flusher: Optional[AuditFlusher] = None
+
+def get_audit_flusher() -> AuditFlusher:
+    """Get the global audit flusher instance"""
+    global _flusher
+    if _flusher is None:
+        _flusher = AuditFlusher()
+    return _flusher
+
+async def setup_audit_logging(
+    sink: Optional[AuditSink] = None,
+    flush_interval: float = 5.0
+) -> None:
+    """Attach a sink and start flushing audit logs in the background"""
+    if sink is None:
+        path = os.environ.get("AUDIT_LOG_PATH")
+        if not path:
+            logging.info("AUDIT_LOG_PATH not set, audit entries stay in memory")
+            return
+        sink = JsonlAuditSink(path)
+
+    flusher = get_audit_flusher()
+    flusher.sink = sink
+    flusher.start(flush_interval)
@@ -0,0 +1,242 @@
+from typing import Dict, Any, List, Optional, AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+from pathlib import Path
+import asyncio
+import bisect
+import logging
+import os
+import time
+from pydantic import BaseModel
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0]
+
+# HTTP attempts made by the LLM call running in the current task
+_http_attempts: ContextVar[Optional[List[int]]] = ContextVar("llm_http_attempts", default=None)
+
+async def count_http_attempt(request: Any) -> None:
+    """httpx request hook counting attempts, so client-side retries are visible"""
+    attempts = _http_attempts.get()
+    if attempts is not None:
+        attempts[0] += 1
+
+class LlmCallRecord(BaseModel):
+    """Measurements for a single LLM call"""
+    timestamp: float
+    function: str
+    model: str
+    agent: Optional[str] = None
+    workflow_id: Optional[str] = None
+    category: Optional[str] = None
+    categories: List[str] = []  # Constituents of a batched call, each aggregated separately
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0  # seconds
+    time_to_first_token: Optional[float] = None  # seconds from leaving the queue, streaming only
+    queue_wait: float = 0.0  # seconds spent in the rate limiter
+    cache_hit: bool = False
+    retries: int = 0
+    success: bool = True
+    error: Optional[str] = None
+
+    def set_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        if usage:
+            self.prompt_tokens = usage.get("prompt_tokens") or 0
+            self.completion_tokens = usage.get("completion_tokens") or 0
+
+class Histogram:
+    """Fixed-bucket histogram with approximate percentiles"""
+
+    def __init__(self, bounds: List[float] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile"""
+        if self.count == 0:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {
+                (f"le_{bound}" if i < len(self.bounds) else "inf"): count
+                for i, (bound, count) in enumerate(zip(self.bounds + [None], self.counts))
+            },
+        }
+
+class LlmCallStats:
+    """Running aggregates for one agent or category"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = Histogram()
+        self.time_to_first_token = Histogram()
+        self.queue_wait = Histogram()
+
+    def add(self, record: LlmCallRecord) -> None:
+        self.calls += 1
+        self.errors += 0 if record.success else 1
+        self.cache_hits += int(record.cache_hit)
+        self.retries += record.retries
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.latency.observe(record.latency)
+        self.queue_wait.observe(record.queue_wait)
+        if record.time_to_first_token is not None:
+            self.time_to_first_token.observe(record.time_to_first_token)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency": self.latency.to_dict(),
+            "time_to_first_token": self.time_to_first_token.to_dict(),
+            "queue_wait": self.queue_wait.to_dict(),
+        }
+
+class LlmTraceWriter:
+    """Buffers call records and appends them to a JSONL trace file off the event loop"""
+
+    def __init__(self, path: str, flush_size: int = 50):
+        self.path = Path(path)
+        self.flush_size = flush_size
+        self._buffer: List[str] = []
+
+    def add(self, record: LlmCallRecord) -> None:
+        self._buffer.append(record.model_dump_json())
+        if len(self._buffer) >= self.flush_size:
+            try:
+                asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                self._write(self._take())
+
+    async def flush(self) -> None:
+        lines = self._take()
+        if lines:
+            await asyncio.to_thread(self._write, lines)
+
+    def _take(self) -> List[str]:
+        lines, self._buffer = self._buffer, []
+        return lines
+
+    def _write(self, lines: List[str]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logging.error("Error writing LLM trace: %s", str(e))
+
+class LlmMetrics:
+    """Per-agent and per-category aggregates of LLM calls, plus the optional trace"""
+
+    def __init__(self, trace_path: Optional[str] = None):
+        self.by_agent: Dict[str, LlmCallStats] = defaultdict(LlmCallStats)
+        self.by_category: Dict[str, LlmCallStats] = defaultdict(LlmCallStats)
+        trace_path = trace_path or os.environ.get("LLM_TRACE_PATH")
+        self.trace = LlmTraceWriter(trace_path) if trace_path else None
+
+    def record(self, record: LlmCallRecord) -> None:
+        self.by_agent[record.agent or "unknown"].add(record)
+        # A batched call counts once in each of its categories' stats
+        for category in record.categories or [record.category or record.function]:
+            self.by_category[category].add(record)
+        if self.trace is not None:
+            self.trace.add(record)
+
+    async def flush(self) -> None:
+        if self.trace is not None:
+            await self.trace.flush()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "by_agent": {name: stats.to_dict() for name, stats in self.by_agent.items()},
+            "by_category": {name: stats.to_dict() for name, stats in self.by_category.items()},
+        }
+
+class LlmCallTracker:
+    """Handle used inside track_llm_call to fill in what only the caller knows"""
+
+    def __init__(self, record: LlmCallRecord, started: float):
+        self.record = record
+        self._request_started = started
+
+    def dequeued(self, queue_wait: float) -> None:
+        """Mark the rate limiter's grant, so time to first token excludes the queue"""
+        self.record.queue_wait = queue_wait
+        self._request_started = time.perf_counter()
+
+    def first_token(self) -> None:
+        if self.record.time_to_first_token is None:
+            self.record.time_to_first_token = time.perf_counter() - self._request_started
+
+@asynccontextmanager
+async def track_llm_call(
+    function: str,
+    model: str,
+    agent: Optional[str] = None,
+    workflow_id: Optional[str] = None,
+    category: Optional[str] = None,
+    cache_hit: bool = False,
+    categories: Optional[List[str]] = None
+) -> AsyncIterator[LlmCallTracker]:
+    """Time an LLM call, count its HTTP retries and report it to the performance monitor"""
+    from src.monitoring.performance_monitor import get_monitor
+
+    started = time.perf_counter()
+    tracker = LlmCallTracker(
+        LlmCallRecord(
+            timestamp=time.time(),
+            function=function,
+            model=model,
+            agent=agent,
+            workflow_id=workflow_id,
+            category=category,
+            categories=categories or [],
+            cache_hit=cache_hit,
+        ),
+        started,
+    )
+    attempts = [0]
+    token = _http_attempts.set(attempts)
+    try:
+        yield tracker
+    except BaseException as e:  # Includes cancellation, e.g. after a latency budget overrun
+        tracker.record.success = False
+        tracker.record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _http_attempts.reset(token)
+        tracker.record.latency = time.perf_counter() - started
+        tracker.record.retries = max(0, attempts[0] - 1)
+        get_monitor().record_llm_call(tracker.record)
@@ -6,6 +6,7 @@ from datetime import datetime
 from collections import defaultdict
 import asyncio
 from pydantic import BaseModel
+from src.monitoring.llm_metrics import LlmCallRecord, LlmMetrics
 
 class AgentMetrics(BaseModel):
     """Metrics for individual agent operations"""
@@ -35,6 +36,7 @@ class PerformanceMonitor:
         self.start_time = time.time()
         self._cache_stats = {"hits": 0, "misses": 0}
         self._active_operations: Dict[str, Dict[str, Any]] = {}
+        self.llm_metrics = LlmMetrics()
         
     async def start_monitoring(self):
         """Start the monitoring system"""
@@ -100,6 +102,14 @@ class PerformanceMonitor:
             self._cache_stats["hits"] / total if total > 0 else 0.0
         )
     
+    def record_llm_call(self, record: LlmCallRecord):
+        """Record a completed LLM call"""
+        self.llm_metrics.record(record)
+    
+    def get_llm_metrics(self) -> Dict[str, Any]:
+        """Get LLM call histograms grouped by agent and by category"""
+        return self.llm_metrics.summary()
+    
     def record_insight_generated(self):
         """Record a generated insight"""
         self.system_metrics.total_insights_generated += 1
@@ -119,6 +129,9 @@ class PerformanceMonitor:
                         self.get_system_status()
                     )
                 
+                # Write out buffered LLM call traces
+                await self.llm_metrics.flush()
+                
                 # Check for stalled operations
                 current_time = time.time()
                 for op_id, op_data in list(self._active_operations.items()):
@@ -6,6 +6,9 @@ from src.agents.sales_agent import SalesAgent
 from src.agents.pricing_agent import PricingAgent
 from src.agents.traffic_agent import TrafficAgent
 from src.agents.sentiment_agent import SentimentAgent
+from src.functions.analyze_insights import (
+    AnalyzeInsightsBatchInput, InsightSection, analyze_insights_batch
+)
 from restack_ai.agent import log
 
 class WorkflowMonitoring(BaseModel):
@@ -141,10 +144,19 @@ class AgentOrchestrator:
             primary_agent_class = self._registered_agents[workflow.primary_agent]
             primary_agent = primary_agent_class()
 
+            # Generate insights for every participating agent in one LLM round trip
+            batched_insights = {}
+            if context and context.get("insight_sections"):
+                workflow.monitoring.resource_usage["external_api_calls"] += 1
+                batched_insights = await self.request_batched_insights(
+                    context["insight_sections"]
+                )
+
             # Execute supporting agent tasks with parallel processing and error handling
             supporting_results = await self._execute_supporting_agents(
                 workflow.supporting_agents,
-                context
+                context,
+                batched_insights
             )
 
             # Execute primary agent task with supporting results
@@ -153,7 +165,7 @@ class AgentOrchestrator:
             result = await self._execute_agent_task(
                 primary_agent,
                 {
-                    **(context or {}),
+                    **self._agent_context(workflow.primary_agent, context, batched_insights),
                     "supporting_results": supporting_results
                 }
             )
@@ -184,10 +196,52 @@ class AgentOrchestrator:
                      context=workflow.dict())
             raise
 
+    async def request_batched_insights(
+        self,
+        insight_sections: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Generate insights for several agent categories with a single request
+
+        Args:
+            insight_sections: Project data to analyze, keyed by agent name
+
+        Returns:
+            Insights keyed by agent name
+        """
+        batch_result = await analyze_insights_batch(AnalyzeInsightsBatchInput(
+            sections=[
+                InsightSection(category=agent_name, project_data=project_data)
+                for agent_name, project_data in insight_sections.items()
+            ],
+            agent=self.__class__.__name__
+        ))
+        log.info("Batched insight generation complete",
+                 batched=batch_result["batched_categories"],
+                 fallback=batch_result["fallback_categories"])
+        return {
+            agent_name: result.get("insights", [])
+            for agent_name, result in batch_result["results"].items()
+        }
+
+    def _agent_context(
+        self,
+        agent_name: str,
+        context: Optional[Dict[str, Any]],
+        batched_insights: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Build the context for one agent, including its share of batched insights"""
+        agent_context = dict(context or {})
+        agent_context.pop("insight_sections", None)
+        if agent_name in batched_insights:
+            agent_context["precomputed_insights"] = batched_insights[agent_name]
+        return agent_context
+
     async def _execute_supporting_agents(
         self,
         agent_names: List[str],
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        batched_insights: Optional[Dict[str, List[Dict[str, Any]]]] = None
     ) -> Dict[str, Any]:
         """Execute supporting agent tasks with parallel processing"""
         results = {}
@@ -196,7 +250,7 @@ class AgentOrchestrator:
                 try:
                     agent = self._registered_agents[agent_name]()
                     results[agent_name] = await self._execute_agent_task(
-                        agent, context
+                        agent, self._agent_context(agent_name, context, batched_insights or {})
                     )
                 except Exception as e:
                     log.error(f"Supporting agent {agent_name} failed",
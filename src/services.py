@@ -15,8 +15,10 @@ from src.agents.sales_agent import SalesAgent
 from src.orchestration.agent_orchestrator import AgentOrchestrator, OrchestrationInput, OrchestrationConfig
 from src.client import client
 from src.functions.llm_chat import llm_chat
+from src.functions.llm_tool_loop import llm_chat_with_tools
 from src.functions.fetch_project_data import fetch_project_data
-from src.functions.analyze_insights import analyze_insights
+from src.functions.fetch_sales_data import fetch_sales_aggregates
+from src.functions.analyze_insights import analyze_insights, analyze_insights_batch
 
 class ServiceConfig(BaseModel):
     """Configuration for the BiteBase service"""
@@ -66,15 +68,20 @@ async def main(config: Optional[ServiceConfig] = None) -> None:
     # Register core functions
     functions = [
         llm_chat,
+        llm_chat_with_tools,
         fetch_project_data,
+        fetch_sales_aggregates,
         analyze_insights,
+        analyze_insights_batch,
         analyze_project
     ]
     
     # Initialize monitoring if enabled
     if config.enable_monitoring:
         from src.monitoring.performance_monitor import setup_monitoring
+        from src.monitoring.audit import setup_audit_logging
         await setup_monitoring()
+        await setup_audit_logging()
     
     # Start the service
     await client.start_service(
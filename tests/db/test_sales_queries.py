@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql
+
+from src.analytics.anomaly import collect_sales_series
+from src.db.sales_queries import items_sold_query, parse_timeframe, pivot_series, sales_series_query
+
+def compile_postgres(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+def test_parse_timeframe():
+    """Test that short timeframes are bucketed by hour and longer ones by day"""
+    assert parse_timeframe("7d") == (timedelta(days=7), "hour")
+    assert parse_timeframe("last_90_days") == (timedelta(days=90), "day")
+    assert parse_timeframe("month") == (timedelta(days=30), "day")
+    assert parse_timeframe("last_2_weeks") == (timedelta(weeks=2), "day")
+
+def test_queries_aggregate_in_database():
+    """Test that bucketing, grouping and JSON unpacking are part of the SQL"""
+    start, end = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    series_sql = compile_postgres(sales_series_query("day", start, end, [1, 2]))
+    assert "date_trunc" in series_sql
+    assert "GROUP BY restaurant_analytics.restaurant_id" in series_sql
+
+    items_sql = compile_postgres(items_sold_query(start, end))
+    assert "json_each_text" in items_sql
+    assert "json_array_elements_text" in items_sql
+    assert "GROUP BY items.item" in items_sql
+
+def test_pivot_series_fills_missing_buckets():
+    """Test that grouped rows become dense per-restaurant arrays readable by the analytics"""
+    start = datetime(2024, 1, 1)
+    rows = [
+        (1, start, 100.0, 4, 25.0),
+        (1, start + timedelta(days=2), 60.0, 3, 20.0),
+        (2, start + timedelta(days=1), 80.0, 2, 40.0),
+    ]
+    by_restaurant = pivot_series(
+        rows, ["revenue", "transactions", "average_ticket"], "day", start, start + timedelta(days=3)
+    )
+
+    assert by_restaurant["1"]["revenue"] == [100.0, None, 60.0]
+    assert by_restaurant["2"]["transactions"] == [None, 2.0, None]
+
+    restaurants, metrics, values = collect_sales_series({"series": {"by_restaurant": by_restaurant}})
+    assert restaurants == ["1", "2"]
+    assert values.shape == (2, 3, 3)
@@ -0,0 +1,83 @@
+import pytest
+import asyncio
+import json
+from src.functions import analyze_insights as analyze_insights_module
+from src.functions.analyze_insights import (
+    AnalyzeInsightsBatchInput, AnalyzeInsightsInput, InsightSection, analyze_insights_batch
+)
+
+SALES_INSIGHT = {
+    "id": "ins-sales",
+    "title": "Weekend revenue dip",
+    "description": "Saturday revenue is down 12% week over week.",
+    "category": "sales",
+    "confidence": 0.8,
+    "impact": "MEDIUM",
+    "supporting_data": {},
+    "recommendations": ["Run a weekend promotion"]
+}
+
+def completion(content):
+    return {"choices": [{"message": {"content": json.dumps(content)}}]}
+
+@pytest.fixture
+def sections():
+    return AnalyzeInsightsBatchInput(
+        sections=[
+            InsightSection(category="sales", project_data={"metrics": {"revenue": 100}}),
+            InsightSection(category="traffic", project_data={"visits": [1, 2, 3]}),
+        ],
+        use_cache=False
+    )
+
+@pytest.mark.asyncio
+async def test_batch_uses_one_round_trip(monkeypatch, sections):
+    """Test that all categories are answered by a single completion"""
+    calls = []
+
+    async def fake_completion(messages, category, use_cache, priority, **call_context):
+        calls.append(messages)
+        return completion({"sales": [SALES_INSIGHT], "traffic": {"insights": []}})
+
+    monkeypatch.setattr(analyze_insights_module, "_request_completion", fake_completion)
+    result = await analyze_insights_batch(sections)
+
+    assert len(calls) == 1
+    assert result["results"]["sales"]["insights"] == [SALES_INSIGHT]
+    assert result["results"]["traffic"]["insights"] == []
+    assert result["fallback_categories"] == []
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_per_category(monkeypatch, sections):
+    """Test that categories missing from the batched answer are requested individually"""
+    async def fake_completion(messages, category, use_cache, priority, **call_context):
+        return completion({"sales": [SALES_INSIGHT]})
+
+    async def fake_analyze_insights(input_data):
+        return {"insights": [], "category": input_data.category}
+
+    monkeypatch.setattr(analyze_insights_module, "_request_completion", fake_completion)
+    monkeypatch.setattr(analyze_insights_module, "analyze_insights", fake_analyze_insights)
+    result = await analyze_insights_batch(sections)
+
+    assert result["batched_categories"] == ["sales"]
+    assert result["fallback_categories"] == ["traffic"]
+    assert result["results"]["traffic"]["category"] == "traffic"
+
+@pytest.mark.asyncio
+async def test_latency_budget_returns_local_insights(monkeypatch):
+    """Test that a slow LLM is replaced by local insights within the budget"""
+    async def slow_completion(messages, category, use_cache, priority, **call_context):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(analyze_insights_module, "_request_completion", slow_completion)
+    result = await analyze_insights_module.analyze_insights(AnalyzeInsightsInput(
+        project_data={"staffing": [{"hour": 19, "required_staff": 6, "current_staff": 4}]},
+        category="traffic",
+        use_cache=False,
+        latency_budget_ms=20
+    ))
+
+    assert result["source"] == "local"
+    assert result["fallback_reason"] == "latency_budget"
+    assert result["insights"][0]["title"] == "Peak Hour Understaffing"
@@ -0,0 +1,90 @@
+import time
+import numpy as np
+from src.analytics.anomaly import (
+    AnomalyConfig, collect_sales_series, detect_anomaly_scores, find_sales_anomalies, seasonal_profile
+)
+
+WEEKLY_PATTERN = np.array([1.0, 0.9, 0.95, 1.0, 1.2, 1.6, 1.5])
+
+def weekly_series(days, series=1, seed=0):
+    rng = np.random.default_rng(seed)
+    return 1000 * WEEKLY_PATTERN[np.arange(days) % 7] + rng.normal(0, 20, (series, days))
+
+def test_seasonal_profile_respects_phase():
+    """Test that profile columns line up with seasonal positions, not array offsets"""
+    values = np.tile(np.arange(7, dtype=np.float32), (1, 5))
+    profile = seasonal_profile(values, 7, phase=3)
+
+    # The first point is position 3, so position 0 holds the value 4 before centring
+    assert profile[0, 0] - profile[0, 3] == 4
+
+def test_weekend_peaks_are_not_anomalies():
+    """Test that regular weekday seasonality is removed before scoring"""
+    result = detect_anomaly_scores(weekly_series(120, series=50))
+
+    assert result.mask.mean() < 0.01
+
+def test_spikes_and_drops_are_flagged_in_batch():
+    """Test that injected anomalies are found across a batch of series"""
+    values = weekly_series(200, series=20).reshape(4, 5, 200)
+    values[1, 2, 150] += 500
+    values[3, 0, 180] -= 500
+    result = detect_anomaly_scores(values)
+
+    assert result.scores.shape == values.shape
+    assert result.mask[1, 2, 150] and result.scores[1, 2, 150] > 0
+    assert result.mask[3, 0, 180] and result.scores[3, 0, 180] < 0
+
+def test_missing_values_are_never_flagged():
+    """Test that NaN gaps are left out of the baseline and never reported"""
+    values = weekly_series(120)
+    values[0, 60:65] = np.nan
+    result = detect_anomaly_scores(values)
+
+    assert not result.mask[0, 60:65].any()
+    assert np.isfinite(result.scores).all()
+
+def test_left_padding_does_not_distort_short_histories():
+    """Test that a NaN-padded shorter series scores as it would on its own"""
+    short = weekly_series(98, seed=1)
+    padded = np.concatenate([np.full((1, 42), np.nan), short], axis=1)
+    alone = detect_anomaly_scores(short)
+    batched = detect_anomaly_scores(np.concatenate([weekly_series(140), padded]))
+
+    # Nothing is scored until three quarters of a trailing window has been observed
+    assert np.isfinite(batched.scores).all()
+    assert not batched.scores[1, :63].any() and np.isfinite(batched.expected[1, 63:]).all()
+    assert np.allclose(batched.scores[1, 70:], alone.scores[0, 28:], atol=1e-4)
+
+def test_find_sales_anomalies_reports_most_severe_first():
+    """Test the agent-facing report across restaurants with different history lengths"""
+    first, second = weekly_series(140, seed=1)[0], weekly_series(100, seed=2)[0]
+    first[120] += 800
+    second[90] += 300
+    sales_data = {
+        "historical_data": {
+            "start": "2024-01-01",
+            "by_restaurant": {
+                "r1": {"revenue": first.tolist()},
+                "r2": {"daily_revenue": second.tolist()},
+            },
+        }
+    }
+    anomalies = find_sales_anomalies(sales_data, AnomalyConfig(), limit=2)
+
+    assert [a["restaurant_id"] for a in anomalies] == ["r1", "r2"]
+    assert anomalies[0]["timestamp"] == "2024-04-30T00:00:00"
+    assert anomalies[0]["direction"] == "spike"
+
+def test_collecting_many_restaurants_scales_linearly():
+    """Test that stacking 10k restaurants' series stays well under a second"""
+    row = [1000.0] * 59 + [None]
+    sales_data = {"series": {"by_restaurant": {
+        str(r): {"revenue": row, "transactions": row, "average_ticket": row[-30:]} for r in range(10000)
+    }}}
+    started = time.perf_counter()
+    restaurants, metrics, values = collect_sales_series(sales_data)
+
+    assert time.perf_counter() - started < 1.0
+    assert values.shape == (10000, 3, 60) and restaurants[-1] == "9999"
+    assert np.isnan(values[:, 2, :30]).all() and np.isnan(values[:, :, -1]).all()
@@ -0,0 +1,60 @@
+import pytest
+import json
+from src.monitoring.audit import (
+    AuditConfig, AuditFlusher, AuditLevel, AuditLog, JsonlAuditSink
+)
+
+def test_ring_buffer_keeps_latest_entries():
+    """Test that the audit buffer never grows past its configured size"""
+    audit_log = AuditLog("TestAgent", AuditConfig(buffer_size=3))
+    for i in range(10):
+        audit_log.record(i, f"action_{i}", {"i": i})
+
+    assert len(audit_log) == 3
+    assert [entry.action for entry in audit_log] == ["action_7", "action_8", "action_9"]
+
+def test_level_and_sampling_filters():
+    """Test that low-level and sampled-out actions are not recorded"""
+    config = AuditConfig(
+        min_level=AuditLevel.INFO,
+        action_levels={"noisy": AuditLevel.DEBUG},
+        sample_rates={"sampled": 0.0}
+    )
+    audit_log = AuditLog("TestAgent", config)
+
+    assert audit_log.record(1, "noisy", {}) is None
+    assert audit_log.record(2, "sampled", {}) is None
+    # Errors are never sampled out
+    assert audit_log.record(3, "sampled", {}, level=AuditLevel.ERROR) is not None
+    assert audit_log.record(4, "kept", {}) is not None
+    assert [entry.action for entry in audit_log] == ["sampled", "kept"]
+
+@pytest.mark.asyncio
+async def test_flush_writes_jsonl(tmp_path):
+    """Test that pending entries are flushed to the JSONL sink in batches"""
+    path = tmp_path / "audit.jsonl"
+    flusher = AuditFlusher(JsonlAuditSink(str(path)))
+    audit_log = AuditLog("TestAgent", AuditConfig(flush_batch_size=2))
+    flusher.register(audit_log)
+
+    for i in range(5):
+        audit_log.record(i, "action", {"value": i})
+
+    assert await flusher.flush() == 5
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["details"]["value"] for line in lines] == list(range(5))
+    # Nothing left to write
+    assert await flusher.flush() == 0
+
+def test_requeue_on_full_queue_drops_oldest():
+    """Test that a failed batch put back into a full queue drops and counts its oldest entries"""
+    audit_log = AuditLog("TestAgent", AuditConfig(buffer_size=3))
+    for i in range(3):
+        audit_log.record(i, f"action_{i}", {})
+    batch = audit_log.drain(2)
+    audit_log.record(3, "action_3", {})
+
+    audit_log.requeue(batch)
+
+    assert audit_log.dropped == 1
+    assert [entry.action for entry in audit_log.drain(10)] == ["action_1", "action_2", "action_3"]
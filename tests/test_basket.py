@@ -0,0 +1,67 @@
+import numpy as np
+from src.analytics.basket import CooccurrenceIndex, build_indexes, bundle_opportunities
+
+def random_baskets(count, seed=0):
+    rng = np.random.default_rng(seed)
+    baskets = []
+    for _ in range(count):
+        basket = [f"item{i}" for i in rng.choice(50, size=rng.integers(1, 4), replace=False)]
+        if "item1" in basket:
+            basket.append("fries")
+        baskets.append(basket)
+    return baskets
+
+def test_top_k_ranks_associated_items():
+    """Test that an item's strongest partner comes first by lift and confidence"""
+    index = CooccurrenceIndex().add_baskets(random_baskets(2000))
+
+    assert index.top_k("item1", k=1)[0]["item"] == "fries"
+    assert index.top_k("item1", k=1, by="confidence")[0]["confidence"] == 1.0
+    assert index.top_k("unknown") == []
+
+def test_incremental_updates_match_single_build():
+    """Test that adding baskets in batches, with new items, equals building at once"""
+    baskets = random_baskets(500) + [["dessert", "coffee"]] * 3
+    whole = CooccurrenceIndex().add_baskets(baskets)
+    batched = CooccurrenceIndex().add_baskets(baskets[:200]).add_baskets(baskets[200:])
+
+    assert batched.baskets == whole.baskets
+    assert batched.items == whole.items
+    assert np.array_equal(batched.item_counts, whole.item_counts)
+    assert (batched.pairs != whole.pairs).nnz == 0
+
+def test_bundle_opportunities_per_restaurant():
+    """Test that orders and popular item snapshots yield bundle suggestions per restaurant"""
+    sales_data = {
+        "orders": [{"restaurant_id": "r1", "items": ["Pad Thai", {"name": "Thai Tea"}]}] * 5
+        + [{"restaurant_id": "r1", "items": ["Green Curry"]}] * 10,
+        "historical_data": {"popular_items": [["Som Tam", "Sticky Rice"]] * 4 + [["Larb"]] * 4}
+    }
+    indexes = build_indexes(sales_data)
+    assert set(indexes) == {"r1", "default"}
+
+    bundle = bundle_opportunities(indexes["r1"], restaurant_id="r1")[0]
+    assert set(bundle["items"]) == {"Pad Thai", "Thai Tea"}
+    assert bundle["lift"] == 3.0
+    assert bundle["restaurant_id"] == "r1"
+
+def test_history_is_read_alongside_fetched_series():
+    """Test that historical orders are used when fetch_sales_data also returns a series section"""
+    sales_data = {
+        "metrics": {"revenue": 1200.0, "transactions": 40, "average_ticket": 30.0},
+        "timeframe": "30d",
+        "series": {
+            "frequency": "daily", "start": "2024-01-01T00:00:00", "end": "2024-01-31T00:00:00",
+            "by_restaurant": {"7": {"revenue": [400.0, None, 800.0], "transactions": [12, None, 28]}}
+        },
+        "historical_data": {
+            "orders": [{"restaurant_id": "7", "items": ["Pad Thai", "Thai Tea"]}] * 3
+            + [{"restaurant_id": "7", "items": ["Larb"]}] * 3,
+            "by_restaurant": {"8": {"popular_items": [["Som Tam", "Sticky Rice"]] * 2 + [["Larb"]] * 2}}
+        }
+    }
+    indexes = build_indexes(sales_data)
+
+    assert set(indexes) == {"7", "8"}
+    assert indexes["7"].baskets == 6
+    assert indexes["8"].top_k("Som Tam", k=1)[0]["item"] == "Sticky Rice"
@@ -0,0 +1,71 @@
+import pytest
+from src.functions.conversation import ConversationConfig, ConversationState, message_tokens
+from src.functions.llm_chat import Message, build_messages
+
+def test_system_prompt_placed_once_at_start():
+    """Test that the system prompt is not appended again on every call"""
+    messages = [Message(role="user", content="How were sales yesterday?")]
+    first = build_messages(messages, "You are a restaurant analyst.")
+    again = build_messages(
+        [Message(role="system", content="You are a restaurant analyst."), *messages],
+        "You are a restaurant analyst."
+    )
+
+    assert first[0] == {"role": "system", "content": "You are a restaurant analyst."}
+    assert first == again
+    assert len(messages) == 1
+
+@pytest.mark.asyncio
+async def test_history_is_compacted_into_memory():
+    """Test that older turns are summarized once the threshold is crossed"""
+    state = ConversationState(
+        system_prompt="You are a restaurant analyst.",
+        config=ConversationConfig(window_tokens=60, compact_threshold_tokens=100, min_recent_messages=2)
+    )
+    for i in range(20):
+        state.add(Message(role="user", content=f"Question {i} about revenue trends"))
+        state.add(Message(role="assistant", content=f"Answer {i} about revenue trends"))
+    summarized = []
+
+    async def summarize(memory, older):
+        summarized.extend(older)
+        return f"{len(older)} earlier messages about revenue"
+
+    assert await state.compact(summarize)
+    assert state.history_tokens() <= 100
+    assert len(summarized) + len(state.messages) == 40
+
+    window = state.window()
+    assert window[0].content == "You are a restaurant analyst."
+    assert "earlier messages about revenue" in window[1].content
+    assert sum(message_tokens(m) for m in window[2:]) <= 60
+
+@pytest.mark.asyncio
+async def test_history_between_window_and_threshold_is_summarized():
+    """Test that turns the window would leave out are compacted even below the threshold"""
+    config = ConversationConfig(window_tokens=100, compact_threshold_tokens=200, compact_target_tokens=50)
+    state = ConversationState(config=config)
+    for i in range(8):
+        state.add(Message(role="user", content=f"Question {i} about revenue trends"))
+        state.add(Message(role="assistant", content=f"Answer {i} about revenue trends"))
+    assert 100 < state.history_tokens() <= 200
+    summarized = []
+
+    async def summarize(memory, older):
+        summarized.extend(older)
+        return "earlier revenue questions"
+
+    assert await state.compact(summarize)
+    assert state.history_tokens() <= 50
+    # Everything is either in memory or sent verbatim
+    assert len(summarized) + len(state.window()) - 1 == 16
+    assert not await state.compact(summarize)
+
+def test_window_does_not_start_with_orphaned_tool_result():
+    """Test that tool results are never separated from their assistant turn"""
+    state = ConversationState(config=ConversationConfig(window_tokens=10, min_recent_messages=1))
+    state.add(Message(role="user", content="x" * 400))
+    state.add(Message(role="tool", content="{}", tool_call_id="call_1"))
+    state.add(Message(role="user", content="thanks"))
+
+    assert [m.role for m in state.window()] == ["user"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from src.analytics.elasticity import estimate_elasticities, expected_impact
+
+def menu_with_history(elasticities, observations, seed=0):
+    rng = np.random.default_rng(seed)
+    menu, items = [], {}
+    for i, (elasticity, count) in enumerate(zip(elasticities, observations)):
+        prices = 100 * np.exp(rng.normal(0, 0.1, count))
+        volumes = np.exp(4 + elasticity * np.log(prices / 100) + rng.normal(0, 0.02, count))
+        menu.append({"item_id": f"item-{i}", "category": "mains", "price": 100.0})
+        items[f"item-{i}"] = {"prices": prices.tolist(), "volumes": volumes.tolist()}
+    return menu, {"items": items}
+
+def test_well_measured_items_keep_their_elasticity():
+    """Test that items with plenty of price variation recover their own elasticity"""
+    menu, history = menu_with_history([-0.5, -1.0, -2.0], [40, 40, 40])
+    estimates = estimate_elasticities(menu, history)
+
+    assert estimates.elasticity == pytest.approx([-0.5, -1.0, -2.0], abs=0.15)
+    assert (estimates.shrinkage < 0.2).all()
+
+def test_sparse_items_shrink_toward_category():
+    """Test that an item with two observations borrows its category's elasticity"""
+    menu, history = menu_with_history([-1.0, -1.0, -1.0, 1.5], [40, 40, 40, 2])
+    menu.append({"item_id": "new", "category": "mains", "price": 80.0, "units_sold": 12})
+    estimates = estimate_elasticities(menu, history)
+
+    assert estimates.elasticity[3] == pytest.approx(-1.0, abs=0.1)
+    assert estimates.shrinkage[3] == 1.0
+    assert estimates.elasticity[4] == pytest.approx(-1.0, abs=0.1)
+    assert estimates.baseline_volume[4] == 12
+
+def test_expected_impact_is_vectorized():
+    """Test revenue, margin and volume changes under constant-elasticity demand"""
+    impact = expected_impact(
+        current_price=np.array([100.0, 50.0]),
+        new_price=np.array([110.0, 50.0]),
+        elasticity=np.array([-1.0, -2.0]),
+        volume=np.array([10.0, 4.0]),
+        unit_cost=np.array([40.0, 20.0])
+    )
+
+    new_volume = 10 * (1.1 ** -1.0)
+    assert impact["volume_impact"] == pytest.approx([new_volume - 10, 0.0])
+    assert impact["revenue_impact"] == pytest.approx([110 * new_volume - 1000, 0.0])
+    assert impact["margin_impact"] == pytest.approx([70 * new_volume - 600, 0.0])
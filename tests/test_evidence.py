@@ -0,0 +1,81 @@
+import pytest
+import asyncio
+import numpy as np
+from src.analytics.evidence import (
+    EvidenceQuery, SalesEvidenceSource, enhance_with_evidence, run_evidence_queries, score_confidence
+)
+
+@pytest.mark.asyncio
+async def test_queries_deduplicated_and_limited():
+    """Test that identical queries run once and no more than the limit run at a time"""
+    calls = []
+    running = 0
+    peak = 0
+
+    async def resolve(query):
+        nonlocal running, peak
+        calls.append(query)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"strength": 1.0}
+
+    queries = [EvidenceQuery("trend", metric) for metric in ["revenue", "transactions"] * 5]
+    queries += [EvidenceQuery("trend", "revenue", str(i)) for i in range(6)]
+    results = await run_evidence_queries(queries, resolve, concurrency=3)
+
+    assert len(calls) == len(results) == 8
+    assert peak <= 3
+
+@pytest.mark.asyncio
+async def test_failed_queries_do_not_fail_batch():
+    """Test that a failing evidence source only leaves its own result empty"""
+    async def resolve(query):
+        if query.metric == "transactions":
+            raise ConnectionError("down")
+        return {"strength": 0.5}
+
+    results = await run_evidence_queries(
+        [EvidenceQuery("trend", "revenue"), EvidenceQuery("trend", "transactions")], resolve
+    )
+    assert results[EvidenceQuery("trend", "transactions")] is None
+    assert results[EvidenceQuery("trend", "revenue")] == {"strength": 0.5}
+
+def test_score_confidence_discounts_missing_evidence():
+    """Test that confidence is scored for all insights at once and rewards supporting evidence"""
+    base = np.array([0.9, 0.9, 0.9])
+    strengths = np.array([[1.0, 1.0], [1.0, np.nan], [np.nan, np.nan]])
+    confidence = score_confidence(base, strengths, np.array([2, 2, 2]))
+
+    assert confidence[0] > confidence[1] > confidence[2]
+    assert confidence[2] == pytest.approx(0.54)
+
+@pytest.mark.asyncio
+async def test_sales_insights_get_trend_evidence():
+    """Test that an insight about revenue is backed by the revenue trend of its restaurant"""
+    sales_data = {"historical_data": {"by_restaurant": {
+        "r1": {"revenue": [100.0] * 21 + [150.0] * 7},
+        "r2": {"revenue": [100.0] * 28}
+    }}}
+    source = SalesEvidenceSource(sales_data)
+    insights = [
+        {"title": "Revenue growth", "description": "Sales are up", "confidence": 0.8,
+         "supporting_data": {"restaurant_id": "r1"}},
+        {"title": "Revenue flat", "description": "", "confidence": 0.8,
+         "supporting_data": {"restaurant_id": "r2"}},
+    ]
+    enhanced = await enhance_with_evidence(insights, source.resolve, source.metrics, source.restaurants)
+
+    trend = enhanced[0]["supporting_evidence"][0]
+    assert trend["type"] == "trend" and trend["change"] == 0.5
+    assert enhanced[0]["confidence_score"] > enhanced[1]["confidence_score"]
+
+@pytest.mark.asyncio
+async def test_unknown_restaurant_or_metric_has_no_evidence():
+    """Test that queries for series the sales data lacks resolve to nothing"""
+    source = SalesEvidenceSource({"historical_data": {"by_restaurant": {"r1": {"revenue": [100.0] * 28}}}})
+
+    assert await source.resolve(EvidenceQuery("trend", "revenue", "r9")) is None
+    assert await source.resolve(EvidenceQuery("trend", "transactions", "r1")) is None
+    assert (await source.resolve(EvidenceQuery("trend", "revenue", "r1")))["change"] == 0.0
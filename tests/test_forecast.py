@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.analytics.forecast import ForecastConfig, ForecastState, forecast_sales
+
+WEEKLY_PATTERN = np.array([1.0, 0.9, 0.95, 1.0, 1.2, 1.6, 1.5])
+
+def weekly_series(days, series=1, seed=0):
+    rng = np.random.default_rng(seed)
+    return 1000 * WEEKLY_PATTERN[np.arange(days) % 7] + rng.normal(0, 20, (series, days))
+
+def test_forecast_follows_weekly_pattern():
+    """Test that forecasts reproduce the weekly cycle and bracket it with intervals"""
+    values = weekly_series(140, series=10)
+    state = ForecastState.fit([str(i) for i in range(10)], values)
+    result = state.forecast(14)
+
+    expected = 1000 * WEEKLY_PATTERN[np.arange(140, 154) % 7]
+    assert np.abs(result.mean - expected).max() < 100
+    assert (result.lower < result.mean).all() and (result.mean < result.upper).all()
+    # Uncertainty grows with the horizon
+    assert ((result.upper - result.lower)[:, -1] >= (result.upper - result.lower)[:, 0]).all()
+
+def test_update_only_folds_in_new_points():
+    """Test that re-sending seen history leaves the state unchanged except for new points"""
+    values = weekly_series(100, series=3)
+    times = np.arange(100)
+    ids = ["a", "b", "c"]
+    state = ForecastState.fit(ids, values[:, :90], times[:90])
+    level_before = state.level.copy()
+
+    state.update(ids, values[:, :90], times[:90])
+    assert np.array_equal(state.level, level_before)
+
+    state.update(ids + ["d"], np.vstack([values, values[:1]]), times)
+    assert state.ids == ids + ["d"]
+    assert (state.count == 100).all()
+    assert (state.last_time == 99).all()
+
+def test_state_round_trip(tmp_path):
+    """Test that saved state forecasts identically after loading"""
+    state = ForecastState.fit(["a", "b"], weekly_series(60, series=2))
+    path = str(tmp_path / "state.npz")
+    state.save(path)
+    loaded = ForecastState.load(path)
+
+    assert loaded.ids == ["a", "b"]
+    assert loaded.config == ForecastConfig(period=7)
+    assert np.allclose(loaded.forecast().mean, state.forecast().mean)
+
+def test_forecast_sales_per_restaurant(tmp_path):
+    """Test that sales data yields dated forecasts per restaurant and metric"""
+    sales_data = {
+        "historical_data": {
+            "start": "2024-01-01",
+            "by_restaurant": {
+                "r1": {"revenue": weekly_series(56, seed=1)[0].tolist()},
+                "r2": {"revenue": weekly_series(42, seed=2)[0].tolist()}
+            }
+        }
+    }
+    result = forecast_sales(sales_data, ForecastConfig(horizon=7), state_path=str(tmp_path / "state.npz"))
+
+    revenue = result["restaurants"]["r2"]["revenue"]
+    assert len(revenue["forecast"]) == 7
+    assert revenue["timestamps"][0] == "2024-02-26T00:00:00"
+    assert (tmp_path / "state.daily-7.npz").exists()
+
+def test_forecast_sales_keeps_frequencies_and_anonymous_series_apart(tmp_path):
+    """Test that hourly and daily runs use separate state and flat history is never cached"""
+    path = str(tmp_path / "state.npz")
+    daily = {"series": {"frequency": "daily", "start": "2024-01-01", "by_restaurant": {
+        "7": {"revenue": weekly_series(56)[0].tolist()}
+    }}}
+    hourly = {"series": {"frequency": "hourly", "start": "2024-03-01T00:00:00", "by_restaurant": {
+        "7": {"revenue": np.tile(np.arange(24.0), 14).tolist()}
+    }}}
+    flat = {"historical_data": {"start": "2024-01-01", "revenue": weekly_series(56, seed=3)[0].tolist()}}
+    forecast_sales(daily, ForecastConfig(horizon=3), state_path=path)
+    result = forecast_sales(hourly, ForecastConfig(horizon=3), state_path=path)
+    forecast_sales(flat, ForecastConfig(horizon=3), state_path=path)
+
+    revenue = result["restaurants"]["7"]["revenue"]
+    assert revenue["timestamps"][0] == "2024-03-15T00:00:00"
+    assert np.allclose(revenue["forecast"], [0, 1, 2], atol=1)
+    assert ForecastState.load(str(tmp_path / "state.hourly-24.npz")).config.period == 24
+    assert ForecastState.load(str(tmp_path / "state.daily-7.npz")).ids == ["7:revenue"]
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    """Test that workers sharing the state file each keep their restaurants' series"""
+    path = str(tmp_path / "state.npz")
+
+    def run(restaurant):
+        sales_data = {"series": {"frequency": "daily", "start": "2024-01-01", "by_restaurant": {
+            restaurant: {"revenue": weekly_series(56, seed=int(restaurant))[0].tolist()}
+        }}}
+        return forecast_sales(sales_data, ForecastConfig(horizon=3), state_path=path)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(run, [str(r) for r in range(8)]))
+
+    state = ForecastState.load(str(tmp_path / "state.daily-7.npz"))
+    assert sorted(state.ids) == sorted(f"{r}:revenue" for r in range(8))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["state.daily-7.npz", "state.daily-7.npz.lock"]
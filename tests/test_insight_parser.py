@@ -0,0 +1,82 @@
+import pytest
+import json
+from src.functions.insight_parser import (
+    IncrementalInsightParser, parse_insights, repair_json
+)
+
+def make_insight(index):
+    return {
+        "id": f"ins-{index}",
+        "title": f"Insight {index}",
+        "description": "Lunch revenue is flat week over week.",
+        "category": "sales",
+        "confidence": 0.8,
+        "impact": "MEDIUM",
+        "supporting_data": {"weeks": 4},
+        "recommendations": ["Test a lunch combo"]
+    }
+
+def test_parse_valid_response():
+    """Test that a well-formed response is validated without repair"""
+    parsed = parse_insights(json.dumps({"insights": [make_insight(1), make_insight(2)]}))
+
+    assert [insight.id for insight in parsed.insights] == ["ins-1", "ins-2"]
+    assert not parsed.repaired
+    assert parsed.errors == []
+
+def test_repair_common_defects():
+    """Test that fences, trailing commas, Python literals and prose are repaired"""
+    content = """Here are the insights:
+```json
+{"insights": [{"title": "Slow Tuesdays", "description": "Tuesday traffic
+is the lowest of the week", "confidence": "85%", "impact": "high",
+"supporting_data": None, "recommendations": "Run a Tuesday special",},]}
+```"""
+    parsed = parse_insights(content, category="traffic")
+
+    assert parsed.repaired
+    insight = parsed.insights[0]
+    assert insight.confidence == pytest.approx(0.85)
+    assert insight.impact == "HIGH"
+    assert insight.category == "traffic"
+    assert insight.recommendations == ["Run a Tuesday special"]
+
+def test_truncated_response_keeps_complete_insights():
+    """Test that output cut off mid-insight keeps the insights before it"""
+    content = json.dumps({"insights": [make_insight(1), make_insight(2)]})
+    truncated = content[:content.index('"Insight 2"') + 5]
+
+    repaired = json.loads(repair_json(truncated))
+    assert repaired["insights"][0]["id"] == "ins-1"
+
+def test_invalid_insights_are_reported_not_fatal():
+    """Test that one invalid insight does not discard the others"""
+    parsed = parse_insights(json.dumps([make_insight(1), {"title": "No description"}, "oops"]))
+
+    assert len(parsed.insights) == 1
+    assert len(parsed.errors) == 2
+
+def test_incremental_parser_emits_each_insight_once_complete():
+    """Test that streamed insights are emitted as soon as their object closes"""
+    content = json.dumps({"insights": [make_insight(1), make_insight(2)]})
+    first = json.dumps(make_insight(1))
+    first_end = content.index(first) + len(first)
+    parser = IncrementalInsightParser()
+
+    emitted = []
+    for start in range(0, len(content), 7):
+        emitted.extend(parser.feed(content[start:start + 7]))
+        if start + 7 >= first_end and start < first_end:
+            assert [insight.id for insight in emitted] == ["ins-1"]
+    emitted.extend(parser.finish())
+
+    assert [insight.id for insight in emitted] == ["ins-1", "ins-2"]
+    assert parser.errors == []
+
+def test_incremental_parser_salvages_truncated_stream():
+    """Test that a stream ending mid-insight still yields the repairable part"""
+    content = json.dumps({"insights": [make_insight(1)]})[:-4]
+    parser = IncrementalInsightParser()
+
+    assert parser.feed(content) == []
+    assert [insight.id for insight in parser.finish()] == ["ins-1"]
@@ -0,0 +1,64 @@
+import pytest
+from src.functions.llm_cache import LlmCacheConfig, LlmResponseCache, make_cache_key
+
+RESPONSE = {
+    "choices": [{"message": {"content": "{}"}}],
+    "usage": {"prompt_tokens": 120, "completion_tokens": 30}
+}
+
+def test_cache_key_hashes_exact_messages():
+    """Test that None fields do not change the cache key but whitespace does"""
+    key = make_cache_key("gpt-4", [{"role": "user", "content": "Hello world"}])
+    same = make_cache_key("gpt-4", [{"role": "user", "content": "Hello world", "name": None}])
+    other_spacing = make_cache_key("gpt-4", [{"role": "user", "content": "Hello\n    world"}])
+    other_model = make_cache_key("gpt-4o-mini", [{"role": "user", "content": "Hello world"}])
+    other_temperature = make_cache_key(
+        "gpt-4", [{"role": "user", "content": "Hello world"}], temperature=0.5
+    )
+
+    assert key == same
+    assert key != other_spacing
+    assert key != other_model
+    assert key != other_temperature
+
+@pytest.mark.asyncio
+async def test_get_or_create_counts_hits_and_saved_tokens(tmp_path):
+    """Test that repeated requests are served from the cache"""
+    cache = LlmResponseCache(LlmCacheConfig(sqlite_path=str(tmp_path / "cache.sqlite3")))
+    calls = []
+
+    async def create():
+        calls.append(1)
+        return RESPONSE
+
+    for _ in range(3):
+        assert await cache.get_or_create("key", create, category="sales") == RESPONSE
+
+    hit = await cache.get_or_create("key", create, category="sales")
+    hit["choices"].clear()  # Mutating a returned response must not touch the cached one
+    assert await cache.get_or_create("key", create, category="sales") == RESPONSE
+
+    assert len(calls) == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.memory_hits == 4
+    assert cache.stats.saved_prompt_tokens == 480
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    """Test that responses persist in SQLite across cache instances"""
+    config = LlmCacheConfig(sqlite_path=str(tmp_path / "cache.sqlite3"))
+    await LlmResponseCache(config).set("key", RESPONSE, category="pricing")
+
+    restarted = LlmResponseCache(config)
+    assert await restarted.get("key") == RESPONSE
+    assert restarted.stats.disk_hits == 1
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_bounded():
+    """Test that the in-memory tier evicts least recently used entries"""
+    cache = LlmResponseCache(LlmCacheConfig(sqlite_path=None, memory_entries=2))
+    for key in ("a", "b", "c"):
+        await cache.set(key, RESPONSE)
+
+    assert await cache.get("a") is None
+    assert await cache.get("c") == RESPONSE
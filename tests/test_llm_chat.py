@@ -0,0 +1,44 @@
+from src.functions.llm_chat import assemble_chat_completion
+
+def chunk(delta, finish_reason=None, usage=None):
+    return {
+        "id": "chatcmpl-1",
+        "created": 1700000000,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        "usage": usage
+    }
+
+def test_assemble_text_deltas():
+    """Test that streamed content deltas are joined into one message"""
+    completion = assemble_chat_completion([
+        chunk({"role": "assistant", "content": ""}),
+        chunk({"content": "Revenue is "}),
+        chunk({"content": "up 4%."}, finish_reason="stop"),
+        {"id": "chatcmpl-1", "choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 5}},
+    ])
+
+    choice = completion["choices"][0]
+    assert completion["model"] == "gpt-4o-mini"
+    assert choice["message"]["content"] == "Revenue is up 4%."
+    assert choice["message"]["tool_calls"] is None
+    assert choice["finish_reason"] == "stop"
+    assert completion["usage"]["completion_tokens"] == 5
+
+def test_assemble_incremental_tool_call_arguments():
+    """Test that tool-call arguments streamed in pieces are reassembled per call"""
+    completion = assemble_chat_completion([
+        chunk({"role": "assistant", "tool_calls": [
+            {"index": 0, "id": "call_a", "function": {"name": "fetch_project_data", "arguments": ""}}
+        ]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": '{"project_'}}]}),
+        chunk({"tool_calls": [
+            {"index": 1, "id": "call_b", "function": {"name": "fetch_project_data", "arguments": '{"project_id":"p2"}'}}
+        ]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": 'id":"p1"}'}}]}, finish_reason="tool_calls"),
+    ])
+
+    tool_calls = completion["choices"][0]["message"]["tool_calls"]
+    assert [call["id"] for call in tool_calls] == ["call_a", "call_b"]
+    assert tool_calls[0]["function"]["arguments"] == '{"project_id":"p1"}'
+    assert tool_calls[1]["function"]["arguments"] == '{"project_id":"p2"}'
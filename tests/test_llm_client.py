@@ -0,0 +1,20 @@
+import asyncio
+from src.functions.llm_client import LlmClientConfig, LlmClientManager
+
+def test_loop_change_closes_previous_clients():
+    """Test that clients pooled on a finished event loop are closed when a new loop binds"""
+    manager = LlmClientManager(LlmClientConfig())
+
+    async def first():
+        return manager.get_client("http://localhost", "key")
+
+    async def second():
+        client = manager.get_client("http://localhost", "key")
+        await asyncio.sleep(0.01)  # Let the close task run
+        return client
+
+    old = asyncio.run(first())
+    new = asyncio.run(second())
+
+    assert new is not old
+    assert old.is_closed() and not new.is_closed()
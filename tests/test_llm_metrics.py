@@ -0,0 +1,80 @@
+import pytest
+import asyncio
+import json
+from src.monitoring.llm_metrics import (
+    Histogram, LlmCallRecord, LlmMetrics, count_http_attempt, track_llm_call
+)
+from src.monitoring.performance_monitor import PerformanceMonitor
+from src.monitoring import performance_monitor as performance_monitor_module
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = PerformanceMonitor()
+    monkeypatch.setattr(performance_monitor_module, "_monitor", monitor)
+    return monitor
+
+def test_histogram_percentiles():
+    """Test that percentiles report the upper bound of the matching bucket"""
+    histogram = Histogram([0.1, 1.0, 10.0])
+    for value in [0.05, 0.05, 0.5, 5.0]:
+        histogram.observe(value)
+
+    assert histogram.percentile(50) == 0.1
+    assert histogram.percentile(75) == 1.0
+    assert histogram.percentile(100) == 10.0
+    assert histogram.to_dict()["count"] == 4
+
+@pytest.mark.asyncio
+async def test_track_llm_call_records_retries_and_tokens(monitor):
+    """Test that a tracked call reports attempts beyond the first as retries"""
+    async with track_llm_call("llm_chat", "gpt-4o-mini", agent="SalesAgent", category="sales") as call:
+        for _ in range(3):
+            await count_http_attempt(None)
+        call.record.set_usage({"prompt_tokens": 120, "completion_tokens": 30})
+        call.first_token()
+
+    summary = monitor.get_llm_metrics()
+    sales = summary["by_agent"]["SalesAgent"]
+    assert sales["calls"] == 1
+    assert sales["retries"] == 2
+    assert sales["prompt_tokens"] == 120
+    assert sales["time_to_first_token"]["count"] == 1
+    assert summary["by_category"]["sales"]["completion_tokens"] == 30
+
+@pytest.mark.asyncio
+async def test_first_token_excludes_queue_wait_and_batches_count_per_category(monitor):
+    """Test that time to first token starts at the rate limiter grant and batches reach each category"""
+    async with track_llm_call(
+        "analyze_insights_batch", "gpt-4", category="sales+pricing", categories=["sales", "pricing"]
+    ) as call:
+        await asyncio.sleep(0.1)  # Queued behind the rate limiter
+        call.dequeued(0.1)
+        call.first_token()
+
+    summary = monitor.get_llm_metrics()["by_category"]
+    assert set(summary) == {"sales", "pricing"}
+    assert summary["sales"]["time_to_first_token"]["p99"] <= 0.05
+    assert summary["pricing"]["queue_wait"]["count"] == 1
+
+@pytest.mark.asyncio
+async def test_track_llm_call_records_failures(monitor):
+    """Test that failed calls are counted as errors and the exception propagates"""
+    with pytest.raises(RuntimeError):
+        async with track_llm_call("analyze_insights", "gpt-4"):
+            raise RuntimeError("boom")
+
+    stats = monitor.get_llm_metrics()["by_category"]["analyze_insights"]
+    assert stats["calls"] == 1
+    assert stats["errors"] == 1
+
+@pytest.mark.asyncio
+async def test_trace_written_as_jsonl(tmp_path):
+    """Test that recorded calls are appended to the trace file on flush"""
+    trace_path = tmp_path / "llm_trace.jsonl"
+    metrics = LlmMetrics(trace_path=str(trace_path))
+    metrics.record(LlmCallRecord(timestamp=0.0, function="llm_chat", model="gpt-4o-mini", workflow_id="wf-1"))
+    await metrics.flush()
+
+    lines = trace_path.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["workflow_id"] == "wf-1"
@@ -0,0 +1,81 @@
+import pytest
+import asyncio
+import json
+from pydantic import BaseModel
+from src.functions import llm_tool_loop
+from src.functions.llm_chat import LlmChatInput, Message
+from src.functions.llm_tool_loop import LlmToolLoopInput, ToolRegistry, default_tool_registry, run_tool_loop
+
+class LookupInput(BaseModel):
+    key: str
+
+def tool_call(call_id, name, arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+def completion(message):
+    return {"choices": [{"index": 0, "message": {"role": "assistant", **message}}]}
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_concurrently(monkeypatch):
+    """Test that one turn's tool calls run together and feed the next turn"""
+    running = []
+    peak = []
+
+    async def lookup(input_data: LookupInput):
+        running.append(input_data.key)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(input_data.key)
+        return {"value": input_data.key.upper()}
+
+    registry = ToolRegistry()
+    registry.register(lookup, LookupInput)
+    responses = [
+        completion({"content": None, "tool_calls": [
+            tool_call("call_1", "lookup", {"key": "a"}),
+            tool_call("call_2", "lookup", {"key": "b"}),
+        ]}),
+        completion({"content": "A and B"}),
+    ]
+    seen_messages = []
+
+    async def fake_llm_chat(function_input):
+        seen_messages.append(function_input.messages)
+        return responses[len(seen_messages) - 1]
+
+    monkeypatch.setattr(llm_tool_loop, "llm_chat", fake_llm_chat)
+    result = await run_tool_loop(
+        LlmToolLoopInput(chat=LlmChatInput(messages=[Message(role="user", content="hi")])),
+        registry
+    )
+
+    assert result["completed"] and result["turns"] == 2
+    assert max(peak) == 2
+    tool_messages = [m for m in seen_messages[1] if m.role == "tool"]
+    assert [m.tool_call_id for m in tool_messages] == ["call_1", "call_2"]
+    assert json.loads(tool_messages[0].content) == {"value": "A"}
+
+@pytest.mark.asyncio
+async def test_tool_errors_and_timeouts_become_tool_messages():
+    """Test that failing tools report errors instead of aborting the loop"""
+    async def slow(input_data: LookupInput):
+        await asyncio.sleep(1)
+
+    registry = ToolRegistry()
+    registry.register(slow, LookupInput)
+
+    timed_out = await registry.execute(tool_call("c1", "slow", {"key": "a"}), timeout=0.01)
+    unknown = await registry.execute(tool_call("c2", "missing", {}), timeout=1)
+    invalid = await registry.execute(tool_call("c3", "slow", {}), timeout=1)
+
+    assert "timed out" in json.loads(timed_out.content)["error"]
+    assert "Unknown tool" in json.loads(unknown.content)["error"]
+    assert "Invalid call" in json.loads(invalid.content)["error"]
+
+def test_tool_names_select_registered_tools():
+    """Test that the worker function's serializable tool names pick tools from the registry"""
+    registry = default_tool_registry()
+
+    assert [t["function"]["name"] for t in registry.subset(["fetch_project_data"]).schemas()] == ["fetch_project_data"]
+    with pytest.raises(ValueError):
+        registry.subset(["missing"])
@@ -0,0 +1,56 @@
+import pytest
+from src.functions.local_insights import (
+    LOCAL_SOURCE, generate_local_insights, has_data
+)
+
+def test_has_data_ignores_zeros_and_labels():
+    """Test that placeholder payloads count as no data"""
+    assert not has_data({"metrics": {"revenue": 0.0, "items_sold": {}}, "timeframe": "7d"}, "sales")
+    assert has_data({"metrics": {"revenue": 120.0}}, "sales")
+
+def test_has_data_counts_text_outside_numeric_categories():
+    """Test that review text is data for sentiment but blank strings are not"""
+    reviews = {"reviews": [{"rating": None, "text": "Great pad thai, slow service"}]}
+
+    assert has_data(reviews, "sentiment")
+    assert has_data(reviews)
+    assert not has_data({"reviews": [{"text": "  "}]}, "sentiment")
+
+def test_peak_hour_understaffing_from_staffing_levels():
+    """Test that hours staffed below requirements are reported"""
+    project_data = {
+        "staffing": [
+            {"hour": 12, "required_staff": 6, "current_staff": 4},
+            {"hour": 15, "required_staff": 3, "current_staff": 3},
+            {"hour": 19, "required_staff": 7, "current_staff": 5},
+        ]
+    }
+    insights = generate_local_insights(project_data)
+
+    assert [i["title"] for i in insights] == ["Peak Hour Understaffing"]
+    assert set(insights[0]["supporting_data"]["hours"]) == {"12", "19"}
+    assert insights[0]["supporting_data"]["source"] == LOCAL_SOURCE
+
+def test_price_outlier_within_category():
+    """Test that an item priced far from its category median is flagged"""
+    menu = [
+        {"name": f"Noodles {i}", "category": "mains", "price": price}
+        for i, price in enumerate([120, 125, 130, 118, 122, 480])
+    ]
+    insights = generate_local_insights({"menu_items": menu})
+
+    assert len(insights) == 1
+    assert [o["name"] for o in insights[0]["supporting_data"]["outliers"]] == ["Noodles 5"]
+
+def test_rating_drop_uses_dates():
+    """Test that a falling rating series is detected after ordering by date"""
+    ratings = [
+        {"date": "2024-01-04", "average_rating": 3.9, "review_count": 20},
+        {"date": "2024-01-01", "average_rating": 4.6, "review_count": 20},
+        {"date": "2024-01-03", "average_rating": 4.0, "review_count": 20},
+        {"date": "2024-01-02", "average_rating": 4.5, "review_count": 20},
+    ]
+    insights = generate_local_insights({"sources": ratings})
+
+    assert insights[0]["title"] == "Rating Drop"
+    assert insights[0]["supporting_data"]["previous_rating"] == pytest.approx(4.55)
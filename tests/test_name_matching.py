@@ -0,0 +1,29 @@
+from src.analytics.name_matching import NameMatchIndex, get_name_index, match_menu_items, normalize_name
+
+COMPETITOR_ITEMS = [
+    "Pad Thai Goong", "Green Curry Chicken", "Tom Yum Goong", "Mango Sticky Rice",
+    "ผัดไทย กุ้งสด", "ต้มยำกุ้ง", "ข้าวเหนียวมะม่วง", "แกงเขียวหวานไก่"
+]
+
+def test_normalize_name_folds_width_case_and_thai_spelling():
+    """Test that full-width, punctuation, tone marks and Thai spacing variants normalize alike"""
+    assert normalize_name("ＰＡＤ THAI (Large)!") == "pad thai large"
+    assert normalize_name("ต้มยํา กุ้ง") == normalize_name("ต้มยำกุ้ง")
+
+def test_top_k_matches_english_and_thai_names():
+    """Test that close spellings in either script rank the right competitor item first"""
+    index = NameMatchIndex(COMPETITOR_ITEMS)
+    english, thai, unrelated = index.top_k(["pad thai w/ goong", "ผัดไทยกุ้ง", "Espresso"], k=2)
+
+    assert COMPETITOR_ITEMS[english[0][0]] == "Pad Thai Goong"
+    assert COMPETITOR_ITEMS[thai[0][0]] == "ผัดไทย กุ้งสด"
+    assert unrelated == []
+    assert english[0][1] > 0.5
+
+def test_index_cached_per_competitor_set():
+    """Test that the same competitor set reuses its index and a changed set rebuilds"""
+    assert get_name_index(COMPETITOR_ITEMS) is get_name_index(list(COMPETITOR_ITEMS))
+    assert get_name_index(COMPETITOR_ITEMS[:-1]) is not get_name_index(COMPETITOR_ITEMS)
+
+    matches = match_menu_items(["Mango sticky rice"], COMPETITOR_ITEMS, k=1)
+    assert matches[0][0]["name"] == "Mango Sticky Rice"
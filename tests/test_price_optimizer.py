@@ -0,0 +1,44 @@
+import time
+import numpy as np
+from src.analytics.price_optimizer import optimize_menu_prices, price_grid
+
+def random_menu(items, seed=0):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(60, 300, items)
+    cost = price * rng.uniform(0.3, 0.7, items)
+    cost[::10] = np.nan  # Some items have no known cost
+    return price, cost, rng.uniform(-2.5, -0.3, items), rng.uniform(5, 50, items)
+
+def test_grid_respects_adjustment_limits():
+    """Test that every candidate is unchanged or moves by an allowed amount"""
+    moves = np.abs(price_grid(np.array([100.0, 50.0]), 1.0, 5.0) - np.array([[100.0], [50.0]]))
+
+    assert ((moves == 0) | ((moves >= 1.0 - 1e-9) & (moves <= 5.0 + 1e-9))).all()
+
+def test_margin_target_enforced_during_search():
+    """Test that the menu margin reaches the target, at some cost in profit"""
+    price, cost, elasticity, volume = random_menu(300)
+    unconstrained = optimize_menu_prices(price, cost, elasticity, volume, 1.0, 5.0)
+    constrained = optimize_menu_prices(price, cost, elasticity, volume, 1.0, 5.0, target_margin=0.512)
+
+    assert unconstrained.margin < 0.512
+    assert constrained.feasible and constrained.margin >= 0.512
+    assert constrained.profit <= unconstrained.profit
+    moves = np.abs(constrained.prices - price)
+    assert ((moves < 1e-9) | ((moves >= 1.0 - 1e-9) & (moves <= 5.0 + 1e-9))).all()
+
+def test_unreachable_target_reported():
+    """Test that an impossible margin target returns the highest-margin menu and says so"""
+    price, cost, elasticity, volume = random_menu(50)
+    solution = optimize_menu_prices(price, cost, elasticity, volume, 0.0, 5.0, target_margin=0.95)
+
+    assert not solution.feasible
+    assert solution.margin > optimize_menu_prices(price, cost, elasticity, volume, 0.0, 5.0).margin
+
+def test_large_menu_optimized_quickly():
+    """Test that a 300 item menu with a margin target solves in well under a second"""
+    price, cost, elasticity, volume = random_menu(300, seed=1)
+    started = time.perf_counter()
+    optimize_menu_prices(price, cost, elasticity, volume, 0.5, 10.0, target_margin=0.5)
+
+    assert time.perf_counter() - started < 1.0
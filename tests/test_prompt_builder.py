@@ -0,0 +1,36 @@
+import json
+from src.functions.prompt_builder import PromptBuilder, count_tokens
+
+def test_long_series_are_summarized():
+    """Test that long numeric series become summary statistics"""
+    builder = PromptBuilder(token_budget=10_000, series_threshold=10)
+    result = builder.build({"historical_data": {"daily_revenue": list(range(365))}})
+
+    summary = json.loads(result.text)["historical_data"]["daily_revenue"]["series_summary"]
+    assert summary["count"] == 365
+    assert summary["min"] == 0
+    assert summary["max"] == 364
+
+def test_uniform_records_become_tables():
+    """Test that lists of records are written as column/row tables"""
+    rows = [{"hour": h, "customers": h * 2} for h in range(3)]
+    result = PromptBuilder(token_budget=10_000).build({"traffic_analysis": rows})
+
+    table = json.loads(result.text)["traffic_analysis"]
+    assert table["columns"] == ["hour", "customers"]
+    assert table["rows"] == [[0, 0], [1, 2], [2, 4]]
+
+def test_low_priority_sections_are_trimmed_first():
+    """Test that the prompt fits the budget by dropping low-priority sections"""
+    project_data = {
+        "metrics": {"revenue": 1250.5, "transactions": 42},
+        "historical_data": {"notes": ["x" * 200 for _ in range(50)]},
+        "empty": None,
+    }
+    result = PromptBuilder(token_budget=60).build(project_data)
+    payload = json.loads(result.text)
+
+    assert result.tokens <= 60 + count_tokens('"_omitted":["historical_data"]')
+    assert payload["metrics"] == {"revenue": 1250.5, "transactions": 42}
+    assert "historical_data" in result.summarized + result.omitted
+    assert "empty" not in payload
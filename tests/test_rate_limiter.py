@@ -0,0 +1,77 @@
+import pytest
+import asyncio
+import threading
+from src.functions.rate_limiter import LlmRateLimiter, Priority, RateLimitConfig
+
+@pytest.mark.asyncio
+async def test_requests_queue_instead_of_failing():
+    """Test that requests over the token budget wait for the bucket to refill"""
+    limiter = LlmRateLimiter(RateLimitConfig(tokens_per_minute=6000))  # 100 tokens/s
+    assert await limiter.acquire(6000) < 0.05
+
+    waited = await limiter.acquire(20)
+    assert 0.1 <= waited < 1.0
+    assert limiter.lanes[Priority.NORMAL].granted == 2
+
+@pytest.mark.asyncio
+async def test_higher_priority_lane_is_served_first():
+    """Test that interactive requests jump ahead of queued background work"""
+    limiter = LlmRateLimiter(RateLimitConfig(tokens_per_minute=6000))
+    await limiter.acquire(6000)
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(10, priority)
+        order.append(name)
+
+    background = asyncio.create_task(request("background", Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(request("interactive", Priority.INTERACTIVE))
+    await asyncio.gather(background, interactive)
+
+    assert order == ["interactive", "background"]
+    assert limiter.stats()["lanes"]["background"]["max_wait"] > 0
+
+@pytest.mark.asyncio
+async def test_settle_refunds_overestimates(tmp_path):
+    """Test that unused estimated tokens are returned to a shared bucket"""
+    config = RateLimitConfig(
+        tokens_per_minute=6000, shared_state_path=str(tmp_path / "limits.sqlite3")
+    )
+    limiter = LlmRateLimiter(config)
+    await limiter.acquire(6000)
+    await limiter.settle(estimated_tokens=6000, actual_tokens=1000)
+
+    # A second process sharing the file sees the refund immediately
+    assert await LlmRateLimiter(config).acquire(4000) < 0.1
+
+@pytest.mark.asyncio
+async def test_unconfigured_limiter_is_a_no_op():
+    limiter = LlmRateLimiter(RateLimitConfig())
+    assert not limiter.enabled
+    assert await limiter.acquire(10**9) == 0.0
+
+@pytest.mark.asyncio
+async def test_shared_buckets_run_off_the_loop_and_roll_back(tmp_path, monkeypatch):
+    """Test that SQLite bucket calls run in a worker thread and failed adjustments roll back"""
+    config = RateLimitConfig(tokens_per_minute=6000, shared_state_path=str(tmp_path / "limits.sqlite3"))
+    limiter = LlmRateLimiter(config)
+    buckets = limiter._buckets
+    threads = []
+    consume = buckets.try_consume
+    monkeypatch.setattr(buckets, "try_consume", lambda tokens: threads.append(threading.get_ident()) or consume(tokens))
+
+    await limiter.acquire(100)
+    assert threads and threads[0] != threading.get_ident()
+
+    def failing_store(levels, now):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(buckets, "_store", failing_store)
+    with pytest.raises(RuntimeError):
+        await limiter.settle(estimated_tokens=100, actual_tokens=50)
+    monkeypatch.undo()
+
+    # The failed transaction was rolled back, so the connection still takes new ones
+    assert not buckets._conn.in_transaction
+    assert await limiter.acquire(100) < 0.1
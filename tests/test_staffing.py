@@ -0,0 +1,64 @@
+import time
+import numpy as np
+from src.analytics.staffing import (
+    StaffingConfig, _shift_patterns, _solve_greedy, optimize_staffing_plan,
+    required_staff, staffing_matrix, staffing_recommendations
+)
+
+def weekly_demand(locations, seed=0):
+    rng = np.random.default_rng(seed)
+    demand = rng.gamma(2.0, 15.0, (locations, 7, 24))
+    demand[:, :, :9] = np.nan  # Closed overnight
+    demand[:, :, 23] = np.nan
+    return demand
+
+def test_required_staff_respects_minimum_coverage():
+    """Test that open hours get at least the minimum staff and closed hours none"""
+    config = StaffingConfig(service_rate=10, min_staff=2)
+    required = required_staff(np.array([np.nan, 0.0, 15.0, 31.0]), config)
+
+    assert required.tolist() == [0, 2, 2, 4]
+
+def test_plan_covers_demand_within_shift_limits():
+    """Test that the plan covers every hour, uses allowed shifts and beats the greedy cover"""
+    config = StaffingConfig(min_shift_hours=4, max_shift_hours=6)
+    plan = optimize_staffing_plan(weekly_demand(3), config)
+
+    assert plan.solver == "milp"
+    assert (plan.scheduled >= plan.required).all()
+    assert all(4 <= hours <= 6 and start + hours <= 24 for shifts in plan.shifts for start, hours, _ in shifts)
+
+    _, sizes, coverage = _shift_patterns(config)
+    greedy = _solve_greedy(plan.required.reshape(-1, 24), config)
+    assert ((greedy @ coverage.T).reshape(plan.required.shape) >= plan.required).all()
+    assert plan.cost.sum() <= (greedy @ (sizes * config.hourly_wage)).sum()
+
+def test_fifty_locations_for_a_week_solve_quickly():
+    """Test that 50 locations x 7 days solve as one batch within request time"""
+    started = time.perf_counter()
+    plan = optimize_staffing_plan(weekly_demand(50, seed=1))
+
+    assert time.perf_counter() - started < 5.0
+    assert plan.scheduled.shape == (50, 7, 24)
+    assert (plan.scheduled >= plan.required).all()
+
+def test_recommendations_against_current_staffing():
+    """Test that current staffing keyed by weekday or date is compared hour by hour"""
+    demand = np.full((7, 24), np.nan)
+    demand[:, 10:18] = 10.0
+    config = StaffingConfig(service_rate=10, min_staff=1)
+    plan = optimize_staffing_plan(demand[None], config)
+    current = staffing_matrix({
+        "monday": [{"hour": h, "current_staff": 3} for h in range(10, 18)],
+        "2024-01-02": [{"hour": h, "current_staff": 1} for h in range(10, 18)],  # A Tuesday
+    })
+
+    result = staffing_recommendations(plan, current, config)
+    by_day = {r["weekday"]: r for r in result["recommendations"]}
+
+    assert "tuesday" not in by_day
+    assert by_day["monday"]["hourly_changes"][0] == {
+        "hour": 10, "current_staff": 3, "recommended_staff": 1, "required_staff": 1
+    }
+    assert result["efficiency_gains"]["recommended_staff_hours"] == 7 * 8
+    assert result["cost_impact"]["weekly_change"] == (56 - 32) * config.hourly_wage
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel
+from src.analytics.traffic_cube import TrafficCube
+
+# Same shape as the TrafficAgent models, which cannot be imported outside a worker
+class HourlyTraffic(BaseModel):
+    hour: int
+    customer_count: int
+    average_dwell_time: float
+    conversion_rate: float
+    peak_capacity: bool
+
+class DayTraffic(BaseModel):
+    date: str
+    total_customers: int
+    hourly_breakdown: List[HourlyTraffic]
+    weather_conditions: Optional[Dict] = None
+    local_events: List[Dict] = []
+
+def traffic_days(weeks=8, seed=0):
+    """Lunch and dinner peaks, busier Saturdays, steady growth"""
+    rng = np.random.default_rng(seed)
+    start = date(2024, 1, 1)  # A Monday
+    days = []
+    for d in range(weeks * 7):
+        day = start + timedelta(days=d)
+        scale = (1.5 if day.weekday() == 5 else 1.0) * (1 + 0.005 * d)
+        hours = []
+        for hour in range(10, 22):
+            base = 40 if hour in (12, 19) else 15
+            count = int(rng.poisson(base * scale))
+            hours.append(HourlyTraffic(
+                hour=hour, customer_count=count, average_dwell_time=45.0,
+                conversion_rate=0.6, peak_capacity=count > 55
+            ))
+        days.append(DayTraffic(
+            date=day.isoformat(), total_customers=sum(h.customer_count for h in hours),
+            hourly_breakdown=hours, local_events=[{"name": "market"}] if d == 3 else []
+        ))
+    return days
+
+def test_round_trip_through_cube():
+    """Test that models survive conversion to the cube and back, in any input order"""
+    days = traffic_days(weeks=2)
+    cube = TrafficCube.from_days(days[::-1])
+
+    assert cube.values.shape == (14, 24, 4)
+    assert cube.weekdays[0] == 0
+    assert [d.model_dump() for d in cube.to_days(DayTraffic, HourlyTraffic)] == [d.model_dump() for d in days]
+
+def test_missing_days_and_hours_are_nan():
+    """Test that gaps in the calendar stay NaN and drop out of the profiles"""
+    days = traffic_days(weeks=2)
+    cube = TrafficCube.from_days([d.model_dump() for d in days[:3] + days[5:]])
+
+    assert len(cube.dates) == 14
+    assert not cube.observed[3] and np.isnan(cube.daily_totals()[3])
+    assert np.isnan(cube.hourly_profile()[3]) and np.isfinite(cube.hourly_profile()[12])
+    assert len(cube.between("2024-01-02", "2024-01-04").dates) == 3
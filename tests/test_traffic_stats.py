@@ -0,0 +1,140 @@
+import numpy as np
+from src.analytics.traffic_cube import TrafficCube, peak_periods
+from src.analytics.traffic_stats import (
+    TrafficStatistics, TrafficStatsConfig, traffic_patterns, update_traffic_statistics, window_patterns
+)
+from tests.test_traffic_cube import traffic_days
+
+def test_accumulators_match_full_history():
+    """Test that Welford mean/variance, min/max and EWMA equal direct computation"""
+    days = traffic_days(weeks=6)
+    stats = TrafficStatistics([], TrafficStatsConfig(ewma_alpha=0.3)).update("l1", days)
+
+    cube = TrafficCube.from_days(days)
+    mondays = cube.metric("customer_count")[cube.weekdays == 0][:, 12]
+    monday_noon = (0, 0, 12, 0)
+    assert np.isclose(stats.mean[monday_noon], mondays.mean())
+    assert np.isclose(stats.variance(0)[0, 12, 0], mondays.var(ddof=1))
+    assert stats.minimum[monday_noon] == mondays.min() and stats.maximum[monday_noon] == mondays.max()
+
+    ewma = mondays[0]
+    for value in mondays[1:]:
+        ewma = 0.3 * value + 0.7 * ewma
+    # Bias-corrected start differs from seeding with the first value by a vanishing weight
+    assert abs(stats.ewma[monday_noon] - ewma) < 0.7 ** 5 * abs(mondays).max()
+
+def test_incremental_updates_match_single_pass():
+    """Test that folding days in batches, with repeats, equals one pass over all of them"""
+    days = traffic_days(weeks=6)
+    whole = TrafficStatistics([], TrafficStatsConfig()).update("l1", days)
+    batched = TrafficStatistics([], TrafficStatsConfig())
+    batched.update("l1", days[:10]).update("l1", days[:25]).update("l1", days)
+
+    for name in ["count", "mean", "m2", "ewma", "minimum", "maximum", "day_total", "trend_sums"]:
+        assert np.allclose(getattr(batched, name), getattr(whole, name)), name
+
+def test_late_days_are_merged():
+    """Test that days arriving after newer ones are counted once and match in-order folding"""
+    days = traffic_days(weeks=6)
+    whole = TrafficStatistics([], TrafficStatsConfig()).update("l1", days)
+    late = TrafficStatistics([], TrafficStatsConfig())
+    late.update("l1", days[:10] + days[20:]).update("l1", days[10:20]).update("l1", days)
+
+    for name in ["count", "mean", "m2", "minimum", "maximum", "day_count", "day_total", "trend_sums"]:
+        assert np.allclose(getattr(late, name), getattr(whole, name)), name
+    assert late.last_day[0] == whole.last_day[0]
+    # Late days carry the weight of their position, not of the newest observations
+    assert np.abs(late.ewma - whole.ewma).max() < 0.1 * np.abs(whole.ewma).max()
+
+def test_update_within_window():
+    """Test that only days between start and end are folded in"""
+    days = traffic_days(weeks=4)
+    stats = TrafficStatistics([], TrafficStatsConfig()).update("l1", days, start="2024-01-08", end="2024-01-14")
+
+    assert stats.day_count[0].tolist() == [1] * 7
+    assert stats.first_day[0] == np.datetime64("2024-01-08", "D").astype(np.int64)
+
+def test_cached_statistics_persist_between_runs(tmp_path):
+    """Test that statistics saved on one run are extended on the next"""
+    path = str(tmp_path / "traffic_stats.npz")
+    days = traffic_days(weeks=4)
+    update_traffic_statistics("l1", days[:14], stats_path=path)
+    update_traffic_statistics("l2", days[:7], stats_path=path)
+    stats = update_traffic_statistics("l1", days, stats_path=path)
+
+    assert stats.ids == ["l1", "l2"]
+    assert stats.day_count[0].sum() == 28 and stats.day_count[1].sum() == 7
+    assert TrafficStatistics.load(path).last_day[0] == np.datetime64(days[-1].date, "D").astype(np.int64)
+
+def test_cache_is_written_to_the_given_path(tmp_path):
+    """Test that a path without the .npz suffix is used as given and replaced whole"""
+    path = str(tmp_path / "traffic_stats")
+    days = traffic_days(weeks=2)
+    update_traffic_statistics("l1", days[:7], stats_path=path)
+    update_traffic_statistics("l1", days, stats_path=path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["traffic_stats", "traffic_stats.lock"]
+    assert TrafficStatistics.load(path).day_count[0].sum() == 14
+
+def test_config_change_only_resets_that_location(tmp_path):
+    """Test that a location updated under a new config is rebuilt while others are kept"""
+    path = str(tmp_path / "traffic_stats.npz")
+    days = traffic_days(weeks=2)
+    update_traffic_statistics("l1", days, stats_path=path)
+    update_traffic_statistics("l2", days, stats_path=path)
+    stats = update_traffic_statistics("l1", days[:7], TrafficStatsConfig(ewma_alpha=0.5), stats_path=path)
+
+    assert stats.day_count[0].sum() == 7 and stats.day_count[1].sum() == 14
+    assert [config.ewma_alpha for config in TrafficStatistics.load(path).configs] == [0.5, 0.2]
+
+def test_patterns_and_peaks():
+    """Test that weekday seasonality, growth and peak hours are recovered from the accumulators"""
+    stats = TrafficStatistics([], TrafficStatsConfig()).update("l1", traffic_days())
+    analysis = traffic_patterns(stats, "l1")
+
+    seasonality = analysis["seasonality"]["weekday_index"]
+    assert max(seasonality, key=seasonality.get) == "saturday"
+    assert analysis["trends"]["daily_slope"] > 0
+    assert analysis["trends"]["recent_vs_average"] > 0
+    assert analysis["patterns"][0]["type"] == "peak_hour"
+    assert analysis["patterns"][0]["hour"] in (12, 19)
+
+    peaks = peak_periods(analysis["hourly_profile"], venue_capacity=60)
+    assert {p["hour"] for p in peaks["peak_hours"][:2]} == {12, 19}
+    assert {b["hour"] for b in peaks["bottlenecks"]} == {12, 19}
+    assert peaks["capacity_utilization"]["12"] > 0.85
+
+def test_unknown_location():
+    """Test that a location without history gives empty analysis"""
+    analysis = traffic_patterns(TrafficStatistics([], TrafficStatsConfig()), "missing")
+
+    assert analysis["patterns"] == []
+    assert peak_periods(analysis.get("hourly_profile") or {})["peak_hours"] == []
+
+def test_window_patterns_reuse_cached_cells(tmp_path, monkeypatch):
+    """Test that a window covering the cached days reads the cells, and a narrower one is rebuilt"""
+    path = str(tmp_path / "traffic_stats.npz")
+    days = traffic_days(weeks=4)
+    stats = update_traffic_statistics("l1", days, stats_path=path)
+
+    folds = []
+    monkeypatch.setattr(TrafficStatistics, "fold", lambda self, *args, **kwargs: folds.append(args))
+    covering = window_patterns(stats, "l1", days, "2023-12-01", "2024-02-01")
+    assert not folds and covering == traffic_patterns(stats, "l1")
+
+    monkeypatch.undo()
+    narrow = window_patterns(stats, "l1", days, "2024-01-08", "2024-01-21")
+    assert narrow["trends"]["days_observed"] == 14
+
+def test_unchanged_cache_is_not_rewritten(tmp_path, monkeypatch):
+    """Test that re-sending counted days leaves the file alone"""
+    path = str(tmp_path / "traffic_stats.npz")
+    days = traffic_days(weeks=2)
+    update_traffic_statistics("l1", days, stats_path=path)
+
+    saves = []
+    monkeypatch.setattr(TrafficStatistics, "save", lambda self, target: saves.append(target))
+    update_traffic_statistics("l1", days[3:], stats_path=path)
+    assert saves == []
+    update_traffic_statistics("l2", days, stats_path=path)
+    assert saves == [path]